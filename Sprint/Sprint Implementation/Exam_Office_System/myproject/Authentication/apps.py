@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Authentication'
+
+    def ready(self):
+        from . import hashers  # noqa: F401
@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from Exam_Office_System.models import (
     User, Department, Student, Teacher, ExamOfficeOrAdmin, Course, Exam,
@@ -62,6 +63,66 @@ class DepartmentUserRegisterForm(forms.Form):
     user = UserForm()
     profile = DepartmentRegisterForm()
 
+# Roster Import Forms
+# The importer validates each row with these and checks uniqueness for a whole chunk at once
+# (against the database and earlier rows of the file), so the per-row queries are skipped.
+
+class StudentImportForm(StudentRegisterForm):
+    email = forms.EmailField(required=True)
+
+    class Meta(StudentRegisterForm.Meta):
+        fields = ['registration_number', 'session', 'name']
+
+    def clean_registration_number(self):
+        # The registration number becomes the username
+        registration_number = self.cleaned_data['registration_number']
+        User.username_validator(registration_number)
+        return registration_number
+
+    def validate_unique(self):
+        pass
+
+class TeacherImportForm(TeacherRegisterForm):
+    username = forms.CharField(max_length=150, required=True, validators=[User.username_validator])
+    email = forms.EmailField(required=True)
+
+    class Meta(TeacherRegisterForm.Meta):
+        fields = ['name']
+
+    def validate_unique(self):
+        pass
+
+class RosterUploadForm(forms.Form):
+    ROLE_CHOICES = [
+        ('Student', 'Student'),
+        ('Teacher', 'Teacher'),
+    ]
+
+    role = forms.ChoiceField(choices=ROLE_CHOICES)
+    roster = forms.FileField(help_text='CSV or XLSX file with a header row')
+
+    @property
+    def max_rows(self):
+        return getattr(settings, 'ROSTER_UPLOAD_MAX_ROWS', 200)
+
+    def clean_roster(self):
+        # Uploads hash every password inside the request, so larger rosters go through
+        # "manage.py import_roster", which hashes in a process pool
+        from .roster import count_roster_rows
+
+        roster = self.cleaned_data['roster']
+        limit = self.max_rows
+        try:
+            rows = count_roster_rows(roster.file, roster.name, limit)
+        except UnicodeDecodeError:
+            raise forms.ValidationError('File is not UTF-8 encoded')
+        if rows > limit:
+            raise forms.ValidationError(
+                f'Rosters of more than {limit} rows are too large to upload; import them with '
+                f'"python manage.py import_roster <file> --role <role>" instead'
+            )
+        return roster
+
 # Custom Authentication Form (Optional Enhancement)
 class CustomAuthenticationForm(AuthenticationForm):
     username = forms.CharField(max_length=150, required=True, widget=forms.TextInput(attrs={'placeholder': 'Username'}))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.checks import Tags, Warning, register
+
+
+# Password hashing policy
+# PASSWORD_HASH_ITERATIONS sets the PBKDF2 work factor. Hashes made at another count
+# still verify, and Django rehashes them at the configured count on the user's next
+# successful login, so changing the policy needs no migration or password reset.
+
+# OWASP's minimum for PBKDF2-HMAC-SHA256
+MIN_ITERATIONS = 600_000
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """Django's PBKDF2-SHA256 hasher at ``PASSWORD_HASH_ITERATIONS`` (Django's default if unset)."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or hashers.PBKDF2PasswordHasher.iterations
+
+
+@register(Tags.security, deploy=True)
+def check_password_iterations(app_configs, **kwargs):
+    iterations = getattr(settings, 'PASSWORD_HASH_ITERATIONS', None)
+    if iterations and iterations < MIN_ITERATIONS:
+        return [Warning(
+            f'PASSWORD_HASH_ITERATIONS is {iterations}, below the recommended {MIN_ITERATIONS}.',
+            hint='Cheaper hashes make logins faster but stolen password hashes easier to crack.',
+            id='Authentication.W001',
+        )]
+    return []
@@ -0,0 +1,80 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Login rate limits
+# Failed logins are counted per username and per client address in fixed windows of the
+# shared cache (add + incr, atomic on Redis and memcached), so throttling never writes to
+# the database. Once a counter reaches its limit, further attempts are refused without
+# checking the password, which also spares the hashing cost.
+
+DEFAULT_LIMITS = {
+    'username': (10, 15 * 60),
+    'ip': (100, 15 * 60),
+}
+
+class RateLimit:
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def key(self, identity):
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        return f'ratelimit:{self.scope}:{digest}:{int(time.time() // self.window)}'
+
+    def count(self, identity):
+        return cache.get(self.key(identity), 0)
+
+    def hit(self, identity):
+        key = self.key(identity)
+        # Slightly longer than the window, so the counter outlives clock skew between workers
+        cache.add(key, 0, self.window + 60)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(key, 1, self.window + 60)
+            return 1
+
+    def reset(self, identity):
+        cache.delete(self.key(identity))
+
+    def retry_after(self):
+        """Seconds until the current window ends."""
+        return int(self.window - time.time() % self.window) + 1
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+def login_limits(request, username):
+    """``(RateLimit, identity)`` pairs that apply to a login attempt."""
+    limits = getattr(settings, 'LOGIN_RATE_LIMITS', DEFAULT_LIMITS)
+    identities = {'username': username.strip().lower(), 'ip': client_ip(request)}
+    return [
+        (RateLimit(f'login:{scope}', limit, window), identities[scope])
+        for scope, (limit, window) in limits.items()
+    ]
+
+def login_blocked(request, username):
+    """Seconds the client must wait before another attempt, or 0 if it may try now."""
+    waits = [
+        limit.retry_after()
+        for limit, identity in login_limits(request, username)
+        if limit.count(identity) >= limit.limit
+    ]
+    return max(waits, default=0)
+
+def record_login_failure(request, username):
+    for limit, identity in login_limits(request, username):
+        limit.hit(identity)
+
+def record_login_success(request, username):
+    # A shared address keeps its count: one good login must not clear others' failures
+    for limit, identity in login_limits(request, username):
+        if limit.scope == 'login:username':
+            limit.reset(identity)
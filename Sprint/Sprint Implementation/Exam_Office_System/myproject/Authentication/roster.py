@@ -0,0 +1,209 @@
+import csv
+import io
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from Exam_Office_System.models import User, Department, Student, Teacher
+from .forms import StudentImportForm, TeacherImportForm
+
+ROSTER_COLUMNS = {
+    'Student': ('registration_number', 'name', 'session', 'department', 'email'),
+    'Teacher': ('username', 'name', 'department', 'email'),
+}
+
+PROFILE_MODELS = {
+    'Student': (Student, StudentImportForm),
+    'Teacher': (Teacher, TeacherImportForm),
+}
+
+
+class RosterReport:
+    """Outcome of a roster import: created accounts with their initial passwords and per-row errors."""
+
+    def __init__(self):
+        self.created = []
+        self.errors = []
+
+    def write_csv(self, fileobj):
+        writer = csv.writer(fileobj)
+        writer.writerow(['line', 'username', 'password', 'error'])
+        rows = [(line, username, password, '') for line, username, password in self.created]
+        rows += [(line, username, '', error) for line, username, error in self.errors]
+        writer.writerows(sorted(rows))
+
+
+# Reading
+
+def read_roster(fileobj, filename):
+    """Yield ``(line_number, row)`` pairs from a binary CSV or XLSX file, one row at a time."""
+    if filename.lower().endswith('.xlsx'):
+        return _read_xlsx(fileobj)
+    return _read_csv(fileobj)
+
+def count_roster_rows(fileobj, filename, limit):
+    """Number of data rows in the roster, counting no further than ``limit + 1``; rewinds ``fileobj``."""
+    rows = read_roster(fileobj, filename)
+    try:
+        count = sum(1 for _ in islice(rows, limit + 1))
+    finally:
+        rows.close()
+    fileobj.seek(0)
+    return count
+
+def _read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        for line_number, row in enumerate(csv.DictReader(text), start=2):
+            yield line_number, {
+                key.strip().lower(): (value or '').strip()
+                for key, value in row.items() if key
+            }
+    finally:
+        # Leave the caller's file open when the reader is closed or collected
+        text.detach()
+
+def _read_xlsx(fileobj):
+    from openpyxl import load_workbook
+
+    sheet = load_workbook(fileobj, read_only=True, data_only=True).active
+    rows = sheet.iter_rows(values_only=True)
+    header = [str(cell or '').strip().lower() for cell in next(rows, ())]
+    for line_number, values in enumerate(rows, start=2):
+        yield line_number, {
+            key: _cell_text(value)
+            for key, value in zip(header, values) if key
+        }
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    # Numeric cells come back as floats: a registration number 2019001 must not become '2019001.0'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+# Importing
+
+def _init_worker():
+    # Spawned (non-forked) workers start without Django configured
+    if not apps.ready:
+        django.setup()
+
+def import_roster(rows, role='Student', chunk_size=500, workers=None):
+    """
+    Create ``User`` and profile rows for every valid roster row.
+
+    Rows are validated with the registration form rules, passwords are hashed on a
+    process pool, and each chunk is written with ``bulk_create`` in its own transaction,
+    so a bad row or a failed chunk never aborts the rest of the import.
+    ``workers=0`` hashes in this process instead, as web requests must not fork.
+    """
+    report = RosterReport()
+    departments = {}
+    for department in Department.objects.all():
+        departments[str(department.pk)] = department
+        departments[department.name.lower()] = department
+
+    rows = iter(rows)
+    if workers == 0:
+        executor = nullcontext(None)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    with executor as pool:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            _import_chunk(chunk, role, departments, pool, report)
+    return report
+
+def _import_chunk(chunk, role, departments, pool, report):
+    profile_model, form_class = PROFILE_MODELS[role]
+    accounts = []
+    for line, row in chunk:
+        username = row.get('registration_number' if role == 'Student' else 'username', '')
+        missing = [column for column in ROSTER_COLUMNS[role] if not row.get(column)]
+        if missing:
+            report.errors.append((line, username, 'Missing ' + ', '.join(missing)))
+            continue
+        department = departments.get(row['department'].lower())
+        if department is None:
+            report.errors.append((line, username, f"Unknown department '{row['department']}'"))
+            continue
+        form = form_class(row)
+        if not form.is_valid():
+            messages = [f'{field}: {error}' for field, errors in form.errors.items() for error in errors]
+            report.errors.append((line, username, '; '.join(messages)))
+            continue
+        email = User.objects.normalize_email(form.cleaned_data['email'])
+        accounts.append((line, username, email, department, form))
+
+    accounts = _drop_duplicates(accounts, role, report)
+    if not accounts:
+        return
+
+    passwords = [secrets.token_urlsafe(9) for _ in accounts]
+    if pool is None:
+        hashes = map(make_password, passwords)
+    else:
+        hashes = pool.map(make_password, passwords, chunksize=max(1, len(passwords) // 32))
+    users = [
+        User(username=username, email=email, role=role, password=password_hash)
+        for (line, username, email, department, form), password_hash in zip(accounts, hashes)
+    ]
+
+    try:
+        with transaction.atomic():
+            users = User.objects.bulk_create(users)
+            if any(user.pk is None for user in users):
+                ids = dict(User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            profiles = []
+            for (line, username, email, department, form), user in zip(accounts, users):
+                profile = form.save(commit=False)
+                profile.user = user
+                profile.department = department
+                profiles.append(profile)
+            profile_model.objects.bulk_create(profiles)
+    except IntegrityError as exc:
+        # Another registration raced this chunk; report it instead of stopping the import
+        for line, username, *rest in accounts:
+            report.errors.append((line, username, f'Not imported: {exc}'))
+        return
+
+    for (line, username, *rest), password in zip(accounts, passwords):
+        report.created.append((line, username, password))
+
+def _drop_duplicates(accounts, role, report):
+    usernames = [account[1] for account in accounts]
+    emails = [account[2] for account in accounts]
+    taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    if role == 'Student':
+        taken_usernames.update(Student.objects.filter(
+            registration_number__in=usernames
+        ).values_list('registration_number', flat=True))
+
+    unique = []
+    for account in accounts:
+        line, username, email = account[:3]
+        if username in taken_usernames:
+            report.errors.append((line, username, f"'{username}' is already registered"))
+        elif email in taken_emails:
+            report.errors.append((line, username, f"Email '{email}' is already registered"))
+        else:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+            unique.append(account)
+    return unique
@@ -1,3 +1,163 @@
-from django.test import TestCase
+import io
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from Exam_Office_System.models import User, Student, Teacher
+from Exam_Office_System.tests import make_department, make_student
+
+from .roster import import_roster, read_roster
+
+
+# Login throttling, hash upgrades and cached sessions
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, LOGIN_RATE_LIMITS={'username': (3, 60), 'ip': (5, 60)})
+class LoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = User.objects.create_user(username='office', email='office@example.com', password='secret', role='Exam_Office')
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, password, username='office'):
+        return self.client.post(reverse('login'), {'username': username, 'password': password})
+
+    def test_failed_logins_are_throttled_per_username_and_address(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong').status_code, 200)
+        response = self.login('secret')
+        self.assertEqual(response.status_code, 429)
+        self.assertLessEqual(int(response['Retry-After']), 61)
+        # Other accounts from the address still get their attempts until its own limit
+        self.assertEqual(self.login('wrong', 'other').status_code, 200)
+        self.assertEqual(self.login('wrong', 'other').status_code, 200)
+        self.assertEqual(self.login('wrong', 'third').status_code, 429)
+
+    def test_success_clears_the_username_count(self):
+        self.login('wrong')
+        self.login('wrong')
+        self.assertEqual(self.login('secret').status_code, 302)
+        self.client.logout()
+        self.login('wrong')
+        self.login('wrong')
+        self.assertEqual(self.login('secret').status_code, 302)
+
+    def test_hashes_are_upgraded_on_login(self):
+        self.assertTrue(self.office.password.startswith('pbkdf2_sha256$1000$'))
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertEqual(self.login('secret').status_code, 302)
+        self.office.refresh_from_db()
+        self.assertTrue(self.office.password.startswith('pbkdf2_sha256$2000$'))
+
+    def test_authenticated_requests_read_the_session_from_the_cache(self):
+        self.login('secret')
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse('dashboard'))
+        self.assertFalse([query for query in captured if 'django_session' in query['sql']])
+
+
+# Bulk roster import
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RosterImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = make_department()
+        make_student(cls.department, 1)
+
+    def student_row(self, registration_number, email, department='cse'):
+        return {'registration_number': registration_number, 'name': 'Imported', 'session': '2024',
+                'department': department, 'email': email}
+
+    def test_creates_accounts_and_reports_bad_rows(self):
+        rows = [
+            (2, self.student_row('2024-001', 'a@example.com')),
+            (3, self.student_row('2024-002', 'b@example.com', department='EEE')),
+            (4, self.student_row('2024/003', 'c@example.com')),
+            (5, {**self.student_row('2024-004', 'd@example.com'), 'name': ''}),
+        ]
+        report = import_roster(rows, workers=0)
+        self.assertEqual([line for line, *_ in report.created], [2])
+        student = Student.objects.get(registration_number='2024-001')
+        self.assertEqual((student.user.username, student.user.role, student.department), ('2024-001', 'Student', self.department))
+        _, _, password = report.created[0]
+        self.assertTrue(student.user.check_password(password))
+        errors = {line: error for line, _, error in report.errors}
+        self.assertIn("Unknown department 'EEE'", errors[3])
+        self.assertIn('registration_number', errors[4])
+        self.assertEqual(errors[5], 'Missing name')
+
+    def test_duplicates_are_rejected(self):
+        rows = [
+            (2, self.student_row('2023-001', 'new@example.com')),
+            (3, self.student_row('2024-010', 's1@example.com')),
+            (4, self.student_row('2024-011', 'twice@example.com')),
+            (5, self.student_row('2024-011', 'other@example.com')),
+            (6, self.student_row('2024-012', 'twice@example.com')),
+        ]
+        report = import_roster(rows, workers=0, chunk_size=2)
+        self.assertEqual([line for line, *_ in report.created], [4])
+        errors = {line: error for line, _, error in report.errors}
+        self.assertEqual(sorted(errors), [2, 3, 5, 6])
+        self.assertIn('already registered', errors[5])
+        self.assertEqual(Student.objects.filter(registration_number__startswith='2024').count(), 1)
+
+    def test_teacher_usernames_are_validated(self):
+        rows = [
+            (2, {'username': 'rahim', 'name': 'Rahim', 'department': str(self.department.pk), 'email': 'r@example.com'}),
+            (3, {'username': 'bad name', 'name': 'Bad', 'department': 'cse', 'email': 'bad@example.com'}),
+        ]
+        report = import_roster(rows, role='Teacher', workers=0)
+        self.assertEqual([username for _, username, _ in report.created], ['rahim'])
+        self.assertEqual([line for line, *_ in report.errors], [3])
+        self.assertTrue(Teacher.objects.filter(user__username='rahim', department=self.department).exists())
+
+    def test_xlsx_numbers_are_read_as_integers(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(['Registration_Number', 'Name', 'Session', 'Department', 'Email'])
+        workbook.active.append([2024020, 'Imported', 2024, 'CSE', 'x@example.com'])
+        fileobj = io.BytesIO()
+        workbook.save(fileobj)
+        fileobj.seek(0)
+        self.assertEqual(list(read_roster(fileobj, 'roster.XLSX')), [
+            (2, {'registration_number': '2024020', 'name': 'Imported', 'session': '2024',
+                 'department': 'CSE', 'email': 'x@example.com'}),
+        ])
+
+    def test_view_imports_in_process(self):
+        office = User.objects.create_user(username='office', email='office@example.com', password='x', role='Exam_Office')
+        self.client.force_login(office)
+        roster = SimpleUploadedFile(
+            'roster.csv', b'registration_number,name,session,department,email\n2024-030,Imported,2024,CSE,v@example.com\n',
+        )
+        with mock.patch('Authentication.roster.ProcessPoolExecutor') as pool:
+            response = self.client.post(reverse('import_roster'), {'role': 'Student', 'roster': roster})
+        pool.assert_not_called()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn(b'2024-030', response.content)
+        self.assertTrue(Student.objects.filter(registration_number='2024-030').exists())
+
+    @override_settings(ROSTER_UPLOAD_MAX_ROWS=2)
+    def test_view_sends_large_rosters_to_the_command(self):
+        office = User.objects.create_user(username='office', email='office@example.com', password='x', role='Exam_Office')
+        self.client.force_login(office)
+        header = b'registration_number,name,session,department,email\n'
+        rows = [b'2024-04%d,Imported,2024,CSE,w%d@example.com\n' % (number, number) for number in range(3)]
+        response = self.client.post(reverse('import_roster'), {
+            'role': 'Student', 'roster': SimpleUploadedFile('roster.csv', header + b''.join(rows)),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('manage.py import_roster', response.context['form'].errors['roster'][0])
+        self.assertFalse(Student.objects.filter(registration_number__startswith='2024-04').exists())
+        # At the limit the whole file is still imported after being counted
+        response = self.client.post(reverse('import_roster'), {
+            'role': 'Student', 'roster': SimpleUploadedFile('roster.csv', header + b''.join(rows[:2])),
+        })
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(Student.objects.filter(registration_number__startswith='2024-04').count(), 2)
@@ -7,6 +7,7 @@ urlpatterns = [
     path('register/student/', views.StudentRegisterView.as_view(), name='register_student'),
     path('register/teacher/', views.TeacherRegisterView.as_view(), name='register_teacher'),
     path('register/department/', views.DepartmentRegisterView.as_view(), name='register_department'),
+    path('register/import/', views.RosterImportView.as_view(), name='import_roster'),
     
     # Login and Logout URLs
     path('login/', views.CustomLoginView.as_view(), name='login'),
@@ -5,15 +5,22 @@ from django.contrib.auth.decorators import login_required
 from .forms import (
     UserForm, ExamOfficeRegisterForm, StudentRegisterForm, TeacherRegisterForm,
     DepartmentRegisterForm, ExamOfficeUserRegisterForm, StudentUserRegisterForm,
-    TeacherUserRegisterForm, DepartmentUserRegisterForm, CustomAuthenticationForm
+    TeacherUserRegisterForm, DepartmentUserRegisterForm, CustomAuthenticationForm,
+    RosterUploadForm
 )
+from .ratelimit import login_blocked, record_login_failure, record_login_success
+from .roster import import_roster, read_roster
 from Exam_Office_System.models import (
     User, Department, Student, Teacher, ExamOfficeOrAdmin, Course, Exam,
     ExamSchedule, ExamRegistration, Result, MarksheetApplication,
     CertificateApplication, TeacherRemuneration, ExamMaterials, Attendance
 )
+from Exam_Office_System.dashboard import get_dashboard_summary
+from Exam_Office_System.portal import get_student_portal
+from Exam_Office_System.routing import replica_reads
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import HttpResponse
 import uuid
 
 # Registration Views
@@ -122,6 +129,27 @@ class DepartmentRegisterView(View):
             'profile_form': profile_form
         })
 
+# Bulk Roster Import View (Exam Office only)
+class RosterImportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.role == 'Exam_Office'
+
+    def get(self, request):
+        return render(request, 'Exam_Office/import_roster.html', {'form': RosterUploadForm()})
+
+    def post(self, request):
+        form = RosterUploadForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return render(request, 'Exam_Office/import_roster.html', {'form': form})
+        roster = form.cleaned_data['roster']
+        # Hash in this worker: a process pool per request would fork the web server, and the
+        # form caps the row count so the hashing fits in a request
+        report = import_roster(read_roster(roster.file, roster.name), role=form.cleaned_data['role'], workers=0)
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="import_report_{uuid.uuid4().hex[:8]}.csv"'
+        report.write_csv(response)
+        return response
+
 # Login View
 class CustomLoginView(View):
     def get(self, request):
@@ -129,12 +157,22 @@ class CustomLoginView(View):
         return render(request, 'Exam_Office/login.html', {'form': form})
     
     def post(self, request):
+        username = request.POST.get('username', '')
+        retry_after = login_blocked(request, username)
+        if retry_after:
+            minutes = -(-retry_after // 60)
+            messages.error(request, f"Too many failed logins; try again in {minutes} minute{'s' if minutes > 1 else ''}")
+            response = render(request, 'Exam_Office/login.html', {'form': CustomAuthenticationForm()}, status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
         form = CustomAuthenticationForm(request, data=request.POST)
         if form.is_valid():
             user = form.get_user()
             login(request, user)
+            record_login_success(request, username)
             return redirect('dashboard')
         else:
+            record_login_failure(request, username)
             messages.error(request, 'Invalid username or password')
             return render(request, 'Exam_Office/login.html', {'form': form})
 
@@ -143,17 +181,21 @@ def logout_view(request):
     logout(request)
     return redirect('login')
 
-# Dashboard View
+# Dashboard View (read from a replica once the user is known)
 @login_required
+@replica_reads()
 def dashboard(request):
     user = request.user
+    context = {'summary': get_dashboard_summary(user)}
     if user.role == 'Exam_Office':
-        return render(request, 'Exam_Office/exam_office_dashboard.html')
+        return render(request, 'Exam_Office/exam_office_dashboard.html', context)
     elif user.role == 'Student':
-        return render(request, 'Exam_Office/student_dashboard.html')
+        if hasattr(user, 'student_profile'):
+            context['portal'] = get_student_portal(user.student_profile.pk)
+        return render(request, 'Exam_Office/student_dashboard.html', context)
     elif user.role == 'Teacher':
-        return render(request, 'Exam_Office/teacher_dashboard.html')
+        return render(request, 'Exam_Office/teacher_dashboard.html', context)
     elif user.role == 'Department':
-        return render(request, 'Exam_Office/department_dashboard.html')
+        return render(request, 'Exam_Office/department_dashboard.html', context)
     else:
-        return render(request, 'Exam_Office/dashboard.html')
+        return render(request, 'Exam_Office/dashboard.html', context)
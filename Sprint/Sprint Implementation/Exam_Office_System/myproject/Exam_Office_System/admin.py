@@ -2,21 +2,227 @@ from django.contrib import admin
 from .models import (
     User, Department, Student, Teacher, ExamOfficeOrAdmin, Course, Exam,
     ExamSchedule, ExamRegistration, Result, MarksheetApplication,
-    CertificateApplication, TeacherRemuneration, ExamMaterials, Attendance
+    CertificateApplication, TeacherRemuneration, ExamMaterials, Attendance,
+    TabulationSheet, ExaminerMark, AnswerScript, RemunerationRate, Room,
+    SeatAllocation, RoomInvigilation, ClearanceAudit, Sickbed
 )
 
-admin.site.register(User)
-admin.site.register(Department)
-admin.site.register(Student)
-admin.site.register(Teacher)
-admin.site.register(ExamOfficeOrAdmin)
-admin.site.register(Course)
-admin.site.register(Exam)
-admin.site.register(ExamSchedule)
-admin.site.register(ExamRegistration)
-admin.site.register(Result)
-admin.site.register(MarksheetApplication)
-admin.site.register(CertificateApplication)
-admin.site.register(TeacherRemuneration)
-admin.site.register(ExamMaterials)
-admin.site.register(Attendance)
+# Base admin for large tables: no COUNT(*) over the whole table on filtered pages
+class ExamOfficeModelAdmin(admin.ModelAdmin):
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(User)
+class UserAdmin(ExamOfficeModelAdmin):
+    list_display = ('username', 'email', 'role', 'is_active', 'is_staff')
+    list_filter = ('role', 'is_active', 'is_staff')
+    search_fields = ('username', 'email')
+
+
+@admin.register(Department)
+class DepartmentAdmin(ExamOfficeModelAdmin):
+    list_display = ('name', 'user')
+    list_select_related = ('user',)
+    search_fields = ('name',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Student)
+class StudentAdmin(ExamOfficeModelAdmin):
+    list_display = ('registration_number', 'name', 'department', 'session', 'hall_clearance', 'library_clearance', 'expelled')
+    list_select_related = ('department',)
+    list_filter = ('department', 'session', 'hall_clearance', 'library_clearance', 'expelled')
+    search_fields = ('registration_number', 'name')
+    raw_id_fields = ('user',)
+
+
+@admin.register(Teacher)
+class TeacherAdmin(ExamOfficeModelAdmin):
+    list_display = ('name', 'department')
+    list_select_related = ('department',)
+    list_filter = ('department',)
+    search_fields = ('name', 'user__username')
+    raw_id_fields = ('user',)
+
+
+@admin.register(ExamOfficeOrAdmin)
+class ExamOfficeOrAdminAdmin(ExamOfficeModelAdmin):
+    list_display = ('office_name', 'contact_number', 'user')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Course)
+class CourseAdmin(ExamOfficeModelAdmin):
+    list_display = ('course_code', 'course_title', 'department')
+    list_select_related = ('department',)
+    list_filter = ('department',)
+    search_fields = ('course_code', 'course_title')
+
+
+@admin.register(Exam)
+class ExamAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'course', 'department', 'session', 'batch', 'exam_date')
+    list_select_related = ('course', 'department')
+    list_filter = ('department', 'session')
+    date_hierarchy = 'exam_date'
+    search_fields = ('course__course_code', 'course__course_title', 'batch')
+    autocomplete_fields = (
+        'course', 'invigilator', 'examiner1', 'examiner2', 'examiner3',
+        'question_creator', 'moderator', 'translator',
+    )
+
+    def get_queryset(self, request):
+        # Exam.__str__ reads the course, which autocomplete results also display.
+        # The changelist skips list_select_related once this is set, so it covers both.
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+
+@admin.register(ExamSchedule)
+class ExamScheduleAdmin(ExamOfficeModelAdmin):
+    list_display = ('exam', 'status', 'published_date', 'modified_date')
+    list_select_related = ('exam__course',)
+    list_filter = ('status', 'published_date')
+    search_fields = ('exam__course__course_code',)
+    autocomplete_fields = ('exam',)
+
+
+@admin.register(ExamRegistration)
+class ExamRegistrationAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'student', 'registration_type', 'status', 'payment_status', 'registration_date', 'admit_card_generated')
+    list_select_related = ('student',)
+    list_filter = ('status', 'payment_status', 'registration_type', 'admit_card_generated')
+    search_fields = ('student__registration_number', 'student__name')
+    autocomplete_fields = ('student', 'exams')
+
+
+@admin.register(Result)
+class ResultAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'exam', 'student', 'marks')
+    list_select_related = ('exam__course', 'student')
+    list_filter = ('exam__department', 'exam__session')
+    search_fields = ('student__registration_number', 'exam__course__course_code')
+    autocomplete_fields = ('exam', 'student')
+
+
+@admin.register(ClearanceAudit)
+class ClearanceAuditAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'student', 'office', 'previous', 'cleared', 'changed_by', 'changed_at')
+    list_select_related = ('student', 'changed_by')
+    list_filter = ('office', 'cleared')
+    date_hierarchy = 'changed_at'
+    search_fields = ('student__registration_number', 'sync_id')
+    raw_id_fields = ('student', 'changed_by')
+
+
+@admin.register(Room)
+class RoomAdmin(ExamOfficeModelAdmin):
+    list_display = ('name', 'building', 'rows', 'columns', 'capacity', 'is_active')
+    list_filter = ('is_active', 'building')
+    search_fields = ('name', 'building')
+
+
+@admin.register(SeatAllocation)
+class SeatAllocationAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'exam_date', 'room', 'seat_row', 'seat_column', 'exam', 'student')
+    list_select_related = ('room', 'exam__course', 'student')
+    list_filter = ('room',)
+    date_hierarchy = 'exam_date'
+    search_fields = ('student__registration_number', 'room__name')
+    raw_id_fields = ('exam', 'student')
+
+
+@admin.register(RoomInvigilation)
+class RoomInvigilationAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'exam_date', 'room', 'teacher')
+    list_select_related = ('room', 'teacher')
+    date_hierarchy = 'exam_date'
+    search_fields = ('teacher__name', 'room__name')
+    autocomplete_fields = ('teacher',)
+
+
+@admin.register(ExaminerMark)
+class ExaminerMarkAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'exam', 'student', 'examiner', 'marks')
+    list_select_related = ('exam__course', 'student')
+    list_filter = ('examiner',)
+    search_fields = ('student__registration_number', 'exam__course__course_code')
+    autocomplete_fields = ('exam', 'student')
+
+
+@admin.register(AnswerScript)
+class AnswerScriptAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'exam', 'student', 'status', 'discrepancy')
+    list_select_related = ('exam__course', 'student')
+    list_filter = ('status',)
+    search_fields = ('student__registration_number', 'exam__course__course_code')
+    autocomplete_fields = ('exam', 'student')
+
+
+@admin.register(TabulationSheet)
+class TabulationSheetAdmin(ExamOfficeModelAdmin):
+    list_display = ('student', 'session', 'batch', 'gpa', 'cgpa', 'rank', 'failed_courses')
+    list_select_related = ('student',)
+    list_filter = ('session', 'batch')
+    search_fields = ('student__registration_number', 'student__name')
+    autocomplete_fields = ('student',)
+
+
+@admin.register(MarksheetApplication)
+class MarksheetApplicationAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'student', 'exam', 'status', 'payment_status', 'application_date')
+    list_select_related = ('student', 'exam__course')
+    list_filter = ('status', 'payment_status')
+    search_fields = ('token', 'student__registration_number')
+    autocomplete_fields = ('student', 'exam')
+
+
+@admin.register(CertificateApplication)
+class CertificateApplicationAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'student', 'degree', 'status', 'payment_status', 'application_date')
+    list_select_related = ('student',)
+    list_filter = ('degree', 'status', 'payment_status')
+    search_fields = ('token', 'student__registration_number')
+    autocomplete_fields = ('student',)
+
+
+@admin.register(TeacherRemuneration)
+class TeacherRemunerationAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'teacher', 'exam', 'role', 'amount', 'status')
+    list_select_related = ('teacher', 'exam__course')
+    list_filter = ('status', 'role')
+    search_fields = ('teacher__name', 'exam__course__course_code')
+    autocomplete_fields = ('teacher', 'exam')
+
+
+@admin.register(RemunerationRate)
+class RemunerationRateAdmin(ExamOfficeModelAdmin):
+    list_display = ('role', 'base_amount', 'per_script_amount')
+
+
+@admin.register(ExamMaterials)
+class ExamMaterialsAdmin(ExamOfficeModelAdmin):
+    list_display = ('exam', 'material_type', 'quantity')
+    list_select_related = ('exam__course',)
+    list_filter = ('material_type',)
+    search_fields = ('exam__course__course_code',)
+    autocomplete_fields = ('exam',)
+
+
+@admin.register(Attendance)
+class AttendanceAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'exam', 'role', 'student', 'teacher', 'attendance_date')
+    list_select_related = ('exam__course', 'student', 'teacher')
+    list_filter = ('role', 'attendance_date')
+    date_hierarchy = 'attendance_date'
+    search_fields = ('student__registration_number', 'teacher__name')
+    autocomplete_fields = ('exam', 'student', 'teacher')
+
+
+@admin.register(Sickbed)
+class SickbedAdmin(ExamOfficeModelAdmin):
+    list_display = ('id', 'student', 'reason')
+    list_select_related = ('student',)
+    search_fields = ('student__registration_number', 'student__name')
+    autocomplete_fields = ('student',)
@@ -0,0 +1,158 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from .models import Exam, ExamRegistration
+from .pdf import Page, PAGE_WIDTH, PAGE_HEIGHT, init_render_worker, write_pdf
+from .portal import invalidate_student_portals
+
+
+# Card data
+# Workers only get plain dicts, so they never touch the database.
+
+def card_data(registration):
+    student = registration.student
+    return {
+        'registration_id': registration.pk,
+        'registration_number': student.registration_number,
+        'name': student.name,
+        'session': student.session,
+        'department_id': student.department_id,
+        'department': student.department.name,
+        'registration_type': registration.registration_type,
+        'venue': getattr(settings, 'ADMIT_CARD_VENUE', 'As per the published seat plan'),
+        'exams': [
+            (str(exam.exam_date), exam.course.course_code, exam.course.course_title)
+            for exam in registration.exams.all()
+        ],
+    }
+
+def verified_registrations(session=None, department=None):
+    registrations = ExamRegistration.objects.filter(status='Verified')
+    if session is not None:
+        registrations = registrations.filter(
+            pk__in=ExamRegistration.exams.through.objects.filter(exam__session=session).values('examregistration_id')
+        )
+    if department is not None:
+        registrations = registrations.filter(student__department=department)
+    return registrations
+
+def card_path(output_dir, card):
+    return os.path.join(
+        output_dir, str(card['department_id']),
+        f"{card['registration_number']}_{card['registration_id']}.pdf",
+    )
+
+def bundle_path(output_dir, department_id):
+    return os.path.join(output_dir, f'department_{department_id}.pdf')
+
+
+# Rendering
+
+def render_card(card):
+    page = Page()
+    top = PAGE_HEIGHT - 60
+    page.text(50, top, 'Jahangirnagar University', size=18, bold=True)
+    page.text(50, top - 22, 'Office of the Controller of Examinations', size=12)
+    page.text(50, top - 50, 'ADMIT CARD', size=16, bold=True)
+    page.line(50, top - 60, PAGE_WIDTH - 50, top - 60)
+
+    # Photo placeholder
+    page.rect(PAGE_WIDTH - 150, top - 200, 100, 120)
+    page.text(PAGE_WIDTH - 122, top - 145, 'Photo', size=10)
+
+    details = [
+        ('Name', card['name']),
+        ('Registration No.', card['registration_number']),
+        ('Department', card['department']),
+        ('Session', card['session']),
+        ('Registration Type', card['registration_type']),
+        ('Venue', card['venue']),
+    ]
+    y = top - 90
+    for label, value in details:
+        page.text(50, y, f'{label}:', bold=True)
+        page.text(170, y, value)
+        y -= 20
+
+    y -= 20
+    page.text(50, y, 'Date', bold=True)
+    page.text(150, y, 'Course Code', bold=True)
+    page.text(260, y, 'Course Title', bold=True)
+    page.line(50, y - 6, PAGE_WIDTH - 50, y - 6)
+    for exam_date, course_code, course_title in card['exams']:
+        y -= 20
+        page.text(50, y, exam_date)
+        page.text(150, y, course_code)
+        page.text(260, y, course_title[:50])
+
+    page.line(PAGE_WIDTH - 200, 110, PAGE_WIDTH - 50, 110)
+    page.text(PAGE_WIDTH - 200, 95, 'Controller of Examinations', size=10)
+    return page
+
+def write_cards(output_dir, cards):
+    """Worker: write one PDF per card and return the registration ids written."""
+    written = []
+    for card in cards:
+        write_pdf(card_path(output_dir, card), [render_card(card)])
+        written.append(card['registration_id'])
+    return written
+
+def write_bundle(path, cards):
+    """Worker: write every card of a department into one printable PDF."""
+    write_pdf(path, (render_card(card) for card in cards))
+    return len(cards)
+
+
+# Pipeline
+
+def generate_admit_cards(registrations, output_dir, workers=None, chunk_size=250, regenerate=False):
+    """
+    Render admit cards for ``registrations`` on a process pool.
+
+    Cards already flagged ``admit_card_generated`` are skipped unless ``regenerate``;
+    every department that gets a new card has its bundle rebuilt from all its cards.
+    Flags are flipped per finished chunk, so an interrupted run resumes where it stopped.
+    """
+    started = time.perf_counter()
+    pending = registrations if regenerate else registrations.filter(admit_card_generated=False)
+    departments = set(pending.values_list('student__department_id', flat=True).distinct())
+    rows = (
+        registrations.filter(student__department_id__in=departments)
+        .select_related('student__department')
+        .prefetch_related(Prefetch('exams', queryset=Exam.objects.select_related('course').order_by('exam_date')))
+        .order_by('student__department_id', 'student__registration_number')
+    )
+
+    report = {'cards': 0, 'bundles': 0}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker) as pool:
+        futures = []
+        for department_id, department_rows in groupby(
+            rows.iterator(chunk_size=2000), key=lambda registration: registration.student.department_id
+        ):
+            department_rows = list(department_rows)
+            cards = [card_data(registration) for registration in department_rows]
+            futures.append(pool.submit(write_bundle, bundle_path(output_dir, department_id), cards))
+            new_cards = [
+                card for card, registration in zip(cards, department_rows)
+                if regenerate or not registration.admit_card_generated
+            ]
+            for start in range(0, len(new_cards), chunk_size):
+                futures.append(pool.submit(write_cards, output_dir, new_cards[start:start + chunk_size]))
+
+        for future in as_completed(futures):
+            result = future.result()
+            if isinstance(result, list):
+                ExamRegistration.objects.filter(pk__in=result).update(admit_card_generated=True)
+                invalidate_student_portals(
+                    ExamRegistration.objects.filter(pk__in=result).values_list('student_id', flat=True)
+                )
+                report['cards'] += len(result)
+            else:
+                report['bundles'] += 1
+    report['seconds'] = time.perf_counter() - started
+    return report
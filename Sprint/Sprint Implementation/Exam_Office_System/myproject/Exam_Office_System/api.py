@@ -0,0 +1,265 @@
+import base64
+import hashlib
+import json
+from collections import defaultdict
+
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from .models import Student, Exam, ExamSchedule, ExamRegistration, Result
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class ApiError(ValueError):
+    pass
+
+
+# Resources
+# ``fields`` maps each public field to the ORM lookup it is read from with values(), so
+# related columns come from JOINs in the page query. ``ordering`` must be unique and
+# indexed; it is the keyset the cursor resumes from.
+
+class Resource:
+    queryset = None
+    fields = {}
+    default_fields = None
+    filters = {}
+    ordering = ('id',)
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def extra_fields(self, fields, rows):
+        """Add fields that cannot come from the page query (many-to-many) with one extra query."""
+
+
+class StudentResource(Resource):
+    queryset = Student.objects.all()
+    fields = {
+        'id': 'id',
+        'registration_number': 'registration_number',
+        'name': 'name',
+        'session': 'session',
+        'department_id': 'department_id',
+        'department': 'department__name',
+        'hall_clearance': 'hall_clearance',
+        'library_clearance': 'library_clearance',
+        'expelled': 'expelled',
+    }
+    filters = {
+        'department': 'department_id',
+        'session': 'session',
+        'registration_number': 'registration_number',
+    }
+
+
+class ExamResource(Resource):
+    queryset = Exam.objects.all()
+    fields = {
+        'id': 'id',
+        'exam_date': 'exam_date',
+        'session': 'session',
+        'batch': 'batch',
+        'department_id': 'department_id',
+        'department': 'department__name',
+        'course_id': 'course_id',
+        'course_code': 'course__course_code',
+        'course_title': 'course__course_title',
+        **{f'{field}_id': f'{field}_id' for field, _ in Exam.TEACHER_ROLE_FIELDS},
+    }
+    default_fields = [
+        'id', 'exam_date', 'session', 'batch', 'department_id', 'department', 'course_id', 'course_code', 'course_title',
+    ]
+    filters = {
+        'department': 'department_id',
+        'session': 'session',
+        'batch': 'batch',
+        'date_from': 'exam_date__gte',
+        'date_to': 'exam_date__lte',
+    }
+    # exam_date_idx serves the date-ordered keyset
+    ordering = ('exam_date', 'id')
+
+
+class ExamScheduleResource(Resource):
+    queryset = ExamSchedule.objects.all()
+    fields = {
+        'id': 'id',
+        'exam_id': 'exam_id',
+        'exam_date': 'exam__exam_date',
+        'course_code': 'exam__course__course_code',
+        'department_id': 'exam__department_id',
+        'session': 'exam__session',
+        'batch': 'exam__batch',
+        'status': 'status',
+        'published_date': 'published_date',
+        'modified_date': 'modified_date',
+    }
+    filters = {
+        'status': 'status',
+        'exam': 'exam_id',
+        'session': 'exam__session',
+        'department': 'exam__department_id',
+    }
+
+
+class ExamRegistrationResource(Resource):
+    queryset = ExamRegistration.objects.all()
+    fields = {
+        'id': 'id',
+        'student_id': 'student_id',
+        'registration_number': 'student__registration_number',
+        'registration_type': 'registration_type',
+        'registration_date': 'registration_date',
+        'status': 'status',
+        'payment_status': 'payment_status',
+        'payment_method': 'payment_method',
+        'ineligibility_reasons': 'ineligibility_reasons',
+        'admit_card_generated': 'admit_card_generated',
+        'exams': None,
+    }
+    filters = {
+        'student': 'student_id',
+        'status': 'status',
+        'payment_status': 'payment_status',
+        'registration_type': 'registration_type',
+    }
+
+    def extra_fields(self, fields, rows):
+        if 'exams' not in fields or not rows:
+            return
+        exams = defaultdict(list)
+        for registration_id, exam_id in (
+            ExamRegistration.exams.through.objects
+            .filter(examregistration_id__in=[row['id'] for row in rows])
+            .order_by('exam_id')
+            .values_list('examregistration_id', 'exam_id')
+        ):
+            exams[registration_id].append(exam_id)
+        for row in rows:
+            row['exams'] = exams[row['id']]
+
+
+class ResultResource(Resource):
+    queryset = Result.objects.all()
+    fields = {
+        'id': 'id',
+        'exam_id': 'exam_id',
+        'student_id': 'student_id',
+        'registration_number': 'student__registration_number',
+        'course_code': 'exam__course__course_code',
+        'session': 'exam__session',
+        'marks': 'marks',
+    }
+    filters = {
+        'exam': 'exam_id',
+        'student': 'student_id',
+        'session': 'exam__session',
+    }
+
+
+# Keyset pagination
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise ApiError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != length:
+        raise ApiError('Invalid cursor')
+    return values
+
+def after(ordering, values):
+    """``Q`` for rows strictly after ``values`` in ``ordering`` (ascending)."""
+    condition = Q()
+    for position in reversed(range(len(ordering))):
+        equal = Q(**{field: value for field, value in zip(ordering[:position], values)})
+        condition = (equal & Q(**{f'{ordering[position]}__gt': values[position]})) | condition
+    return condition
+
+
+# Views
+
+class ApiListView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Read-only list of ``resource`` rows as JSON.
+
+    ``?fields=a,b`` picks columns, resource filters are plain query parameters, ``limit``
+    caps the page, and ``cursor`` (from ``next``) continues after the last row returned.
+    Every page costs one query, plus one per many-to-many field requested.
+
+    Revalidation is by ``ETag`` only: the models keep dates, not timestamps, so a
+    ``Last-Modified`` would let a client keep a page that changed later the same day.
+    """
+    resource = None
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.role == 'Exam_Office' or self.request.user.is_staff
+
+    def get(self, request):
+        try:
+            response = self.page(request)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return response
+
+    def selected_fields(self, request):
+        resource = self.resource
+        if 'fields' not in request.GET:
+            return resource.default_fields or list(resource.fields)
+        fields = [field for field in request.GET['fields'].split(',') if field]
+        unknown = [field for field in fields if field not in resource.fields]
+        if unknown or not fields:
+            raise ApiError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(resource.fields)}")
+        return fields
+
+    def page(self, request):
+        resource = self.resource
+        fields = self.selected_fields(request)
+        try:
+            limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            raise ApiError('limit must be a number')
+        if limit < 1:
+            raise ApiError('limit must be positive')
+
+        try:
+            queryset = resource.get_queryset().filter(**{
+                lookup: request.GET[parameter] for parameter, lookup in resource.filters.items() if parameter in request.GET
+            })
+            if 'cursor' in request.GET:
+                cursor = decode_cursor(request.GET['cursor'], len(resource.ordering))
+                queryset = queryset.filter(after(resource.ordering, cursor))
+            lookups = {resource.fields[field] for field in fields if resource.fields[field]} | set(resource.ordering)
+            rows = list(queryset.order_by(*resource.ordering).values(*lookups)[:limit + 1])
+        except (ValueError, TypeError, ValidationError) as error:
+            raise ApiError(f'Invalid filter or cursor: {error}')
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        next_url = None
+        if has_next:
+            query = request.GET.copy()
+            query['cursor'] = encode_cursor([rows[-1][field] for field in resource.ordering])
+            next_url = f'{request.path}?{query.urlencode()}'
+
+        resource.extra_fields(fields, rows)
+        results = [
+            {field: row[resource.fields[field]] if resource.fields[field] else row[field] for field in fields}
+            for row in rows
+        ]
+        response = JsonResponse({'results': results, 'next': next_url})
+        etag = '"%s"' % hashlib.sha256(response.content).hexdigest()[:32]
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return get_conditional_response(request, etag=etag, response=response)
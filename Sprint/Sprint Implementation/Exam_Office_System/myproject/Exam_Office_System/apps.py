@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ExamOfficeSystemConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Exam_Office_System'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .database import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid='configure_sqlite')
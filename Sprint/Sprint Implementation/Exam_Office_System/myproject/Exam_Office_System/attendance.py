@@ -0,0 +1,159 @@
+import base64
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .models import Attendance, ExamRegistration, Student
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'present', 'p'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'absent', 'a'}
+
+
+class SheetError(ValueError):
+    """An attendance sheet that could not be read or does not match the exam."""
+
+    def __init__(self, message, unknown=()):
+        super().__init__(message)
+        self.unknown = list(unknown)
+
+
+# Reading sheets
+# A sheet is one hall's list of (registration number, present) pairs; students of the exam
+# who are not on the sheet (other halls) are left untouched.
+
+def _present(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise SheetError(f'Unrecognised attendance value {value!r}')
+
+def _date(value):
+    try:
+        date = parse_date(value) if isinstance(value, str) else None
+    except ValueError:
+        date = None
+    if date is None:
+        raise SheetError('attendance_date must be YYYY-MM-DD')
+    return date
+
+def read_json_sheet(data):
+    """
+    Accept ``{"attendance_date": ..., "students": [{"registration_number": ..., "present": ...}]}``
+    or the shorter ``{"present": [...], "absent": [...]}``.
+    """
+    try:
+        sheet = json.loads(data)
+    except ValueError as error:
+        raise SheetError(f'Invalid JSON: {error}')
+    if not isinstance(sheet, dict):
+        raise SheetError('Expected a JSON object')
+    if 'students' in sheet:
+        if not isinstance(sheet['students'], list):
+            raise SheetError('students must be a list')
+        try:
+            rows = [(str(row['registration_number']), _present(row.get('present', True))) for row in sheet['students']]
+        except (KeyError, TypeError, AttributeError):
+            raise SheetError('Every student needs a registration_number')
+    else:
+        for key in ('present', 'absent'):
+            if not isinstance(sheet.get(key, []), list):
+                raise SheetError(f'{key} must be a list of registration numbers')
+        rows = [(str(number), True) for number in sheet.get('present', [])]
+        rows += [(str(number), False) for number in sheet.get('absent', [])]
+    attendance_date = sheet.get('attendance_date')
+    return rows, _date(attendance_date) if attendance_date is not None else None
+
+def read_csv_sheet(data):
+    """Accept CSV with ``registration_number`` and an optional ``present`` column."""
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise SheetError('File is not UTF-8 encoded')
+    reader = csv.DictReader(io.StringIO(data))
+    if not reader.fieldnames or 'registration_number' not in reader.fieldnames:
+        raise SheetError('CSV needs a registration_number column')
+    return [
+        (row['registration_number'].strip(), _present(row.get('present') or True))
+        for row in reader if row['registration_number'] and row['registration_number'].strip()
+    ], None
+
+def read_sheet(data, content_type):
+    if 'csv' in content_type:
+        return read_csv_sheet(data)
+    return read_json_sheet(data)
+
+
+# Writing
+
+def exam_registrants(exam):
+    """``{registration_number: student_id}`` of the exam's non-rejected registrations, in one query."""
+    return dict(
+        Student.objects.filter(
+            pk__in=ExamRegistration.exams.through.objects
+            .filter(exam=exam)
+            .exclude(examregistration__status='Rejected')
+            .values('examregistration__student_id')
+        ).values_list('registration_number', 'id')
+    )
+
+def record_attendance(exam, rows, attendance_date=None, batch_size=1000):
+    """
+    Record one hall's sheet for ``exam`` in a single transaction.
+
+    Present students get an attendance row (existing rows are kept) and students marked
+    absent lose theirs, so resubmitting a corrected sheet gives the same result.
+    Raises ``SheetError`` without writing anything if a student is not registered.
+    """
+    registrants = exam_registrants(exam)
+    unknown = sorted({number for number, _ in rows if number not in registrants})
+    if unknown:
+        raise SheetError(f'{len(unknown)} students are not registered for this exam', unknown)
+    attendance_date = attendance_date or exam.exam_date
+    present = {registrants[number] for number, is_present in rows if is_present}
+    absent = {registrants[number] for number, is_present in rows if not is_present} - present
+
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            [
+                Attendance(exam=exam, student_id=student_id, role='Student', attendance_date=attendance_date)
+                for student_id in present
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        removed, _ = Attendance.objects.filter(exam=exam, role='Student', student_id__in=absent).delete()
+    return {'present': len(present), 'absent': len(absent), 'removed': removed}
+
+
+# Bitmaps
+
+def _bitmap(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 0x80 >> (position & 7)
+    return base64.b64encode(bytes(bits)).decode()
+
+def attendance_bitmaps(exam):
+    """
+    Present and absent bitmaps over the exam's registrants ordered by student id.
+
+    Bit ``i`` (most significant bit first) stands for the ``i``-th student id, so clients
+    that hold the roster need only two short base64 strings per exam.
+    """
+    student_ids = sorted(exam_registrants(exam).values())
+    index = {student_id: position for position, student_id in enumerate(student_ids)}
+    present = [
+        index[student_id]
+        for student_id in Attendance.objects.filter(exam=exam, role='Student').values_list('student_id', flat=True)
+        if student_id in index
+    ]
+    absent = sorted(set(range(len(student_ids))) - set(present))
+    return student_ids, _bitmap(present, len(student_ids)), _bitmap(absent, len(student_ids))
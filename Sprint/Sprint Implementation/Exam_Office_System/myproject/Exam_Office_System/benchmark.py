@@ -0,0 +1,236 @@
+import io
+import math
+import platform
+import time
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .eligibility import evaluate_registrations
+from .models import User, Department, Student, Teacher, Exam, ExamRegistration, Result, TeacherRemuneration
+from .remuneration import calculate_remuneration, export_payment_batch
+from .tabulation import save_tabulation, tabulate_session
+
+
+def benchmark_client(user=None):
+    # Requests go through the full middleware stack, so the host must pass ALLOWED_HOSTS
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+    client = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+class Flow:
+    """
+    One timed user flow.
+
+    ``prepare(context, iterations)`` runs untimed and returns one argument per iteration;
+    ``run(argument)`` is timed. Flows that write run in a transaction that is rolled back,
+    so a benchmark leaves the database as it found it.
+    """
+
+    def __init__(self, name, prepare, run, writes=False):
+        self.name = name
+        self.prepare = prepare
+        self.run = run
+        self.writes = writes
+
+
+class BenchmarkContext:
+    """The synthetic university (see ``synthetic.py``) the flows pick their subjects from."""
+
+    def __init__(self, prefix='syn', password='password'):
+        self.prefix = prefix
+        self.password = password
+        self.office = User.objects.filter(username=f'{prefix}-office').first()
+        if self.office is None:
+            raise ValueError(f'No synthetic university with prefix {prefix!r}; run generate_university first')
+        self.students = Student.objects.filter(user__username__startswith=f'{prefix}-')
+        self.teachers = Teacher.objects.filter(user__username__startswith=f'{prefix}-')
+        self.departments = Department.objects.filter(user__username__startswith=f'{prefix}-')
+        self.session = str(timezone.localdate().year)
+        self.previous_session = str(timezone.localdate().year - 1)
+
+    def sample(self, queryset, count):
+        """``count`` rows spread evenly over ``queryset``, so iterations do not reuse one cached subject."""
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        if not ids:
+            raise ValueError(f'No {queryset.model.__name__} rows to benchmark')
+        step = max(len(ids) // count, 1)
+        return [ids[(number * step) % len(ids)] for number in range(count)]
+
+    def client(self, user=None):
+        return benchmark_client(user)
+
+    def dataset(self):
+        return {
+            'students': self.students.count(),
+            'teachers': self.teachers.count(),
+            'exams': Exam.objects.count(),
+            'registrations': ExamRegistration.objects.count(),
+            'results': Result.objects.count(),
+        }
+
+
+# Flows
+
+def _get(url, status=200):
+    def run(client):
+        response = client.get(url)
+        if response.status_code != status:
+            raise AssertionError(f'GET {url} returned {response.status_code}')
+    return run
+
+def _office_client(context, iterations):
+    return [context.client(context.office)] * iterations
+
+def _login(context, iterations):
+    usernames = User.objects.filter(student_profile__in=context.sample(context.students, iterations))
+    return [
+        (context.client(), username, context.password)
+        for username in usernames.values_list('username', flat=True)
+    ]
+
+def _run_login(argument):
+    client, username, password = argument
+    response = client.post(reverse('login'), {'username': username, 'password': password})
+    if response.status_code != 302:
+        raise AssertionError(f'Login as {username} failed')
+
+def _role_dashboards(queryset_name):
+    def prepare(context, iterations):
+        queryset = getattr(context, queryset_name)
+        users = queryset.model.objects.filter(pk__in=context.sample(queryset, iterations)).select_related('user')
+        return [context.client(profile.user) for profile in users]
+    return prepare
+
+def _registration(context, iterations):
+    students = Student.objects.filter(pk__in=context.sample(context.students, iterations))
+    return [
+        (student, list(Exam.objects.filter(
+            department_id=student.department_id, session=context.session,
+            registrations__student=student,
+        ).values_list('pk', flat=True)))
+        for student in students
+    ]
+
+def _run_registration(argument):
+    student, exam_ids = argument
+    registration = ExamRegistration.objects.create(student=student, registration_type='Retake')
+    registration.exams.set(exam_ids)
+    evaluate_registrations(ExamRegistration.objects.filter(pk=registration.pk))
+
+def _tabulation(context, iterations):
+    departments = context.sample(context.departments, iterations)
+    return [(context.previous_session, department) for department in departments]
+
+def _run_tabulation(argument):
+    session, department = argument
+    save_tabulation(tabulate_session(session, department))
+
+def _remuneration_export(context, iterations):
+    departments = context.sample(context.departments, iterations)
+    return [Exam.objects.filter(department_id=department, session=context.previous_session) for department in departments]
+
+def _run_remuneration_export(exams):
+    calculate_remuneration(exams)
+    export_payment_batch(TeacherRemuneration.objects.filter(exam__in=exams), io.StringIO())
+
+def default_flows():
+    return [
+        Flow('login', _login, _run_login),
+        Flow('dashboard.student', _role_dashboards('students'), _get(reverse('dashboard'))),
+        Flow('dashboard.teacher', _role_dashboards('teachers'), _get(reverse('dashboard'))),
+        Flow('dashboard.department', _role_dashboards('departments'), _get(reverse('dashboard'))),
+        Flow('dashboard.exam_office', _office_client, _get(reverse('dashboard'))),
+        Flow('registration', _registration, _run_registration, writes=True),
+        Flow('admin.students', _office_client, _get(reverse('admin:Exam_Office_System_student_changelist'))),
+        Flow('admin.students.search', _office_client,
+             _get(reverse('admin:Exam_Office_System_student_changelist') + '?q=D07')),
+        Flow('admin.registrations', _office_client,
+             _get(reverse('admin:Exam_Office_System_examregistration_changelist'))),
+        Flow('admin.results', _office_client, _get(reverse('admin:Exam_Office_System_result_changelist'))),
+        Flow('tabulation', _tabulation, _run_tabulation, writes=True),
+        Flow('export.api_results', _office_client, _get(reverse('api_results') + '?limit=1000')),
+        Flow('export.duty_roster', _office_client, _get(reverse('duty_roster_csv'))),
+        Flow('export.remuneration', _remuneration_export, _run_remuneration_export, writes=True),
+    ]
+
+
+# Running
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+def run_flow(flow, context, iterations=20, warmup=2):
+    """Time ``iterations`` runs of ``flow`` after ``warmup`` untimed ones; returns its statistics."""
+    arguments = flow.prepare(context, iterations + warmup)
+    timings, queries = [], []
+    for number, argument in enumerate(arguments):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                flow.run(argument)
+                elapsed = time.perf_counter() - started
+            if flow.writes:
+                transaction.set_rollback(True)
+        if number >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(len(captured))
+    return {
+        'iterations': len(timings),
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p90_ms': round(percentile(timings, 0.9), 2),
+        'p99_ms': round(percentile(timings, 0.99), 2),
+        'max_ms': round(max(timings), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': max(queries),
+    }
+
+def run_benchmarks(context, flows, iterations=20, warmup=2, stdout=None):
+    results = {}
+    for flow in flows:
+        results[flow.name] = run_flow(flow, context, iterations, warmup)
+        if stdout:
+            stats = results[flow.name]
+            stdout.write(
+                f"{flow.name:<26} p50 {stats['p50_ms']:>8.1f}ms  p90 {stats['p90_ms']:>8.1f}ms  "
+                f"p99 {stats['p99_ms']:>8.1f}ms  {stats['queries']:>4} queries"
+            )
+    return {
+        'created': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'dataset': context.dataset(),
+        'flows': results,
+    }
+
+
+# Baselines
+
+def compare(baseline, current, tolerance=0.25, floor_ms=2.0):
+    """
+    Flows slower or chattier than ``baseline``: ``(flow, message)`` pairs.
+
+    A flow regresses when its p50 grows by more than ``tolerance`` (and by more than
+    ``floor_ms``, to ignore noise on fast flows) or when it issues more queries.
+    """
+    regressions = []
+    for name, stats in current['flows'].items():
+        before = baseline.get('flows', {}).get(name)
+        if before is None:
+            continue
+        if stats['p50_ms'] > before['p50_ms'] * (1 + tolerance) and stats['p50_ms'] - before['p50_ms'] > floor_ms:
+            regressions.append((name, f"p50 {before['p50_ms']}ms -> {stats['p50_ms']}ms"))
+        if stats['queries'] > before['queries']:
+            regressions.append((name, f"queries {before['queries']} -> {stats['queries']}"))
+    return regressions
@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import time
+import uuid
+
+from django.db import transaction
+
+from .attendance import FALSE_VALUES, TRUE_VALUES, SheetError
+from .models import ClearanceAudit, Student
+from .portal import invalidate_student_portals
+
+OFFICE_FIELDS = {
+    'hall': 'hall_clearance',
+    'library': 'library_clearance',
+}
+
+
+class ClearanceSync:
+    def __init__(self, office, sync_id):
+        self.office = office
+        self.sync_id = sync_id
+        self.received = 0
+        self.cleared = 0
+        self.uncleared = 0
+        self.unchanged = 0
+        self.unknown = []
+        self.seconds = 0
+
+    @property
+    def changed(self):
+        return self.cleared + self.uncleared
+
+
+# Reading lists
+
+def _cleared(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES | {'cleared'}:
+        return True
+    if text in FALSE_VALUES | {'uncleared'}:
+        return False
+    raise SheetError(f'Unrecognised clearance value {value!r}')
+
+def read_clearance_list(data, content_type):
+    """
+    Read ``(registration_number, cleared)`` pairs from JSON (``{"cleared": [...], "uncleared": [...]}``
+    or ``{"students": [{"registration_number": ..., "cleared": ...}]}``) or from CSV with
+    ``registration_number`` and ``cleared`` columns.
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise SheetError('File is not UTF-8 encoded')
+    if 'csv' in content_type:
+        reader = csv.DictReader(io.StringIO(data))
+        if not reader.fieldnames or not {'registration_number', 'cleared'} <= set(reader.fieldnames):
+            raise SheetError('CSV needs registration_number and cleared columns')
+        return [
+            (row['registration_number'].strip(), _cleared(row['cleared']))
+            for row in reader if (row['registration_number'] or '').strip()
+        ]
+    try:
+        payload = json.loads(data)
+    except ValueError as error:
+        raise SheetError(f'Invalid JSON: {error}')
+    if not isinstance(payload, dict):
+        raise SheetError('Expected a JSON object')
+    if 'students' in payload:
+        if not isinstance(payload['students'], list):
+            raise SheetError('students must be a list')
+        try:
+            return [(str(row['registration_number']), _cleared(row['cleared'])) for row in payload['students']]
+        except (KeyError, TypeError):
+            raise SheetError('Every student needs registration_number and cleared')
+    for key in ('cleared', 'uncleared'):
+        if not isinstance(payload.get(key, []), list):
+            raise SheetError(f'{key} must be a list of registration numbers')
+    return (
+        [(str(number), True) for number in payload.get('cleared', [])]
+        + [(str(number), False) for number in payload.get('uncleared', [])]
+    )
+
+
+# Sync
+
+def sync_clearance(office, entries, changed_by=None, dry_run=False, chunk_size=1000):
+    """
+    Apply an office's clearance list to ``Student`` and audit every change.
+
+    Current state is read only for the listed registration numbers, ``chunk_size`` at a time,
+    and diffed in memory; only the students whose flag changes are written, and an entry
+    listed twice keeps its last value.
+    Unknown registration numbers are reported, not fatal.
+    """
+    field = OFFICE_FIELDS[office]
+    report = ClearanceSync(office, uuid.uuid4())
+    started = time.perf_counter()
+    wanted = dict(entries)
+    report.received = len(wanted)
+
+    numbers = list(wanted)
+    current = {}
+    for start in range(0, len(numbers), chunk_size):
+        current.update(
+            (number, (student_id, value))
+            for number, student_id, value in Student.objects.filter(
+                registration_number__in=numbers[start:start + chunk_size],
+            ).values_list('registration_number', 'id', field)
+        )
+    changes = {True: [], False: []}
+    audits = []
+    for number, cleared in wanted.items():
+        if number not in current:
+            report.unknown.append(number)
+            continue
+        student_id, previous = current[number]
+        if previous is cleared:
+            report.unchanged += 1
+            continue
+        changes[cleared].append(student_id)
+        audits.append(ClearanceAudit(
+            student_id=student_id, office=office, previous=previous, cleared=cleared,
+            sync_id=report.sync_id, changed_by=changed_by,
+        ))
+    report.cleared = len(changes[True])
+    report.uncleared = len(changes[False])
+
+    if not dry_run:
+        with transaction.atomic():
+            # Every changed row gets one of two values, so plain UPDATEs per chunk of ids
+            # do the job of bulk_update without its per-row CASE expression
+            for cleared, student_ids in changes.items():
+                for start in range(0, len(student_ids), chunk_size):
+                    Student.objects.filter(pk__in=student_ids[start:start + chunk_size]).update(**{field: cleared})
+            ClearanceAudit.objects.bulk_create(audits, batch_size=chunk_size)
+        invalidate_student_portals(changes[True] + changes[False])
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,88 @@
+from collections import defaultdict, namedtuple
+
+from django.db.models import Q
+
+from .models import Exam, ExamRegistration
+
+# A clash between exams on the same date: ``kind`` is 'batch' (same department,
+# session and batch), 'teacher' (same teacher assigned to both) or 'student' (same
+# candidate registered for both, e.g. a retake), ``key`` says which.
+Conflict = namedtuple('Conflict', ['kind', 'exam_date', 'key', 'exam_ids'])
+
+ALL_ROLES = tuple(field for field, label in Exam.TEACHER_ROLE_FIELDS)
+
+
+def exam_rows(queryset):
+    """Fetch just the columns conflict detection needs, in one query."""
+    fields = ['id', 'department_id', 'session', 'batch', 'exam_date'] + [f'{role}_id' for role in ALL_ROLES]
+    return queryset.values(*fields).iterator(chunk_size=5000)
+
+
+def registration_rows(exams, students=None):
+    """``(exam_id, exam_date, student_id)`` of every non-rejected registration for ``exams``, in one query."""
+    rows = (
+        ExamRegistration.exams.through.objects
+        .filter(exam__in=exams)
+        .exclude(examregistration__status='Rejected')
+    )
+    if students is not None:
+        rows = rows.filter(examregistration__student__in=students)
+    return rows.values_list('exam_id', 'exam__exam_date', 'examregistration__student_id').iterator(chunk_size=5000)
+
+
+def find_conflicts(exams, roles=ALL_ROLES, registrations=()):
+    """
+    Report every batch, teacher and student clash among ``exams`` (dicts from
+    ``exam_rows``) and ``registrations`` (triples from ``registration_rows``).
+
+    Exams are bucketed by (department, session, batch, date) and by (teacher, date),
+    registrations by (student, date), in a single pass, so the cost grows with the
+    number of rows, not their pairs.
+    """
+    by_batch = defaultdict(list)
+    by_teacher = defaultdict(list)
+    by_student = defaultdict(set)
+    for exam in exams:
+        exam_date = exam['exam_date']
+        by_batch[(exam['department_id'], exam['session'], exam['batch'], exam_date)].append(exam['id'])
+        teachers = {exam[f'{role}_id'] for role in roles}
+        teachers.discard(None)
+        for teacher_id in teachers:
+            by_teacher[(teacher_id, exam_date)].append(exam['id'])
+    for exam_id, exam_date, student_id in registrations:
+        # A set: regular and retake registrations may both list the exam
+        by_student[(student_id, exam_date)].add(exam_id)
+
+    conflicts = [
+        Conflict('batch', key[3], key[:3], exam_ids)
+        for key, exam_ids in by_batch.items() if len(exam_ids) > 1
+    ]
+    conflicts += [
+        Conflict('teacher', key[1], key[0], exam_ids)
+        for key, exam_ids in by_teacher.items() if len(exam_ids) > 1
+    ]
+    conflicts += [
+        Conflict('student', key[1], key[0], sorted(exam_ids))
+        for key, exam_ids in by_student.items() if len(exam_ids) > 1
+    ]
+    conflicts.sort(key=lambda conflict: (conflict.exam_date, conflict.kind))
+    return conflicts
+
+
+def exam_conflicts(exam, roles=ALL_ROLES):
+    """Conflicts involving the saved ``exam``, checked against the other exams on its date only."""
+    teacher_ids = {getattr(exam, f'{role}_id') for role in roles}
+    teacher_ids.discard(None)
+    clashing = Q(department_id=exam.department_id, session=exam.session, batch=exam.batch)
+    if teacher_ids:
+        for role in roles:
+            clashing |= Q(**{f'{role}_id__in': teacher_ids})
+    candidates = list(exam_rows(Exam.objects.filter(clashing, exam_date=exam.exam_date).exclude(pk=exam.pk)))
+    candidates.append({
+        'id': exam.pk, 'department_id': exam.department_id, 'session': exam.session,
+        'batch': exam.batch, 'exam_date': exam.exam_date,
+        **{f'{role}_id': getattr(exam, f'{role}_id') for role in ALL_ROLES},
+    })
+    students = ExamRegistration.objects.filter(exams=exam).exclude(status='Rejected').values('student_id')
+    registrations = registration_rows(Exam.objects.filter(exam_date=exam.exam_date), students)
+    return [conflict for conflict in find_conflicts(candidates, roles, registrations) if exam.pk in conflict.exam_ids]
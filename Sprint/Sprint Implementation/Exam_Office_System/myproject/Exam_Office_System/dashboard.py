@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum, Avg
+from django.utils import timezone
+
+from .models import Student, Exam, ExamRegistration, TeacherRemuneration, Result
+from .routing import stale_cache_timeout
+
+UPCOMING_LIMIT = 10
+
+
+# Cache keys
+
+def summary_cache_key(role, pk=None):
+    return f'dashboard:{role}:{pk}' if pk is not None else f'dashboard:{role}'
+
+def teacher_summary_version():
+    # Exam edits can move any of seven teacher FKs, so teacher summaries are
+    # invalidated together by bumping this version instead of key by key.
+    return cache.get_or_set('dashboard:teacher:version', 1, None)
+
+def invalidate_teacher_summaries():
+    try:
+        cache.incr('dashboard:teacher:version')
+    except ValueError:
+        cache.set('dashboard:teacher:version', 2, None)
+
+
+def get_dashboard_summary(user):
+    """Return the cached workload summary shown on ``user``'s role dashboard."""
+    # A summary read from a lagging replica must not outlive the lag
+    timeout = stale_cache_timeout(getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+    if user.role == 'Exam_Office':
+        return cache.get_or_set(summary_cache_key('exam_office'), exam_office_summary, timeout)
+    if user.role == 'Department' and hasattr(user, 'department_profile'):
+        department = user.department_profile
+        return cache.get_or_set(summary_cache_key('department', department.pk),
+                                lambda: department_summary(department.pk), timeout)
+    if user.role == 'Teacher' and hasattr(user, 'teacher_profile'):
+        teacher = user.teacher_profile
+        return cache.get_or_set(summary_cache_key('teacher', teacher.pk),
+                                lambda: teacher_summary(teacher.pk), timeout,
+                                version=teacher_summary_version())
+    if user.role == 'Student' and hasattr(user, 'student_profile'):
+        student = user.student_profile
+        return cache.get_or_set(summary_cache_key('student', student.pk),
+                                lambda: student_summary(student.pk), timeout)
+    return {}
+
+
+# Summaries
+
+def _upcoming_exams(queryset):
+    return list(
+        queryset.filter(exam_date__gte=timezone.localdate())
+        .order_by('exam_date')
+        .values('id', 'course__course_code', 'course__course_title', 'department__name', 'batch', 'session', 'exam_date')
+        [:UPCOMING_LIMIT]
+    )
+
+def exam_office_summary():
+    registrations = ExamRegistration.objects.aggregate(
+        pending=Count('id', filter=Q(status='Pending')),
+        unpaid=Count('id', filter=Q(payment_status='Pending')),
+    )
+    remunerations = TeacherRemuneration.objects.filter(status='Pending').aggregate(
+        count=Count('id'),
+        amount=Sum('amount'),
+    )
+    return {
+        'pending_registrations': registrations['pending'],
+        'unpaid_registrations': registrations['unpaid'],
+        'unpaid_remunerations': remunerations['count'],
+        'unpaid_remuneration_amount': remunerations['amount'] or 0,
+        'upcoming_exams': _upcoming_exams(Exam.objects.all()),
+    }
+
+def department_summary(department_id):
+    students_by_session = list(
+        Student.objects.filter(department_id=department_id)
+        .values('session')
+        .annotate(count=Count('id'))
+        .order_by('session')
+    )
+    exams = Exam.objects.filter(department_id=department_id).aggregate(
+        total=Count('id'),
+        upcoming=Count('id', filter=Q(exam_date__gte=timezone.localdate())),
+        unscheduled=Count('id', filter=Q(schedule__isnull=True)),
+    )
+    return {
+        'students': sum(row['count'] for row in students_by_session),
+        'students_by_session': students_by_session,
+        'exams': exams['total'],
+        'upcoming_exam_count': exams['upcoming'],
+        'unscheduled_exams': exams['unscheduled'],
+        'upcoming_exams': _upcoming_exams(Exam.objects.filter(department_id=department_id)),
+    }
+
+def teacher_summary(teacher_id):
+    assigned = Q()
+    role_fields = dict(Exam.TEACHER_ROLE_FIELDS)
+    for field in role_fields:
+        assigned |= Q(**{field: teacher_id})
+    exams = Exam.objects.filter(assigned)
+    counts = exams.aggregate(
+        upcoming=Count('id', filter=Q(exam_date__gte=timezone.localdate())),
+        **{field: Count('id', filter=Q(**{field: teacher_id})) for field in role_fields},
+    )
+    return {
+        'duties': [
+            {'role': label, 'count': counts[field]}
+            for field, label in role_fields.items() if counts[field]
+        ],
+        'total_duties': sum(counts[field] for field in role_fields),
+        'upcoming_duty_count': counts['upcoming'],
+        'upcoming_exams': _upcoming_exams(exams),
+    }
+
+def student_summary(student_id):
+    registrations = ExamRegistration.objects.filter(student_id=student_id).aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='Pending')),
+        verified=Count('id', filter=Q(status='Verified')),
+        rejected=Count('id', filter=Q(status='Rejected')),
+    )
+    results = Result.objects.filter(student_id=student_id).aggregate(
+        count=Count('id'),
+        average=Avg('marks'),
+    )
+    return {
+        'registrations': registrations,
+        'results': results['count'],
+        'average_marks': round(results['average'], 2) if results['average'] is not None else None,
+        'upcoming_exams': _upcoming_exams(Exam.objects.filter(registrations__student_id=student_id).distinct()),
+    }
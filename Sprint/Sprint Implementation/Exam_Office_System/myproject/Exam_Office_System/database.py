@@ -0,0 +1,73 @@
+import os
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# SQLite tuning
+# Django 5.0 has no SQLite options for pragmas or the transaction mode, so both are set
+# on every new connection from the connection_created signal (see apps.py).
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    if getattr(settings, 'SQLITE_IMMEDIATE_TRANSACTIONS', False):
+        connection._start_transaction_under_autocommit = lambda: connection.cursor().execute('BEGIN IMMEDIATE')
+
+def sqlite_settings(connection):
+    """Current values of the tuned pragmas, for checking a deployment."""
+    with connection.cursor() as cursor:
+        values = {}
+        for name in getattr(settings, 'SQLITE_PRAGMAS', {}):
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
+
+
+# Replicas
+# PostgreSQL replicas are fed by streaming replication. SQLite has none, so a local
+# replica is a copy refreshed by sync_sqlite_replica (the sync_replicas command), which
+# stamps the copy's user_version with the time it was taken.
+
+POSTGRES_LAG_SQL = '''
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+'''
+
+def _sqlite_changed_at(path):
+    # In WAL mode commits land in the -wal file until a checkpoint moves them
+    times = [os.path.getmtime(name) for name in (path, f'{path}-wal') if os.path.exists(name)]
+    return max(times, default=0)
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind the primary (0 when caught up)."""
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA user_version')
+            synced_at = cursor.fetchone()[0]
+        return max(_sqlite_changed_at(str(connections[DEFAULT_DB_ALIAS].settings_dict['NAME'])) - synced_at, 0)
+    return 0
+
+def sync_sqlite_replica(alias):
+    """Copy the SQLite primary onto replica ``alias``; returns the seconds it took."""
+    primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+    if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+        raise ValueError('Only SQLite replicas are synced here; PostgreSQL replicas follow the primary themselves')
+    started = time.time()
+    primary.ensure_connection()
+    replica.ensure_connection()
+    # The online backup copies a consistent snapshot while the primary keeps taking writes
+    primary.connection.backup(replica.connection)
+    replica.connection.execute(f'PRAGMA user_version = {int(started)}')
+    replica.connection.commit()
+    return time.time() - started
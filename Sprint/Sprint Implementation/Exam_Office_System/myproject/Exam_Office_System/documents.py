@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+
+from .models import MarksheetApplication, CertificateApplication, Result, TabulationSheet
+from .pdf import Page, PAGE_WIDTH, PAGE_HEIGHT, init_render_worker, write_pdf
+from .tabulation import GradingScale
+
+DOCUMENT_KINDS = ('marksheet', 'certificate')
+
+
+class DocumentNotReady(ValueError):
+    """The application is approved, but what the document certifies is not published yet."""
+
+
+# Document data
+# Workers only get plain dicts, so they never touch the database. A document's file name
+# carries the hash of its data, so a corrected result renders a new file on next download.
+
+def approved_applications(kind):
+    if kind == 'marksheet':
+        return MarksheetApplication.objects.filter(status='Approved').select_related(
+            'student__department', 'exam__course',
+        )
+    return CertificateApplication.objects.filter(status='Approved').select_related('student__department')
+
+def _student_data(student):
+    return {
+        'name': student.name,
+        'registration_number': student.registration_number,
+        'department': student.department.name,
+        'session': student.session,
+    }
+
+def marksheet_data(applications):
+    """Data for every marksheet application, with their results read in one query."""
+    applications = list(applications)
+    marks = dict(
+        ((exam_id, student_id), marks) for exam_id, student_id, marks in Result.objects.filter(
+            exam_id__in={application.exam_id for application in applications},
+            student_id__in={application.student_id for application in applications},
+        ).values_list('exam_id', 'student_id', 'marks')
+    )
+    scale = GradingScale()
+    documents = []
+    for application in applications:
+        exam = application.exam
+        result = marks.get((exam.pk, application.student_id))
+        documents.append({
+            'kind': 'marksheet',
+            'token': application.token,
+            **_student_data(application.student),
+            'exam_session': exam.session,
+            'batch': exam.batch,
+            'course_code': exam.course.course_code,
+            'course_title': exam.course.course_title,
+            'exam_date': str(exam.exam_date),
+            'marks': result,
+            'letter_grade': None if result is None else str(scale.letter(result)),
+            'grade_point': None if result is None else f'{scale.grade_points(result):.2f}',
+        })
+    return documents
+
+def certificate_data(applications):
+    """Data for every certificate application, with CGPAs from the latest tabulation in one query."""
+    applications = list(applications)
+    cgpa = {}
+    for student_id, value in (
+        TabulationSheet.objects
+        .filter(student_id__in={application.student_id for application in applications})
+        .order_by('student_id', '-session')
+        .values_list('student_id', 'cgpa')
+    ):
+        cgpa.setdefault(student_id, value)
+    return [
+        {
+            'kind': 'certificate',
+            'token': application.token,
+            **_student_data(application.student),
+            'degree': application.get_degree_display(),
+            'cgpa': None if application.student_id not in cgpa else str(cgpa[application.student_id]),
+        }
+        for application in applications
+    ]
+
+def document_ready(document):
+    # A marksheet without a result would certify nothing
+    return document['kind'] != 'marksheet' or document['marks'] is not None
+
+def document_data(kind, applications):
+    return marksheet_data(applications) if kind == 'marksheet' else certificate_data(applications)
+
+def content_hash(document):
+    return hashlib.sha256(json.dumps(document, sort_keys=True).encode()).hexdigest()
+
+def document_path(output_dir, document, digest=None):
+    digest = digest or content_hash(document)
+    return os.path.join(output_dir, document['kind'], f"{document['token']}-{digest[:16]}.pdf")
+
+
+# Rendering
+
+def _header(page, title):
+    top = PAGE_HEIGHT - 60
+    page.text(50, top, 'Jahangirnagar University', size=18, bold=True)
+    page.text(50, top - 22, 'Office of the Controller of Examinations', size=12)
+    page.text(50, top - 50, title, size=16, bold=True)
+    page.line(50, top - 60, PAGE_WIDTH - 50, top - 60)
+    return top - 90
+
+def _details(page, y, details):
+    for label, value in details:
+        page.text(50, y, f'{label}:', bold=True)
+        page.text(190, y, '-' if value is None else value)
+        y -= 20
+    return y
+
+def _footer(page, document):
+    page.text(50, 95, f"Verification token: {document['token']}", size=9)
+    page.line(PAGE_WIDTH - 200, 110, PAGE_WIDTH - 50, 110)
+    page.text(PAGE_WIDTH - 200, 95, 'Controller of Examinations', size=10)
+
+def render_marksheet(document):
+    page = Page()
+    y = _header(page, 'MARKSHEET')
+    y = _details(page, y, [
+        ('Name', document['name']),
+        ('Registration No.', document['registration_number']),
+        ('Department', document['department']),
+        ('Student Session', document['session']),
+        ('Exam Session', document['exam_session']),
+        ('Batch', document['batch']),
+    ])
+    y -= 20
+    page.text(50, y, 'Course Code', bold=True)
+    page.text(150, y, 'Course Title', bold=True)
+    page.text(380, y, 'Marks', bold=True)
+    page.text(430, y, 'Grade', bold=True)
+    page.text(480, y, 'Point', bold=True)
+    page.line(50, y - 6, PAGE_WIDTH - 50, y - 6)
+    y -= 20
+    page.text(50, y, document['course_code'])
+    page.text(150, y, document['course_title'][:40])
+    page.text(380, y, document['marks'])
+    page.text(430, y, document['letter_grade'])
+    page.text(480, y, document['grade_point'])
+    _footer(page, document)
+    return page
+
+def render_certificate(document):
+    page = Page()
+    y = _header(page, 'DEGREE CERTIFICATE')
+    page.text(50, y, 'This is to certify that', size=12)
+    page.text(50, y - 30, document['name'], size=16, bold=True)
+    y = _details(page, y - 70, [
+        ('Registration No.', document['registration_number']),
+        ('Department', document['department']),
+        ('Session', document['session']),
+        ('Degree', document['degree']),
+        ('CGPA', document['cgpa']),
+    ])
+    page.text(50, y - 20, 'has fulfilled all the requirements for the award of the above degree.', size=12)
+    _footer(page, document)
+    return page
+
+RENDERERS = {'marksheet': render_marksheet, 'certificate': render_certificate}
+
+def write_document(path, document):
+    """Render ``document`` to ``path`` atomically, so readers never see a partial file."""
+    write_pdf(path, [RENDERERS[document['kind']](document)])
+
+def write_documents(output_dir, documents):
+    """Worker: write every document that has no file for its current content yet."""
+    written = 0
+    for document in documents:
+        path = document_path(output_dir, document)
+        if not os.path.exists(path):
+            write_document(path, document)
+            written += 1
+    return written
+
+
+# Issuing
+
+def document_file(kind, application, output_dir=None):
+    """
+    Return ``(path, digest)`` of the application's document, rendering it on first request.
+    Raises ``DocumentNotReady`` for a marksheet whose result is not published.
+    """
+    output_dir = output_dir or settings.DOCUMENT_ROOT
+    document = document_data(kind, [application])[0]
+    if not document_ready(document):
+        raise DocumentNotReady(f'No published result for {kind} {application.token}')
+    digest = content_hash(document)
+    path = document_path(output_dir, document, digest)
+    if not os.path.exists(path):
+        write_document(path, document)
+    return path, digest
+
+def issue_documents(kind, applications, output_dir=None, workers=None, chunk_size=250):
+    """
+    Render the documents of every application in the queryset on a process pool.
+    Marksheets without a published result are skipped and counted in ``unpublished``.
+    """
+    output_dir = output_dir or settings.DOCUMENT_ROOT
+    started = time.perf_counter()
+    report = {'documents': 0, 'written': 0, 'unpublished': 0}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker) as pool:
+        futures = []
+
+        def submit(chunk):
+            documents = [document for document in document_data(kind, chunk) if document_ready(document)]
+            report['unpublished'] += len(chunk) - len(documents)
+            report['documents'] += len(documents)
+            futures.append(pool.submit(write_documents, output_dir, documents))
+
+        chunk = []
+        for application in applications.order_by('pk').iterator(chunk_size=2000):
+            chunk.append(application)
+            if len(chunk) == chunk_size:
+                submit(chunk)
+                chunk = []
+        if chunk:
+            submit(chunk)
+        for future in as_completed(futures):
+            report['written'] += future.result()
+    report['seconds'] = time.perf_counter() - started
+    return report
@@ -0,0 +1,124 @@
+import csv
+from collections import defaultdict
+
+from django.db.models import Count, F, Q, Value
+
+from .models import Exam, Teacher
+
+ROLE_FIELDS = tuple(field for field, label in Exam.TEACHER_ROLE_FIELDS)
+ROLE_LABELS = dict(Exam.TEACHER_ROLE_FIELDS)
+
+DUTY_COLUMNS = ['exam_id', 'exam_date', 'session', 'batch', 'department', 'course_code', 'course_title', 'role']
+WORKLOAD_COLUMNS = ['teacher_id', 'teacher', 'department', 'session', *ROLE_FIELDS, 'total']
+
+
+# Duties of one teacher
+# Seven foreign keys can point at a teacher; one OR-ed filter reads every exam they hold
+# any of them on, and the roles are read off the same rows.
+
+def assigned_to(teacher_ids):
+    condition = Q()
+    for field in ROLE_FIELDS:
+        condition |= Q(**{f'{field}_id__in': teacher_ids})
+    return condition
+
+def teacher_duties(teacher_id, session=None):
+    """One row per (exam, role) the teacher holds, by exam date, in one query."""
+    exams = Exam.objects.filter(assigned_to([teacher_id]))
+    if session:
+        exams = exams.filter(session=session)
+    rows = exams.order_by('exam_date', 'id').values(
+        'id', 'exam_date', 'session', 'batch', 'department__name', 'course__course_code', 'course__course_title',
+        *(f'{field}_id' for field in ROLE_FIELDS),
+    )
+    return [
+        {
+            'exam_id': row['id'],
+            'exam_date': row['exam_date'],
+            'session': row['session'],
+            'batch': row['batch'],
+            'department': row['department__name'],
+            'course_code': row['course__course_code'],
+            'course_title': row['course__course_title'],
+            'role': ROLE_LABELS[field],
+        }
+        for row in rows
+        for field in ROLE_FIELDS if row[f'{field}_id'] == teacher_id
+    ]
+
+
+# Workload
+# Counted in the database as a UNION ALL of one GROUP BY per role field, so the result
+# has one row per (teacher, session, role) however many exams there are.
+
+def role_counts(session=None, department_id=None):
+    parts = []
+    for field in ROLE_FIELDS:
+        exams = Exam.objects.filter(**{f'{field}__isnull': False})
+        if session:
+            exams = exams.filter(session=session)
+        if department_id:
+            exams = exams.filter(**{f'{field}__department_id': department_id})
+        parts.append(
+            exams.annotate(teacher=F(f'{field}_id'), role=Value(field))
+            .values_list('teacher', 'session', 'role')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+    return parts[0].union(*parts[1:], all=True)
+
+def workload(session=None, department_id=None):
+    """
+    Duty counts per teacher per session, by role, in two queries.
+
+    Teachers without duties are listed too (with ``session`` as asked, or ``None``), so a
+    department can see who is free. Teachers are filtered by their own department.
+    """
+    teachers = Teacher.objects.all()
+    if department_id:
+        teachers = teachers.filter(department_id=department_id)
+    teachers = list(teachers.order_by('name', 'id').values_list('id', 'name', 'department__name'))
+
+    counts = defaultdict(lambda: defaultdict(dict))
+    for teacher_id, exam_session, role, count in role_counts(session, department_id):
+        counts[teacher_id][exam_session][role] = count
+
+    rows = []
+    for teacher_id, name, department in teachers:
+        sessions = counts.get(teacher_id) or {session or None: {}}
+        for exam_session in sorted(sessions, key=lambda value: value or ''):
+            roles = sessions[exam_session]
+            rows.append({
+                'teacher_id': teacher_id,
+                'teacher': name,
+                'department': department,
+                'session': exam_session,
+                **{field: roles.get(field, 0) for field in ROLE_FIELDS},
+                'total': sum(roles.values()),
+            })
+    return rows
+
+def workload_summary(rows):
+    """Spread of total duties over the roster, to spot over- and under-loaded teachers."""
+    totals = defaultdict(int)
+    for row in rows:
+        totals[row['teacher_id']] += row['total']
+    if not totals:
+        return {'teachers': 0, 'duties': 0, 'average': 0, 'highest': 0, 'lowest': 0}
+    values = totals.values()
+    return {
+        'teachers': len(totals),
+        'duties': sum(values),
+        'average': round(sum(values) / len(totals), 2),
+        'highest': max(values),
+        'lowest': min(values),
+    }
+
+
+# Export
+
+def write_csv(output, columns, rows):
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
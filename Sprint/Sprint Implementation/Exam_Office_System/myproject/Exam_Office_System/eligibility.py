@@ -0,0 +1,185 @@
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .dashboard import summary_cache_key
+from .models import ExamRegistration, Attendance
+from .portal import invalidate_student_portals
+
+
+# Rules
+# A rule loads whatever it needs for all registrations at once in prepare(), then
+# check() answers per registration from memory with a reason string or None.
+# Rules that don't reject only hold the registration in Pending with their reason.
+
+class EligibilityRule:
+    rejects = True
+
+    def prepare(self, registrations):
+        pass
+
+    def check(self, registration):
+        raise NotImplementedError
+
+
+class NotExpelledRule(EligibilityRule):
+    def check(self, registration):
+        if registration.student.expelled:
+            return 'Student is expelled'
+
+
+class ClearanceRule(EligibilityRule):
+    rejects = False
+
+    def check(self, registration):
+        missing = []
+        if not registration.student.hall_clearance:
+            missing.append('hall')
+        if not registration.student.library_clearance:
+            missing.append('library')
+        if missing:
+            return f"Missing {' and '.join(missing)} clearance"
+
+
+class PaymentRule(EligibilityRule):
+    rejects = False
+
+    def check(self, registration):
+        if registration.payment_status == 'Failed':
+            return 'Payment failed'
+        if registration.payment_status != 'Completed':
+            return 'Payment pending'
+
+
+class RetakeLimitRule(EligibilityRule):
+    """Reject a student's retake registrations after the first ``limit``, oldest first."""
+
+    def __init__(self, limit=2):
+        self.limit = limit
+
+    def prepare(self, registrations):
+        # Earlier rejections don't use up the limit; the registrations being evaluated compete
+        # for it even if they were rejected before
+        retakes = (
+            ExamRegistration.objects
+            .filter(student_id__in=registrations.values('student_id'), registration_type='Retake')
+            .filter(~Q(status='Rejected') | Q(pk__in=registrations.values('pk')))
+            .order_by('registration_date', 'pk')
+            .values_list('pk', 'student_id')
+        )
+        seen = Counter()
+        self.over_limit = set()
+        for registration_id, student_id in retakes:
+            seen[student_id] += 1
+            if seen[student_id] > self.limit:
+                self.over_limit.add(registration_id)
+
+    def check(self, registration):
+        if registration.registration_type == 'Retake' and registration.pk in self.over_limit:
+            return f'Retake limit of {self.limit} exceeded'
+
+
+class AttendanceRule(EligibilityRule):
+    """Reject students who sat fewer than ``minimum`` (a ratio) of the past exams they registered for."""
+
+    def __init__(self, minimum=0.75):
+        self.minimum = minimum
+
+    def prepare(self, registrations):
+        students = registrations.values('student_id')
+        self.attended = dict(
+            Attendance.objects
+            .filter(student_id__in=students, role='Student')
+            .values_list('student_id')
+            .annotate(count=Count('exam_id', distinct=True))
+        )
+        self.registered = dict(
+            ExamRegistration.exams.through.objects
+            .filter(examregistration__student_id__in=students, exam__exam_date__lt=timezone.localdate())
+            .exclude(examregistration__status='Rejected')
+            .values_list('examregistration__student_id')
+            .annotate(count=Count('exam_id', distinct=True))
+        )
+
+    def check(self, registration):
+        registered = self.registered.get(registration.student_id, 0)
+        if registered and self.attended.get(registration.student_id, 0) / registered < self.minimum:
+            return f'Attendance below {self.minimum:.0%} of registered exams'
+
+
+def default_rules():
+    # Rules keep what prepare() loaded, so every evaluation gets its own instances
+    return [NotExpelledRule(), ClearanceRule(), PaymentRule(), RetakeLimitRule()]
+
+
+# Engine
+
+class EligibilityReport:
+    def __init__(self):
+        self.evaluated = 0
+        self.changed = 0
+        self.verdicts = Counter()
+        self.reasons = Counter()
+        self.timings = {}
+
+
+def pending_registrations(session):
+    return ExamRegistration.objects.filter(
+        status='Pending',
+        pk__in=ExamRegistration.exams.through.objects.filter(exam__session=session).values('examregistration_id'),
+    )
+
+def evaluate_registrations(registrations, rules=None, dry_run=False, batch_size=1000):
+    """
+    Decide ``status`` and ``ineligibility_reasons`` for every registration in the queryset.
+
+    Each rule runs its own bulk query up front, so the query count depends on the number of
+    rules, not of registrations. Changed rows are written with ``bulk_update`` unless ``dry_run``.
+    """
+    rules = default_rules() if rules is None else rules
+    report = EligibilityReport()
+
+    started = time.perf_counter()
+    for rule in rules:
+        rule.prepare(registrations)
+    rows = list(registrations.select_related('student').only(
+        'id', 'status', 'payment_status', 'registration_type', 'ineligibility_reasons', 'student_id',
+        'student__hall_clearance', 'student__library_clearance', 'student__expelled',
+    ))
+    report.timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    changed = []
+    for registration in rows:
+        reasons, rejected = [], False
+        for rule in rules:
+            reason = rule.check(registration)
+            if reason:
+                reasons.append(reason)
+                rejected = rejected or rule.rejects
+        status = 'Rejected' if rejected else 'Pending' if reasons else 'Verified'
+        text = '; '.join(reasons) or None
+        report.verdicts[status] += 1
+        report.reasons.update(reasons)
+        if (status, text) != (registration.status, registration.ineligibility_reasons):
+            registration.status = status
+            registration.ineligibility_reasons = text
+            changed.append(registration)
+    report.evaluated = len(rows)
+    report.changed = len(changed)
+    report.timings['evaluate'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if changed and not dry_run:
+        with transaction.atomic():
+            ExamRegistration.objects.bulk_update(changed, ['status', 'ineligibility_reasons'], batch_size=batch_size)
+        students = {registration.student_id for registration in changed}
+        # Bulk writes send no signals, so drop the status counts on the affected dashboards here
+        cache.delete_many([summary_cache_key('exam_office')] + [summary_cache_key('student', pk) for pk in students])
+        invalidate_student_portals(students)
+    report.timings['write'] = time.perf_counter() - started
+    return report
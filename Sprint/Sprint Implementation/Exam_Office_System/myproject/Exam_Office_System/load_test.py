@@ -0,0 +1,179 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.db import OperationalError, connection, connections, transaction
+from django.urls import reverse
+
+from .benchmark import benchmark_client, percentile
+from .models import Exam, ExamRegistration, Student, User
+
+
+# Concurrent registrations
+# Each worker process is one application server worker with its own connection, so the
+# database sees as many simultaneous writers as there are workers.
+
+def _init_worker():
+    # Spawned (non-forked) workers start without Django configured
+    if not apps.ready:
+        django.setup()
+
+def _register(jobs, retries):
+    """Worker: register each ``(student_id, exam_ids)`` in its own transaction; returns (ids, latencies, errors)."""
+    created, latencies, errors = [], [], defaultdict(int)
+    for student_id, exam_ids in jobs:
+        started = time.perf_counter()
+        for attempt in range(retries + 1):
+            try:
+                with transaction.atomic():
+                    # Like the registration form: read the student, then write
+                    student = Student.objects.only('pk').get(pk=student_id)
+                    registration = ExamRegistration.objects.create(student=student, registration_type='Retake')
+                    registration.exams.set(exam_ids)
+            except OperationalError as error:
+                errors[str(error)] += 1
+                continue
+            created.append(registration.pk)
+            latencies.append((time.perf_counter() - started) * 1000)
+            break
+    connections.close_all()
+    return created, latencies, dict(errors)
+
+def registration_jobs(count, exams_per_registration=8):
+    """``count`` (student, exam ids) pairs, each student registering for exams of their department."""
+    students = list(Student.objects.order_by('pk').values_list('pk', 'department_id')[:count])
+    if not students:
+        raise ValueError('No students to register; run generate_university first')
+    exams = defaultdict(list)
+    for exam_id, department_id in Exam.objects.order_by('-exam_date').values_list('pk', 'department_id'):
+        if len(exams[department_id]) < exams_per_registration:
+            exams[department_id].append(exam_id)
+    return [(student_id, exams[department_id]) for student_id, department_id in students * (count // len(students) + 1)][:count]
+
+def _merge(outcomes):
+    done, latencies, errors = [], [], defaultdict(int)
+    for worker_done, worker_latencies, worker_errors in outcomes:
+        done += worker_done
+        latencies += worker_latencies
+        for message, count in worker_errors.items():
+            errors[message] += count
+    return done, latencies, dict(errors)
+
+def _latency_report(latencies):
+    report = {
+        f'{name}_ms': round(percentile(latencies, fraction), 1) if latencies else None
+        for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+    }
+    report['max_ms'] = round(max(latencies), 1) if latencies else None
+    return report
+
+def registration_load(jobs, workers=16, retries=0, keep=False):
+    """
+    Submit ``jobs`` from ``workers`` processes at once and report write throughput.
+
+    Registrations that fail (e.g. "database is locked") are counted per error message and
+    retried up to ``retries`` times. Created registrations are deleted afterwards unless ``keep``.
+    """
+    # Forked workers must not share the parent's open connections
+    connections.close_all()
+    chunks = [jobs[worker::workers] for worker in range(workers)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        outcomes = list(pool.map(_register, chunks, [retries] * workers))
+    elapsed = time.perf_counter() - started
+
+    created, latencies, errors = _merge(outcomes)
+    if not keep:
+        for start in range(0, len(created), 500):
+            ExamRegistration.objects.filter(pk__in=created[start:start + 500]).delete()
+
+    return {
+        'vendor': connections['default'].vendor,
+        'workers': workers,
+        'submitted': len(jobs),
+        'created': len(created),
+        'failed': len(jobs) - len(created),
+        'errors': errors,
+        'seconds': round(elapsed, 2),
+        'per_second': round(len(created) / elapsed, 1),
+        **_latency_report(latencies),
+    }
+
+
+# Concurrent logins
+# Each job logs one user in through the login form and then loads their dashboard
+# ``page_views`` times, as a student checking results would. Queries on the session and
+# user tables are counted to show what the session engine and hasher policy cost.
+
+class _QueryCounter:
+    def __init__(self):
+        self.counts = defaultdict(int)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts['queries'] += 1
+        if 'django_session' in sql:
+            self.counts['session_queries'] += 1
+        if sql.startswith('UPDATE') and '"password"' in sql:
+            self.counts['rehashes'] += 1
+        return execute(sql, params, many, context)
+
+def _login(jobs, password, page_views):
+    """Worker: log each username in; returns (usernames, latencies, errors, query counts)."""
+    logged_in, latencies, errors = [], [], defaultdict(int)
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        for username in jobs:
+            client = benchmark_client()
+            started = time.perf_counter()
+            try:
+                response = client.post(reverse('login'), {'username': username, 'password': password})
+            except OperationalError as error:
+                errors[str(error)] += 1
+                continue
+            if response.status_code != 302:
+                errors[f'login returned {response.status_code}'] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            logged_in.append(username)
+            for number in range(page_views):
+                client.get(reverse('dashboard'))
+    connections.close_all()
+    return logged_in, latencies, dict(errors), dict(counter.counts)
+
+def login_jobs(count, prefix='syn'):
+    """``count`` usernames of synthetic students, reused round-robin if there are fewer."""
+    usernames = list(User.objects.filter(username__startswith=f'{prefix}-', role='Student')
+                     .order_by('pk').values_list('username', flat=True)[:count])
+    if not usernames:
+        raise ValueError('No students to log in; run generate_university first')
+    return (usernames * (count // len(usernames) + 1))[:count]
+
+def login_load(jobs, password='password', workers=4, page_views=1):
+    """Log ``jobs`` in from ``workers`` processes at once and report logins per second."""
+    connections.close_all()
+    chunks = [jobs[worker::workers] for worker in range(workers)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        outcomes = list(pool.map(_login, chunks, [password] * workers, [page_views] * workers))
+    elapsed = time.perf_counter() - started
+
+    logged_in, latencies, errors = _merge(outcome[:3] for outcome in outcomes)
+    counts = defaultdict(int)
+    for outcome in outcomes:
+        for name, count in outcome[3].items():
+            counts[name] += count
+    return {
+        'vendor': connections['default'].vendor,
+        'workers': workers,
+        'submitted': len(jobs),
+        'logged_in': len(logged_in),
+        'errors': errors,
+        'seconds': round(elapsed, 2),
+        'per_second': round(len(logged_in) / elapsed, 1),
+        **_latency_report(latencies),
+        'queries_per_login': round(counts['queries'] / max(len(logged_in), 1), 1),
+        'session_queries': counts['session_queries'],
+        'rehashes': counts['rehashes'],
+    }
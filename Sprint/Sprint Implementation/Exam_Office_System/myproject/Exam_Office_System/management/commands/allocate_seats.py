@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from Exam_Office_System.seat_plan import plan_date, save_seat_plan, write_seat_lists
+
+
+class Command(BaseCommand):
+    help = 'Seat every verified candidate of an exam date in the active rooms and assign invigilators.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('date', help='Exam date (YYYY-MM-DD)')
+        parser.add_argument('--per-invigilator', type=int, help='Candidates per invigilator (default: STUDENTS_PER_INVIGILATOR)')
+        parser.add_argument('--output', default=str(settings.SEAT_PLAN_ROOT), help='Directory for the printable seat lists')
+        parser.add_argument('--no-print', action='store_true', help='Skip writing seat list PDFs')
+        parser.add_argument('--dry-run', action='store_true', help='Allocate without saving')
+
+    def handle(self, *args, **options):
+        exam_date = parse_date(options['date'])
+        if exam_date is None:
+            raise CommandError('Date must be YYYY-MM-DD')
+
+        plan = plan_date(exam_date, per_invigilator=options['per_invigilator'])
+        timings = ', '.join(f'{step} {seconds * 1000:.0f}ms' for step, seconds in plan.timings.items())
+        rooms = len({seat[0] for seat in plan.seats})
+        self.stdout.write(
+            f'{len(plan.seats)} candidates seated in {rooms} rooms, {len(plan.invigilators)} invigilators assigned ({timings})'
+        )
+        if plan.adjacent:
+            self.stdout.write(self.style.WARNING(f'{plan.adjacent} candidates sit next to the same exam'))
+        if plan.shortfall:
+            self.stdout.write(self.style.WARNING(f'{plan.shortfall} invigilators short'))
+        if plan.clashes:
+            self.stdout.write(self.style.WARNING(
+                f'{len(plan.clashes)} candidates have another exam on this date and were seated for one exam only; '
+                'run check_exam_conflicts'
+            ))
+        if plan.unseated:
+            self.stdout.write(self.style.ERROR(f'{len(plan.unseated)} candidates could not be seated: not enough room capacity'))
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing saved'))
+            return
+
+        save_seat_plan(plan)
+        if not options['no_print']:
+            paths = write_seat_lists(exam_date, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"{len(paths)} seat lists written to {options['output']}"))
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from Exam_Office_System.admit_cards import bundle_path, write_bundle, write_cards
+from Exam_Office_System.pdf import init_render_worker
+
+
+class Command(BaseCommand):
+    help = 'Time admit card rendering for synthetic registrations (no database access).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20000)
+        parser.add_argument('--departments', type=int, default=35)
+        parser.add_argument('--exams-per-card', type=int, default=8)
+        parser.add_argument('--workers', type=int, help='Rendering processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=250)
+        parser.add_argument('--output', help='Directory to keep the output in (default: a temporary one)')
+
+    def handle(self, *args, **options):
+        cards = [
+            {
+                'registration_id': number,
+                'registration_number': f'{20190000 + number}',
+                'name': f'Student {number}',
+                'session': '2019-20',
+                'department_id': number % options['departments'],
+                'department': f'Department {number % options["departments"]}',
+                'registration_type': 'Regular',
+                'venue': 'As per the published seat plan',
+                'exams': [
+                    (f'2025-01-{day + 1:02d}', f'CSE-{400 + day}', 'Synthetic Course Title')
+                    for day in range(options['exams_per_card'])
+                ],
+            }
+            for number in range(options['count'])
+        ]
+        output_dir = options['output'] or tempfile.mkdtemp(prefix='admit_cards_')
+        chunk_size = options['chunk_size']
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_render_worker) as pool:
+            futures = [
+                pool.submit(write_cards, output_dir, cards[start:start + chunk_size])
+                for start in range(0, len(cards), chunk_size)
+            ]
+            futures += [
+                pool.submit(write_bundle, bundle_path(output_dir, department),
+                            [card for card in cards if card['department_id'] == department])
+                for department in range(options['departments'])
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        size = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, dirs, files in os.walk(output_dir) for name in files
+        )
+        self.stdout.write(
+            f"{len(cards)} cards + {options['departments']} bundles in {elapsed:.1f}s "
+            f"({len(cards) / elapsed:.0f} cards/s, {os.cpu_count()} CPUs, {size / 2 ** 20:.1f} MiB)"
+        )
+        if not options['output']:
+            shutil.rmtree(output_dir)
@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.benchmark import BenchmarkContext, compare, default_flows, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Time the key user flows on a synthetic university and compare them with a JSON baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--flows', help='Comma-separated flow names (default: all)')
+        parser.add_argument('--prefix', default='syn', help='Prefix given to generate_university')
+        parser.add_argument('--password', default='password', help='Password given to generate_university')
+        parser.add_argument('--output', help='Write the results to this JSON file (e.g. a new baseline)')
+        parser.add_argument('--compare', help='Baseline JSON file; exits non-zero on regressions')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p50 slowdown (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        flows = default_flows()
+        if options['flows']:
+            names = options['flows'].split(',')
+            unknown = set(names) - {flow.name for flow in flows}
+            if unknown:
+                raise CommandError(f"Unknown flows: {', '.join(sorted(unknown))}")
+            flows = [flow for flow in flows if flow.name in names]
+        try:
+            context = BenchmarkContext(options['prefix'], options['password'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        results = run_benchmarks(context, flows, options['iterations'], options['warmup'], stdout=self.stdout)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                regressions = compare(json.load(baseline), results, options['tolerance'])
+            for name, message in regressions:
+                self.stdout.write(self.style.ERROR(f'{name}: {message}'))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
@@ -0,0 +1,64 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from Exam_Office_System.scheduler import build_conflict_graph, build_timetable
+
+
+class Command(BaseCommand):
+    help = 'Time the timetable generator on a synthetic university (no database access).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=35)
+        parser.add_argument('--batches', type=int, default=4, help='Batches examined per department')
+        parser.add_argument('--courses-per-batch', type=int, default=8)
+        parser.add_argument('--students-per-batch', type=int, default=80)
+        parser.add_argument('--retake-rate', type=float, default=0.1, help='Share of students retaking one other course')
+        parser.add_argument('--teachers-per-department', type=int, default=30)
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--capacity', type=int, help='Seats per exam day')
+        parser.add_argument('--seed', type=int, default=49)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        exams, enrolments = [], []
+        student_id = 0
+        for department in range(options['departments']):
+            teachers = [department * 1000 + number for number in range(options['teachers_per_department'])]
+            department_exams = []
+            for batch in range(options['batches']):
+                batch_exams = []
+                for _ in range(options['courses_per_batch']):
+                    exam = {
+                        'id': len(exams) + 1, 'department_id': department, 'session': 'bench',
+                        'batch': str(batch), 'exam_date': None,
+                        'invigilator_id': rng.choice(teachers), 'examiner1_id': rng.choice(teachers),
+                        'examiner2_id': rng.choice(teachers), 'examiner3_id': None,
+                        'question_creator_id': rng.choice(teachers), 'moderator_id': None, 'translator_id': None,
+                    }
+                    exams.append(exam)
+                    batch_exams.append(exam['id'])
+                department_exams.extend(batch_exams)
+                for _ in range(options['students_per_batch']):
+                    student_id += 1
+                    enrolments.extend((student_id, exam_id) for exam_id in batch_exams)
+                    if rng.random() < options['retake_rate']:
+                        enrolments.append((student_id, rng.choice(department_exams)))
+
+        started = time.perf_counter()
+        sizes, adjacency = build_conflict_graph(exams, enrolments)
+        graph_time = time.perf_counter() - started
+        edges = sum(len(neighbours) for neighbours in adjacency.values()) // 2
+        dates = [datetime.date(2025, 1, 1) + datetime.timedelta(days=day) for day in range(options['days'])]
+        timetable = build_timetable(adjacency, sizes, dates, capacity=options['capacity'])
+
+        self.stdout.write(f'{len(exams)} exams, {student_id} students, {len(enrolments)} enrolments, {edges} conflict edges')
+        self.stdout.write(f'graph {graph_time:.2f}s, ' + ', '.join(
+            f'{step} {seconds:.2f}s' for step, seconds in timetable.timings.items()
+        ))
+        self.stdout.write(
+            f'{len(timetable.assignment)} placed, {len(timetable.unscheduled)} unplaced, '
+            f'{timetable.penalty} back-to-back student exams'
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from Exam_Office_System.models import TeacherRemuneration
+from Exam_Office_System.remuneration import calculate_remuneration, remuneration_totals, session_exams
+
+
+class Command(BaseCommand):
+    help = "Derive teachers' remuneration lines for a session's exams from the rate table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('session')
+        parser.add_argument('--department', type=int, help='Department id')
+        parser.add_argument('--totals', choices=['teacher', 'department'], help='Print totals per teacher or department')
+
+    def handle(self, *args, **options):
+        exams = session_exams(options['session'], options['department'])
+        report = calculate_remuneration(exams)
+        self.stdout.write(
+            f"{report['lines']} remuneration lines derived, {report['created']} created "
+            f"({report['seconds'] * 1000:.0f}ms)"
+        )
+        if report['missing_rates']:
+            self.stdout.write(self.style.WARNING(f"No rate for: {', '.join(report['missing_rates'])}"))
+
+        if options['totals']:
+            for row in remuneration_totals(TeacherRemuneration.objects.filter(exam__in=exams), by=options['totals']):
+                name = row.get('teacher__name') or row.get('teacher__department__name')
+                self.stdout.write(
+                    f"{name}: {row['total']} over {row['lines']} lines ({row['pending']} pending, {row['paid']} paid)"
+                )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from Exam_Office_System.eligibility import (
+    NotExpelledRule, ClearanceRule, PaymentRule, RetakeLimitRule, AttendanceRule,
+    evaluate_registrations, pending_registrations,
+)
+
+
+class Command(BaseCommand):
+    help = "Verify or reject every pending exam registration of a session."
+
+    def add_arguments(self, parser):
+        parser.add_argument('session')
+        parser.add_argument('--retake-limit', type=int, default=2)
+        parser.add_argument('--min-attendance', type=float,
+                            help='Also require this share (0-1) of past registered exams to have been attended')
+        parser.add_argument('--skip-clearance', action='store_true')
+        parser.add_argument('--skip-payment', action='store_true')
+        parser.add_argument('--dry-run', action='store_true', help='Report verdicts without saving them')
+
+    def handle(self, *args, **options):
+        rules = [NotExpelledRule(), RetakeLimitRule(options['retake_limit'])]
+        if not options['skip_clearance']:
+            rules.append(ClearanceRule())
+        if not options['skip_payment']:
+            rules.append(PaymentRule())
+        if options['min_attendance'] is not None:
+            rules.append(AttendanceRule(options['min_attendance']))
+
+        with CaptureQueriesContext(connection) as queries:
+            report = evaluate_registrations(
+                pending_registrations(options['session']), rules, dry_run=options['dry_run'],
+            )
+
+        self.stdout.write(f'{report.evaluated} pending registrations evaluated, {report.changed} changed')
+        for status, count in sorted(report.verdicts.items()):
+            self.stdout.write(f'  {status}: {count}')
+        for reason, count in report.reasons.most_common():
+            self.stdout.write(f'  - {reason}: {count}')
+        timings = ', '.join(f'{step} {seconds:.3f}s' for step, seconds in report.timings.items())
+        self.stdout.write(f'{len(queries)} queries; {timings}')
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing saved'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from Exam_Office_System.models import TeacherRemuneration
+from Exam_Office_System.remuneration import export_payment_batch, session_exams
+
+
+class Command(BaseCommand):
+    help = 'Export pending remuneration lines as a payment batch CSV and mark them Paid.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='CSV file to write')
+        parser.add_argument('--session', help='Only exams of this session')
+        parser.add_argument('--department', type=int, help="Only this department's exams")
+        parser.add_argument('--teacher', type=int, help='Teacher id')
+
+    def handle(self, *args, **options):
+        remunerations = TeacherRemuneration.objects.all()
+        if options['session']:
+            remunerations = remunerations.filter(exam__in=session_exams(options['session'], options['department']))
+        elif options['department']:
+            remunerations = remunerations.filter(exam__department=options['department'])
+        if options['teacher']:
+            remunerations = remunerations.filter(teacher=options['teacher'])
+
+        with open(options['output'], 'w', newline='') as output:
+            lines, total = export_payment_batch(remunerations, output)
+        self.stdout.write(self.style.SUCCESS(f"{lines} lines totalling {total} marked Paid and written to {options['output']}"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from Exam_Office_System.materials import department_rollup, forecast_rollup, plan_session
+
+
+class Command(BaseCommand):
+    help = "Forecast answer scripts, question papers and pens for every exam of a session from its registrations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('session')
+        parser.add_argument('--department', type=int, help='Department id (default: whole university)')
+        parser.add_argument('--dry-run', action='store_true', help='Forecast without saving quantities')
+
+    def handle(self, *args, **options):
+        forecast, seconds = plan_session(options['session'], options['department'], options['dry_run'])
+        exams = len({exam_id for exam_id, _ in forecast})
+        self.stdout.write(f'{len(forecast)} quantities forecast for {exams} exams ({seconds * 1000:.0f}ms)')
+        if options['dry_run']:
+            rollup = forecast_rollup(forecast)
+        else:
+            rollup = department_rollup(options['session'], options['department'])
+
+        for row in rollup:
+            self.stdout.write(
+                f"{row['exam__department__name']}: {row['quantity']} {row['material_type']} over {row['exams']} exams"
+            )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing saved'))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Exam_Office_System.admit_cards import generate_admit_cards, verified_registrations
+
+
+class Command(BaseCommand):
+    help = 'Render admit cards for verified registrations plus one printable bundle per department.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', help='Only registrations for exams of this session')
+        parser.add_argument('--department', type=int, help='Department id')
+        parser.add_argument('--output', default=str(settings.ADMIT_CARD_ROOT))
+        parser.add_argument('--workers', type=int, help='Rendering processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=250, help='Cards per worker task')
+        parser.add_argument('--regenerate', action='store_true', help='Render cards that were already generated')
+
+    def handle(self, *args, **options):
+        report = generate_admit_cards(
+            verified_registrations(options['session'], options['department']),
+            options['output'],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            regenerate=options['regenerate'],
+        )
+        rate = report['cards'] / report['seconds'] if report['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['cards']} admit cards and {report['bundles']} department bundles written to "
+            f"{options['output']} in {report['seconds']:.1f}s ({rate:.0f} cards/s)"
+        ))
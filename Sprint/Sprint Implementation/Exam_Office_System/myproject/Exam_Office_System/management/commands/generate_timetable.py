@@ -0,0 +1,68 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.conflicts import ALL_ROLES
+from Exam_Office_System.scheduler import schedule_session, save_timetable
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+class Command(BaseCommand):
+    help = "Assign clash-free dates to a session's exams and publish their schedules."
+
+    def add_arguments(self, parser):
+        parser.add_argument('session')
+        parser.add_argument('--start', required=True, help='First exam date (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, help='Last exam date (YYYY-MM-DD)')
+        parser.add_argument('--department', type=int, help='Department id (default: whole university)')
+        parser.add_argument('--skip-weekdays', default='fri,sat', help='Comma separated weekdays without exams')
+        parser.add_argument('--holiday', action='append', default=[], help='Date without exams; may be repeated')
+        parser.add_argument('--capacity', type=int, help='Seats available per exam day')
+        parser.add_argument('--max-exams-per-day', type=int)
+        parser.add_argument('--invigilators-only', action='store_true',
+                            help='Only invigilation stops a teacher having two exams on one day')
+        parser.add_argument('--passes', type=int, default=5, help='Local search passes')
+        parser.add_argument('--allow-partial', action='store_true',
+                            help='Save even if some exams could not be placed (they keep their old dates)')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.date.fromisoformat(options['start'])
+            end = datetime.date.fromisoformat(options['end'])
+            holidays = {datetime.date.fromisoformat(day) for day in options['holiday']}
+        except ValueError as exc:
+            raise CommandError(exc)
+        skipped = {WEEKDAYS.index(day.strip().lower()[:3]) for day in options['skip_weekdays'].split(',') if day.strip()}
+        dates = [
+            start + datetime.timedelta(days=offset)
+            for offset in range((end - start).days + 1)
+            if (start + datetime.timedelta(days=offset)).weekday() not in skipped
+            and start + datetime.timedelta(days=offset) not in holidays
+        ]
+        if not dates:
+            raise CommandError('No exam days between --start and --end')
+
+        timetable = schedule_session(
+            options['session'], dates,
+            department=options['department'],
+            capacity=options['capacity'],
+            max_per_day=options['max_exams_per_day'],
+            roles=('invigilator',) if options['invigilators_only'] else ALL_ROLES,
+            passes=options['passes'],
+        )
+        timings = ', '.join(f'{step} {seconds:.2f}s' for step, seconds in timetable.timings.items())
+        self.stdout.write(
+            f'{len(timetable.assignment)} exams placed on {len(dates)} days, '
+            f'{timetable.penalty} back-to-back student exams ({timings})'
+        )
+        if timetable.unscheduled:
+            message = 'Could not place exams: ' + ', '.join(str(pk) for pk in sorted(timetable.unscheduled))
+            if not (options['allow_partial'] or options['dry_run']):
+                raise CommandError(f'{message}; add exam days or pass --allow-partial')
+            self.stdout.write(self.style.WARNING(message))
+        if options['dry_run']:
+            return
+        save_timetable(timetable, allow_partial=options['allow_partial'])
+        self.stdout.write(self.style.SUCCESS('Exam dates and schedules saved'))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.synthetic import UniversityGenerator, UniversitySpec
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a synthetic university for load tests and benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=35)
+        parser.add_argument('--students', type=int, default=50000)
+        parser.add_argument('--teachers', type=int, default=2100)
+        parser.add_argument('--batches', type=int, default=4, help='Batches per department')
+        parser.add_argument('--courses-per-batch', type=int, default=8, help='Exams per batch per session')
+        parser.add_argument('--rooms', type=int, default=60)
+        parser.add_argument('--prefix', default='syn', help='Prefix of every synthetic username and code')
+        parser.add_argument('--password', default='password', help='Password of every synthetic account')
+        parser.add_argument('--seed', type=int, default=49)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        spec = UniversitySpec(
+            departments=options['departments'], students=options['students'], teachers=options['teachers'],
+            batches=options['batches'], courses_per_batch=options['courses_per_batch'], rooms=options['rooms'],
+            prefix=options['prefix'], password=options['password'], seed=options['seed'],
+        )
+        started = time.perf_counter()
+        generator = UniversityGenerator(spec, batch_size=options['batch_size'], stdout=self.stdout)
+        try:
+            counts = generator.generate()
+        except ValueError as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+
+        for model, count in counts.items():
+            self.stdout.write(f'{model}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(counts.values())} rows in {elapsed:.1f}s ({sum(counts.values()) / elapsed:.0f} rows/s); "
+            f"log in as {spec.prefix}-office / {spec.password}"
+        ))
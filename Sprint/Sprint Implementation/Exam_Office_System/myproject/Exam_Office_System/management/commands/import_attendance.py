@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from Exam_Office_System.attendance import SheetError, read_sheet, record_attendance
+from Exam_Office_System.models import Exam
+
+
+class Command(BaseCommand):
+    help = 'Record attendance sheets collected offline (CSV or JSON) for an exam.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam', type=int, help='Exam id')
+        parser.add_argument('sheets', nargs='+', help='Sheet files; .csv files are read as CSV, others as JSON')
+        parser.add_argument('--date', help='Attendance date (default: the sheet date or the exam date)')
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(pk=options['exam'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam']} does not exist")
+
+        for path in options['sheets']:
+            with open(path, 'rb') as sheet:
+                data = sheet.read()
+            try:
+                rows, attendance_date = read_sheet(data, 'text/csv' if path.endswith('.csv') else 'application/json')
+                attendance_date = parse_date(options['date'] or attendance_date or '') or None
+                report = record_attendance(exam, rows, attendance_date)
+            except SheetError as error:
+                unknown = f": {', '.join(error.unknown[:20])}" if error.unknown else ''
+                raise CommandError(f'{path}: {error}{unknown}')
+            self.stdout.write(
+                f"{path}: {report['present']} present, {report['absent']} absent ({report['removed']} rows removed)"
+            )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from Exam_Office_System.documents import DOCUMENT_KINDS, approved_applications, issue_documents
+
+
+class Command(BaseCommand):
+    help = 'Render the marksheets and certificates of approved applications, e.g. ahead of a convocation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=DOCUMENT_KINDS, action='append',
+                            help='Document kind, repeatable (default: both)')
+        parser.add_argument('--session', help="Only students of this session (a convocation's graduating session)")
+        parser.add_argument('--department', type=int, help='Department id')
+        parser.add_argument('--from-date', help='Applications made on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--to-date', help='Applications made on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--output', help='Output directory (default: DOCUMENT_ROOT)')
+        parser.add_argument('--workers', type=int, help='Rendering processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=250, help='Documents per worker task')
+
+    def handle(self, *args, **options):
+        for kind in options['kind'] or DOCUMENT_KINDS:
+            applications = approved_applications(kind)
+            if options['session']:
+                applications = applications.filter(student__session=options['session'])
+            if options['department']:
+                applications = applications.filter(student__department=options['department'])
+            if options['from_date']:
+                applications = applications.filter(application_date__gte=options['from_date'])
+            if options['to_date']:
+                applications = applications.filter(application_date__lte=options['to_date'])
+
+            report = issue_documents(
+                kind, applications, options['output'], workers=options['workers'], chunk_size=options['chunk_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"{kind}: {report['documents']} approved, {report['written']} rendered "
+                f"({report['documents'] - report['written']} already up to date) in {report['seconds']:.1f}s"
+            ))
+            if report['unpublished']:
+                self.stdout.write(self.style.WARNING(f"{kind}: {report['unpublished']} skipped, result not published"))
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.load_test import login_jobs, login_load
+
+
+class Command(BaseCommand):
+    help = 'Log synthetic students in from many processes at once and report logins per second.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=4, help='Simultaneous client processes')
+        parser.add_argument('--page-views', type=int, default=3, help='Dashboard loads after each login')
+        parser.add_argument('--prefix', default='syn', help='Prefix given to generate_university')
+        parser.add_argument('--password', default='password', help='Password given to generate_university')
+
+    def handle(self, *args, **options):
+        try:
+            jobs = login_jobs(options['logins'], options['prefix'])
+        except ValueError as error:
+            raise CommandError(error)
+        hasher = get_hasher()
+        self.stdout.write(
+            f'Sessions: {settings.SESSION_ENGINE}; passwords: {hasher.algorithm}'
+            f"{f' x {hasher.iterations}' if hasattr(hasher, 'iterations') else ''}"
+        )
+
+        report = login_load(jobs, options['password'], options['workers'], options['page_views'])
+        self.stdout.write(
+            f"{report['logged_in']}/{report['submitted']} logins by {report['workers']} workers in "
+            f"{report['seconds']}s ({report['per_second']}/s); latency p50 {report['p50_ms']}ms, "
+            f"p90 {report['p90_ms']}ms, p99 {report['p99_ms']}ms, max {report['max_ms']}ms"
+        )
+        self.stdout.write(
+            f"{report['queries_per_login']} queries per login and its page views, "
+            f"{report['session_queries']} on django_session; {report['rehashes']} passwords rehashed"
+        )
+        for message, count in report['errors'].items():
+            self.stdout.write(self.style.ERROR(f'{count} x {message}'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from Exam_Office_System.database import sqlite_settings
+from Exam_Office_System.load_test import registration_jobs, registration_load
+
+
+class Command(BaseCommand):
+    help = 'Register students from many processes at once and report write throughput and failures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--registrations', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=16, help='Simultaneous writer processes')
+        parser.add_argument('--exams', type=int, default=8, help='Exams per registration')
+        parser.add_argument('--retries', type=int, default=0, help='Retries of a failed registration')
+        parser.add_argument('--keep', action='store_true', help='Keep the registrations created')
+
+    def handle(self, *args, **options):
+        try:
+            jobs = registration_jobs(options['registrations'], options['exams'])
+        except ValueError as error:
+            raise CommandError(error)
+        if connection.vendor == 'sqlite':
+            self.stdout.write('SQLite: ' + ', '.join(f'{name}={value}' for name, value in sqlite_settings(connection).items()))
+
+        report = registration_load(jobs, options['workers'], options['retries'], options['keep'])
+        self.stdout.write(
+            f"{report['created']}/{report['submitted']} registrations by {report['workers']} workers in "
+            f"{report['seconds']}s ({report['per_second']}/s); latency p50 {report['p50_ms']}ms, "
+            f"p90 {report['p90_ms']}ms, p99 {report['p99_ms']}ms, max {report['max_ms']}ms"
+        )
+        for message, count in report['errors'].items():
+            self.stdout.write(self.style.ERROR(f'{count} x {message}'))
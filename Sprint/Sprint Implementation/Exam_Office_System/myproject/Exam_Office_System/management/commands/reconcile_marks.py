@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.models import ExaminerMark
+from Exam_Office_System.reconciliation import reconcile_marks
+
+
+class Command(BaseCommand):
+    help = "Reconcile examiners' marks into final results and queue wide discrepancies for examiner 3."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam', type=int, help='Exam id')
+        parser.add_argument('--session', help='Every exam of this session')
+        parser.add_argument('--threshold', type=int,
+                            help='Largest examiner 1/2 difference averaged without examiner 3 (default: THIRD_EXAMINER_THRESHOLD)')
+
+    def handle(self, *args, **options):
+        if not options['exam'] and not options['session']:
+            raise CommandError('Give --exam or --session')
+        marks = ExaminerMark.objects.all()
+        if options['exam']:
+            marks = marks.filter(exam_id=options['exam'])
+        if options['session']:
+            marks = marks.filter(exam__session=options['session'])
+
+        report = reconcile_marks(marks, threshold=options['threshold'])
+        rate = report['scripts'] / report['seconds'] if report['seconds'] else 0
+        self.stdout.write(
+            f"{report['scripts']} scripts: {report['Finalised']} finalised, "
+            f"{report['ThirdExaminer']} queued for examiner 3, {report['Pending']} awaiting marks "
+            f"({report['seconds']:.2f}s, {rate:.0f} scripts/s)"
+        )
+        if report['withdrawn']:
+            self.stdout.write(self.style.WARNING(f"{report['withdrawn']} results withdrawn until their scripts are finalised again"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.attendance import SheetError
+from Exam_Office_System.clearance import OFFICE_FIELDS, read_clearance_list, sync_clearance
+
+
+class Command(BaseCommand):
+    help = "Apply a hall or library office's clearance list (CSV or JSON) to students."
+
+    def add_arguments(self, parser):
+        parser.add_argument('office', choices=list(OFFICE_FIELDS))
+        parser.add_argument('path', help='Clearance list; .csv files are read as CSV, others as JSON')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without applying them')
+
+    def handle(self, *args, **options):
+        with open(options['path'], 'rb') as source:
+            data = source.read()
+        try:
+            entries = read_clearance_list(data, 'text/csv' if options['path'].endswith('.csv') else 'application/json')
+        except SheetError as error:
+            raise CommandError(str(error))
+
+        report = sync_clearance(options['office'], entries, dry_run=options['dry_run'])
+        self.stdout.write(
+            f"{report.received} students listed: {report.cleared} cleared, {report.uncleared} uncleared, "
+            f"{report.unchanged} unchanged ({report.seconds * 1000:.0f}ms, sync {report.sync_id})"
+        )
+        if report.unknown:
+            self.stdout.write(self.style.WARNING(
+                f"{len(report.unknown)} unknown registration numbers: {', '.join(report.unknown[:20])}"
+            ))
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing saved'))
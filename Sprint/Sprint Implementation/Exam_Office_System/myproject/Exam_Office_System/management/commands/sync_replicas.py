@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.database import replica_lag, sync_sqlite_replica
+from Exam_Office_System.routing import replica_aliases
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite primary onto its replicas (DATABASE_REPLICAS), once or every --every seconds, and report their lag.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, help='Keep syncing at this interval in seconds')
+        parser.add_argument('--status', action='store_true', help='Only report the lag of each replica')
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS')
+        while True:
+            for alias in aliases:
+                lag = replica_lag(alias)
+                if options['status']:
+                    self.stdout.write(f'{alias}: {lag:.1f}s behind')
+                    continue
+                try:
+                    seconds = sync_sqlite_replica(alias)
+                except ValueError as error:
+                    raise CommandError(error)
+                self.stdout.write(f'{alias}: was {lag:.1f}s behind, synced in {seconds:.2f}s')
+            if options['status'] or not options['every']:
+                break
+            time.sleep(options['every'])
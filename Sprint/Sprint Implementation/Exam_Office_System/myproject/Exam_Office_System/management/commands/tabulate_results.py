@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Exam_Office_System.tabulation import save_tabulation, tabulate_session
+
+
+class Command(BaseCommand):
+    help = "Compute grades, GPA, CGPA and batch ranks for a session's results."
+
+    def add_arguments(self, parser):
+        parser.add_argument('session')
+        parser.add_argument('--department', type=int, help='Department id (default: whole university)')
+        parser.add_argument('--dry-run', action='store_true', help='Compute without saving tabulation sheets')
+
+    def handle(self, *args, **options):
+        try:
+            tabulation = tabulate_session(options['session'], department=options['department'])
+        except ValueError as error:
+            raise CommandError(error)
+        if not options['dry_run']:
+            save_tabulation(tabulation)
+
+        timings = ', '.join(f'{step} {seconds * 1000:.1f}ms' for step, seconds in tabulation.timings.items())
+        ranked = int((tabulation.rank > 0).sum())
+        self.stdout.write(f'{len(tabulation)} students tabulated, {ranked} ranked ({timings})')
+        if len(tabulation):
+            self.stdout.write(
+                f'GPA mean {tabulation.gpa.mean():.2f}, '
+                f'{int((tabulation.failed > 0).sum())} students with failed courses'
+            )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing saved'))
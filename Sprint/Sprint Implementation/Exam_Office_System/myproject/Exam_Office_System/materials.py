@@ -0,0 +1,122 @@
+import math
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Attendance, Exam, ExamMaterials, ExamRegistration
+
+# material type -> (per candidate, buffer ratio, spare units per exam); override with EXAM_MATERIAL_PLAN
+DEFAULT_MATERIAL_PLAN = {
+    'AnswerScripts': (1.0, 0.10, 5),
+    'QuestionPapers': (1.0, 0.05, 2),
+    'Pens': (1.0, 0.05, 5),
+}
+
+# Historical turnout never cuts demand below this share of registered candidates
+DEFAULT_MINIMUM_TURNOUT = 0.9
+
+
+def material_plan():
+    return getattr(settings, 'EXAM_MATERIAL_PLAN', DEFAULT_MATERIAL_PLAN)
+
+def department_turnout(departments, before=None):
+    """
+    Share of registered candidates who actually sat past exams, per department.
+
+    Departments without history are left out and plan for every registered candidate.
+    """
+    before = before or timezone.localdate()
+    sat = dict(
+        Attendance.objects
+        .filter(role='Student', exam__department__in=departments, exam__exam_date__lt=before)
+        .values_list('exam__department_id')
+        .annotate(count=Count('id'))
+    )
+    registered = dict(
+        ExamRegistration.exams.through.objects
+        .filter(exam__department__in=departments, exam__exam_date__lt=before)
+        .exclude(examregistration__status='Rejected')
+        .values_list('exam__department_id')
+        .annotate(count=Count('id'))
+    )
+    return {department: min(sat.get(department, 0) / count, 1.0) for department, count in registered.items() if count}
+
+def forecast_quantity(candidates, per_candidate, buffer, spare):
+    # Rounded first: 100 * 1.1 is 110.00000000000001 in floating point, which must not ceil to 111
+    return math.ceil(round(candidates * per_candidate * (1 + buffer), 6)) + spare if candidates else 0
+
+def forecast_materials(exams, plan=None, minimum_turnout=None):
+    """
+    Return ``{(exam_id, material_type): quantity}`` for the exams.
+
+    Candidates per exam come from one annotated aggregate over the registrations, scaled by
+    the department's historical turnout (never below ``minimum_turnout``), then each
+    material's per-candidate rate, buffer and spare units are applied.
+    """
+    plan = plan or material_plan()
+    if minimum_turnout is None:
+        minimum_turnout = getattr(settings, 'EXAM_MATERIAL_MINIMUM_TURNOUT', DEFAULT_MINIMUM_TURNOUT)
+    rows = list(exams.values_list('id', 'department_id').annotate(
+        candidates=Count('registrations', filter=~Q(registrations__status='Rejected')),
+    ))
+    turnout = department_turnout({department for _, department, _ in rows})
+
+    forecast = {}
+    for exam_id, department, candidates in rows:
+        expected = math.ceil(candidates * max(turnout.get(department, 1.0), minimum_turnout))
+        for material_type, (per_candidate, buffer, spare) in plan.items():
+            forecast[(exam_id, material_type)] = forecast_quantity(expected, per_candidate, buffer, spare)
+    return forecast
+
+@transaction.atomic
+def save_forecast(forecast, batch_size=1000):
+    """Upsert one ``ExamMaterials`` row per exam and material type."""
+    ExamMaterials.objects.bulk_create(
+        [
+            ExamMaterials(exam_id=exam_id, material_type=material_type, quantity=quantity)
+            for (exam_id, material_type), quantity in forecast.items()
+        ],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['exam', 'material_type'],
+        update_fields=['quantity'],
+    )
+
+def plan_session(session, department=None, dry_run=False):
+    started = time.perf_counter()
+    exams = Exam.objects.filter(session=session)
+    if department is not None:
+        exams = exams.filter(department=department)
+    forecast = forecast_materials(exams)
+    if not dry_run:
+        save_forecast(forecast)
+    return forecast, time.perf_counter() - started
+
+def department_rollup(session, department=None):
+    """Total quantity of every material per department for a session's exams."""
+    materials = ExamMaterials.objects.filter(exam__session=session)
+    if department is not None:
+        materials = materials.filter(exam__department=department)
+    return (
+        materials.values('exam__department__name', 'material_type')
+        .annotate(exams=Count('exam_id'), quantity=Sum('quantity'))
+        .order_by('exam__department__name', 'material_type')
+    )
+
+def forecast_rollup(forecast):
+    """``department_rollup`` rows computed from an unsaved forecast, for dry runs."""
+    names = dict(Exam.objects.filter(pk__in={exam_id for exam_id, _ in forecast}).values_list('id', 'department__name'))
+    exams, quantities = Counter(), Counter()
+    for (exam_id, material_type), quantity in forecast.items():
+        key = (names[exam_id], material_type)
+        exams[key] += 1
+        quantities[key] += quantity
+    return [
+        {'exam__department__name': name, 'material_type': material_type,
+         'exams': exams[name, material_type], 'quantity': quantities[name, material_type]}
+        for name, material_type in sorted(exams)
+    ]
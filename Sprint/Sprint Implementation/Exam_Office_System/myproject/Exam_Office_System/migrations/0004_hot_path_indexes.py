@@ -0,0 +1,73 @@
+# Generated by Django 5.0.6 on 2026-10-17 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Exam_Office_System', '0003_sickbed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['exam', 'role', 'attendance_date'], name='attendance_exam_role_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['attendance_date'], name='attendance_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['department', 'session', 'exam_date'], name='exam_dept_session_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['session', 'batch', 'exam_date'], name='exam_session_batch_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['exam_date'], name='exam_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examregistration',
+            index=models.Index(fields=['student', 'status'], name='examreg_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examregistration',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['registration_date'], name='examreg_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examregistration',
+            index=models.Index(condition=models.Q(('payment_status', 'Pending')), fields=['student'], name='examreg_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['department', 'session'], name='student_dept_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['session'], name='student_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacherremuneration',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['teacher'], name='remuneration_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(condition=models.Q(('student__isnull', False)), fields=('exam', 'student', 'role'), name='unique_student_attendance'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(condition=models.Q(('teacher__isnull', False)), fields=('exam', 'teacher', 'role'), name='unique_teacher_attendance'),
+        ),
+        migrations.AddConstraint(
+            model_name='exammaterials',
+            constraint=models.UniqueConstraint(fields=('exam', 'material_type'), name='unique_exam_material'),
+        ),
+        migrations.AddConstraint(
+            model_name='teacherremuneration',
+            constraint=models.UniqueConstraint(fields=('teacher', 'exam', 'role'), name='unique_teacher_exam_role'),
+        ),
+    ]
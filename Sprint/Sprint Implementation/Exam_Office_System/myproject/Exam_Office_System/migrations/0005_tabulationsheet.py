@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-17 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Exam_Office_System', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TabulationSheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session', models.CharField(max_length=50)),
+                ('batch', models.CharField(max_length=50)),
+                ('courses', models.IntegerField()),
+                ('failed_courses', models.IntegerField()),
+                ('grade_points', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('gpa', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('cgpa', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tabulation_sheets', to='Exam_Office_System.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', 'batch', 'rank'], name='tabulation_batch_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tabulationsheet',
+            constraint=models.UniqueConstraint(fields=('student', 'session'), name='unique_student_tabulation'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-17 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Exam_Office_System', '0005_tabulationsheet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExaminerMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('examiner', models.PositiveSmallIntegerField(choices=[(1, 'Examiner 1'), (2, 'Examiner 2'), (3, 'Examiner 3')])),
+                ('marks', models.IntegerField()),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='examiner_marks', to='Exam_Office_System.exam')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='examiner_marks', to='Exam_Office_System.student')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AnswerScript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('ThirdExaminer', 'Third Examiner'), ('Finalised', 'Finalised')], default='Pending', max_length=20)),
+                ('discrepancy', models.IntegerField(blank=True, null=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_scripts', to='Exam_Office_System.exam')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_scripts', to='Exam_Office_System.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['exam', 'status'], name='answerscript_exam_status_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='answerscript',
+            constraint=models.UniqueConstraint(fields=('exam', 'student'), name='unique_answer_script'),
+        ),
+        migrations.AddConstraint(
+            model_name='examinermark',
+            constraint=models.UniqueConstraint(fields=('exam', 'student', 'examiner'), name='unique_examiner_mark'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-17 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Exam_Office_System', '0006_examiner_marks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemunerationRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('Invigilator', 'Invigilator'), ('Examiner', 'Examiner'), ('QuestionSetter', 'Question Setter'), ('Moderator', 'Moderator'), ('Translator', 'Translator')], max_length=20, unique=True)),
+                ('base_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('per_script_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-17 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Exam_Office_System', '0007_remuneration_rate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('building', models.CharField(blank=True, max_length=255)),
+                ('rows', models.PositiveIntegerField()),
+                ('columns', models.PositiveIntegerField()),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoomInvigilation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_date', models.DateField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invigilations', to='Exam_Office_System.room')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_invigilations', to='Exam_Office_System.teacher')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeatAllocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_date', models.DateField()),
+                ('seat_row', models.PositiveIntegerField()),
+                ('seat_column', models.PositiveIntegerField()),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_allocations', to='Exam_Office_System.exam')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_allocations', to='Exam_Office_System.room')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_allocations', to='Exam_Office_System.student')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='roominvigilation',
+            constraint=models.UniqueConstraint(fields=('exam_date', 'teacher'), name='unique_invigilator_per_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='seatallocation',
+            constraint=models.UniqueConstraint(fields=('exam_date', 'room', 'seat_row', 'seat_column'), name='unique_seat'),
+        ),
+        migrations.AddConstraint(
+            model_name='seatallocation',
+            constraint=models.UniqueConstraint(fields=('exam', 'student'), name='unique_exam_seat'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-17 11:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Exam_Office_System', '0008_seat_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClearanceAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('office', models.CharField(choices=[('hall', 'Hall'), ('library', 'Library')], max_length=20)),
+                ('previous', models.BooleanField(null=True)),
+                ('cleared', models.BooleanField()),
+                ('sync_id', models.UUIDField()),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='clearance_changes', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clearance_audits', to='Exam_Office_System.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'changed_at'], name='clearance_student_idx'), models.Index(fields=['sync_id'], name='clearance_sync_idx')],
+            },
+        ),
+    ]
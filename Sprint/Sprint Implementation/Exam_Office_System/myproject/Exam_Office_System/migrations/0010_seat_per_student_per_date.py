@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Exam_Office_System', '0009_clearance_audit'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='seatallocation',
+            constraint=models.UniqueConstraint(fields=('exam_date', 'student'), name='unique_student_seat_per_date'),
+        ),
+    ]
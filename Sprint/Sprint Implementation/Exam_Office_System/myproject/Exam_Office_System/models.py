@@ -1,5 +1,7 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from django.contrib.auth.validators import UnicodeUsernameValidator
 
 # Custom User Manager
 class UserManager(BaseUserManager):
@@ -31,7 +33,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         ('Student', 'Student'),
     ]
 
-    username = models.CharField(max_length=150, unique=True)
+    username_validator = UnicodeUsernameValidator()
+
+    username = models.CharField(max_length=150, unique=True, validators=[username_validator])
     email = models.EmailField(unique=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
     is_active = models.BooleanField(default=True)
@@ -64,9 +68,39 @@ class Student(models.Model):
     library_clearance = models.BooleanField(default=False,null=True)
     expelled = models.BooleanField(default=False,null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['department', 'session'], name='student_dept_session_idx'),
+            models.Index(fields=['session'], name='student_session_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+# Clearance Audit Model (one change of a student's hall or library clearance)
+class ClearanceAudit(models.Model):
+    OFFICE_CHOICES = [
+        ('hall', 'Hall'),
+        ('library', 'Library'),
+    ]
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='clearance_audits')
+    office = models.CharField(max_length=20, choices=OFFICE_CHOICES)
+    previous = models.BooleanField(null=True)
+    cleared = models.BooleanField()
+    sync_id = models.UUIDField()
+    changed_by = models.ForeignKey('User', on_delete=models.SET_NULL, null=True, blank=True, related_name='clearance_changes')
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'changed_at'], name='clearance_student_idx'),
+            models.Index(fields=['sync_id'], name='clearance_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.office} clearance of student {self.student_id}: {self.previous} -> {self.cleared}"
+
 # Teacher Model
 class Teacher(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='teacher_profile')
@@ -102,6 +136,17 @@ class Course(models.Model):
 
 # Exam Model
 class Exam(models.Model):
+    # Teacher assignment fields and the duty each one represents
+    TEACHER_ROLE_FIELDS = [
+        ('invigilator', 'Invigilator'),
+        ('examiner1', 'Examiner 1'),
+        ('examiner2', 'Examiner 2'),
+        ('examiner3', 'Examiner 3'),
+        ('question_creator', 'Question Setter'),
+        ('moderator', 'Moderator'),
+        ('translator', 'Translator'),
+    ]
+
     department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='exams')
     batch = models.CharField(max_length=50)
     session = models.CharField(max_length=50)
@@ -115,6 +160,13 @@ class Exam(models.Model):
     moderator = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, related_name='moderated_exams')
     translator = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, related_name='translated_exams')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['department', 'session', 'exam_date'], name='exam_dept_session_date_idx'),
+            models.Index(fields=['session', 'batch', 'exam_date'], name='exam_session_batch_date_idx'),
+            models.Index(fields=['exam_date'], name='exam_date_idx'),
+        ]
+
     def __str__(self):
         return f"Exam {self.id} for {self.course.course_code} on {self.exam_date}"
 
@@ -130,6 +182,26 @@ class ExamSchedule(models.Model):
     modified_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
 
+    def clean(self):
+        # Refuse to publish a schedule whose exam clashes with another on the same date
+        from .conflicts import exam_conflicts
+
+        if not self.exam_id:
+            return
+        errors = []
+        for conflict in exam_conflicts(self.exam):
+            others = ', '.join(str(pk) for pk in conflict.exam_ids if pk != self.exam_id)
+            if conflict.kind == 'batch':
+                errors.append(f"Batch {self.exam.batch} ({self.exam.session}) already has exam(s) {others} on {conflict.exam_date}.")
+            elif conflict.kind == 'student':
+                student = Student.objects.filter(pk=conflict.key).values_list('registration_number', flat=True).first()
+                errors.append(f"Student {student} is also registered for exam(s) {others} on {conflict.exam_date}.")
+            else:
+                teacher = Teacher.objects.filter(pk=conflict.key).values_list('name', flat=True).first()
+                errors.append(f"Teacher {teacher} is already assigned to exam(s) {others} on {conflict.exam_date}.")
+        if errors:
+            raise ValidationError(errors)
+
     def __str__(self):
         return f"Schedule for {self.exam}"
 
@@ -168,6 +240,14 @@ class ExamRegistration(models.Model):
     ineligibility_reasons = models.TextField(null=True, blank=True)
     admit_card_generated = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'status'], name='examreg_student_status_idx'),
+            # Partial indexes only hold the rows the office is still working on
+            models.Index(fields=['registration_date'], name='examreg_pending_idx', condition=models.Q(status='Pending')),
+            models.Index(fields=['student'], name='examreg_unpaid_idx', condition=models.Q(payment_status='Pending')),
+        ]
+
     def __str__(self):
         return f"Registration {self.id} by {self.student.name}"
 
@@ -183,6 +263,123 @@ class Result(models.Model):
     def __str__(self):
         return f"Result {self.id} - {self.student.name}: {self.marks} marks"
 
+# Room Model (exam hall with a grid of seats)
+class Room(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    building = models.CharField(max_length=255, blank=True)
+    rows = models.PositiveIntegerField()
+    columns = models.PositiveIntegerField()
+    is_active = models.BooleanField(default=True)
+
+    @property
+    def capacity(self):
+        return self.rows * self.columns
+
+    def __str__(self):
+        return f"{self.name} ({self.capacity} seats)"
+
+# Seat Allocation Model (one candidate's seat for one exam)
+class SeatAllocation(models.Model):
+    exam_date = models.DateField()
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='seat_allocations')
+    seat_row = models.PositiveIntegerField()
+    seat_column = models.PositiveIntegerField()
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='seat_allocations')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='seat_allocations')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam_date', 'room', 'seat_row', 'seat_column'], name='unique_seat'),
+            models.UniqueConstraint(fields=['exam', 'student'], name='unique_exam_seat'),
+            # One sitting per date: a candidate with two exams that day still has one seat
+            models.UniqueConstraint(fields=['exam_date', 'student'], name='unique_student_seat_per_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.room.name} R{self.seat_row}C{self.seat_column} on {self.exam_date}: student {self.student_id}"
+
+# Room Invigilation Model (invigilator on duty in a room on an exam date)
+class RoomInvigilation(models.Model):
+    exam_date = models.DateField()
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='invigilations')
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='room_invigilations')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam_date', 'teacher'], name='unique_invigilator_per_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.teacher.name} in {self.room.name} on {self.exam_date}"
+
+# Examiner Mark Model (each examiner's marks for one student's script)
+class ExaminerMark(models.Model):
+    EXAMINER_CHOICES = [
+        (1, 'Examiner 1'),
+        (2, 'Examiner 2'),
+        (3, 'Examiner 3'),
+    ]
+
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='examiner_marks')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='examiner_marks')
+    examiner = models.PositiveSmallIntegerField(choices=EXAMINER_CHOICES)
+    marks = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'student', 'examiner'], name='unique_examiner_mark'),
+        ]
+
+    def __str__(self):
+        return f"Examiner {self.examiner} mark for exam {self.exam_id}, student {self.student_id}: {self.marks}"
+
+# Answer Script Model (reconciliation state of one student's script)
+class AnswerScript(models.Model):
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('ThirdExaminer', 'Third Examiner'),
+        ('Finalised', 'Finalised'),
+    ]
+
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='answer_scripts')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='answer_scripts')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    discrepancy = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'student'], name='unique_answer_script'),
+        ]
+        indexes = [
+            models.Index(fields=['exam', 'status'], name='answerscript_exam_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Script of student {self.student_id} for exam {self.exam_id} ({self.status})"
+
+# Tabulation Sheet Model (one row per student per exam session, written by the tabulation engine)
+class TabulationSheet(models.Model):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='tabulation_sheets')
+    session = models.CharField(max_length=50)
+    batch = models.CharField(max_length=50)
+    courses = models.IntegerField()
+    failed_courses = models.IntegerField()
+    grade_points = models.DecimalField(max_digits=7, decimal_places=2)
+    gpa = models.DecimalField(max_digits=3, decimal_places=2)
+    cgpa = models.DecimalField(max_digits=3, decimal_places=2)
+    rank = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'session'], name='unique_student_tabulation'),
+        ]
+        indexes = [
+            models.Index(fields=['session', 'batch', 'rank'], name='tabulation_batch_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"Tabulation {self.session} - {self.student_id}: GPA {self.gpa}"
+
 # Marksheet Application Model
 class MarksheetApplication(models.Model):
     STATUS_CHOICES = [
@@ -273,9 +470,26 @@ class TeacherRemuneration(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['teacher'], name='remuneration_pending_idx', condition=models.Q(status='Pending')),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['teacher', 'exam', 'role'], name='unique_teacher_exam_role'),
+        ]
+
     def __str__(self):
         return f"Remuneration {self.id} for {self.teacher.name} as {self.role}"
 
+# Remuneration Rate Model (rate table used to calculate TeacherRemuneration)
+class RemunerationRate(models.Model):
+    role = models.CharField(max_length=20, choices=TeacherRemuneration.ROLE_CHOICES, unique=True)
+    base_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    per_script_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.role}: {self.base_amount} + {self.per_script_amount} per script"
+
 # Exam Materials Model
 class ExamMaterials(models.Model):
     MATERIAL_TYPE_CHOICES = [
@@ -288,6 +502,11 @@ class ExamMaterials(models.Model):
     material_type = models.CharField(max_length=50, choices=MATERIAL_TYPE_CHOICES)
     quantity = models.IntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'material_type'], name='unique_exam_material'),
+        ]
+
     def __str__(self):
         return f"{self.material_type} for {self.exam}"
 
@@ -304,6 +523,16 @@ class Attendance(models.Model):
     attendance_date = models.DateField()
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['exam', 'role', 'attendance_date'], name='attendance_exam_role_date_idx'),
+            models.Index(fields=['attendance_date'], name='attendance_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'student', 'role'], condition=models.Q(student__isnull=False), name='unique_student_attendance'),
+            models.UniqueConstraint(fields=['exam', 'teacher', 'role'], condition=models.Q(teacher__isnull=False), name='unique_teacher_attendance'),
+        ]
+
     def __str__(self):
         if self.role == 'Student':
             return f"Attendance {self.id} - {self.student.name} as {self.role} on {self.attendance_date}"
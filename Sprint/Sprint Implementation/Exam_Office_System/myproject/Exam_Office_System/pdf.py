@@ -0,0 +1,135 @@
+import os
+import zlib
+
+import django
+from django.apps import apps
+
+# A4 in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+CATALOG_ID = 1
+PAGES_ID = 2
+FONT_IDS = {'regular': 3, 'bold': 4}
+FONT_NAMES = {'regular': 'Helvetica', 'bold': 'Helvetica-Bold'}
+
+
+class Page:
+    """Drawing operations for one page; coordinates are points from the bottom-left corner."""
+
+    def __init__(self):
+        self.operations = []
+
+    def text(self, x, y, text, size=11, bold=False):
+        font = 'F2' if bold else 'F1'
+        self.operations.append(f'BT /{font} {size} Tf {x} {y} Td ({_escape(text)}) Tj ET')
+
+    def line(self, x1, y1, x2, y2, width=0.8):
+        self.operations.append(f'{width} w {x1} {y1} m {x2} {y2} l S')
+
+    def rect(self, x, y, width, height, line_width=0.8):
+        self.operations.append(f'{line_width} w {x} {y} {width} {height} re S')
+
+    def content(self):
+        return '\n'.join(self.operations).encode('latin-1', 'replace')
+
+
+class PdfWriter:
+    """
+    Minimal PDF writer for text-only documents in the built-in Helvetica fonts.
+
+    Every page is written to ``fileobj`` as soon as it is added, so a bundle of thousands
+    of pages never sits in memory; only object offsets are kept for the trailer.
+    """
+
+    def __init__(self, fileobj):
+        self.file = fileobj
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = max(FONT_IDS.values()) + 1
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        for style, object_id in FONT_IDS.items():
+            self._object(object_id, (
+                f'<< /Type /Font /Subtype /Type1 /BaseFont /{FONT_NAMES[style]} '
+                f'/Encoding /WinAnsiEncoding >>'
+            ).encode())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.close()
+
+    def _write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def _object(self, object_id, body):
+        self.offsets[object_id] = self.position
+        self._write(f'{object_id} 0 obj\n'.encode() + body + b'\nendobj\n')
+
+    def _allocate(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def add_page(self, page):
+        stream = zlib.compress(page.content())
+        content_id = self._allocate()
+        self._object(content_id, (
+            f'<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n'.encode() + stream + b'\nendstream'
+        ))
+        page_id = self._allocate()
+        fonts = ' '.join(f'/F{number} {object_id} 0 R' for number, object_id in enumerate(FONT_IDS.values(), 1))
+        self._object(page_id, (
+            f'<< /Type /Page /Parent {PAGES_ID} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+            f'/Resources << /Font << {fonts} >> >> /Contents {content_id} 0 R >>'
+        ).encode())
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = ' '.join(f'{page_id} 0 R' for page_id in self.page_ids)
+        self._object(PAGES_ID, f'<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>'.encode())
+        self._object(CATALOG_ID, f'<< /Type /Catalog /Pages {PAGES_ID} 0 R >>'.encode())
+        xref_position = self.position
+        lines = [f'xref\n0 {self.next_id}\n', '0000000000 65535 f \n']
+        for object_id in range(1, self.next_id):
+            lines.append(f'{self.offsets[object_id]:010d} 00000 n \n')
+        lines.append(f'trailer\n<< /Size {self.next_id} /Root {CATALOG_ID} 0 R >>\nstartxref\n{xref_position}\n%%EOF\n')
+        self._write(''.join(lines).encode())
+
+
+def write_pdf(path, pages):
+    """
+    Write ``pages`` (any iterable, consumed as it is written) to ``path`` atomically.
+
+    The PDF goes to a temporary file beside ``path`` that replaces it only once complete,
+    so readers and an interrupted run never leave a truncated file under the real name.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part = f'{path}.{os.getpid()}.part'
+    try:
+        with open(part, 'wb') as output, PdfWriter(output) as pdf:
+            for page in pages:
+                pdf.add_page(page)
+        os.replace(part, path)
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+
+
+def init_render_worker():
+    """``ProcessPoolExecutor`` initializer for rendering pools.
+
+    Spawned (non-forked) workers, the default on Windows and macOS, start without Django
+    configured and could not even unpickle a task that names a function in this app.
+    """
+    if not apps.ready:
+        django.setup()
+
+
+def _escape(text):
+    return str(text).replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
@@ -0,0 +1,156 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Student, Exam, ExamRegistration, Result, MarksheetApplication, CertificateApplication,
+    TabulationSheet, SeatAllocation
+)
+from .routing import stale_cache_timeout
+
+
+# Cache keys
+# Portals are cached per student and dropped when one of the student's rows changes
+# (signals.py, and the bulk jobs that write results or statuses). Exam and schedule edits
+# touch every candidate's portal, so those bump a shared version instead.
+
+def portal_cache_key(student_id):
+    return f'portal:student:{student_id}'
+
+def portal_version():
+    return cache.get_or_set('portal:version', 1, None)
+
+def invalidate_student_portals(student_ids):
+    cache.delete_many([portal_cache_key(student_id) for student_id in student_ids], version=portal_version())
+
+def invalidate_all_portals():
+    try:
+        cache.incr('portal:version')
+    except ValueError:
+        cache.set('portal:version', 2, None)
+
+
+# Prefetch plan
+# One query per relation, however long the student's history is.
+
+def portal_queryset():
+    today = timezone.localdate()
+    exams = Exam.objects.select_related('course', 'schedule').order_by('exam_date')
+    return Student.objects.select_related('department', 'sick_student').prefetch_related(
+        Prefetch(
+            'exam_registrations',
+            queryset=ExamRegistration.objects.order_by('-registration_date', '-id').prefetch_related(
+                Prefetch('exams', queryset=exams)
+            ),
+        ),
+        Prefetch('results', queryset=Result.objects.select_related('exam__course').order_by('exam__exam_date')),
+        Prefetch(
+            'marksheet_applications',
+            queryset=MarksheetApplication.objects.select_related('exam__course').order_by('-application_date', '-id'),
+        ),
+        Prefetch('certificate_applications', queryset=CertificateApplication.objects.order_by('-application_date', '-id')),
+        Prefetch('tabulation_sheets', queryset=TabulationSheet.objects.order_by('session')),
+        Prefetch(
+            'seat_allocations',
+            queryset=SeatAllocation.objects.filter(exam_date__gte=today).select_related('room').order_by('exam_date'),
+        ),
+    )
+
+def _exam(exam):
+    schedule = getattr(exam, 'schedule', None)
+    return {
+        'id': exam.pk,
+        'exam_date': exam.exam_date,
+        'course_code': exam.course.course_code,
+        'course_title': exam.course.course_title,
+        'schedule_status': schedule.status if schedule else None,
+    }
+
+def _application(application, kind):
+    approved = application.status == 'Approved'
+    return {
+        'id': application.pk,
+        'application_date': application.application_date,
+        'status': application.status,
+        'payment_status': application.payment_status,
+        'download_url': reverse(f'download_{kind}', args=[application.token]) if approved else None,
+    }
+
+def build_student_portal(student_id):
+    """Plain-data view model of everything a student can see about themselves."""
+    # tabulation imports this module for invalidation
+    from .tabulation import GradingScale
+
+    student = portal_queryset().filter(pk=student_id).first()
+    if student is None:
+        return None
+    scale = GradingScale()
+    today = timezone.localdate()
+    sickbed = getattr(student, 'sick_student', None)
+    results = list(student.results.all())
+    letters = scale.letter([result.marks for result in results]) if results else []
+    points = scale.grade_points([result.marks for result in results]) if results else []
+    return {
+        'student': {
+            'name': student.name,
+            'registration_number': student.registration_number,
+            'department': student.department.name,
+            'department_id': student.department_id,
+            'session': student.session,
+            'hall_clearance': student.hall_clearance,
+            'library_clearance': student.library_clearance,
+        },
+        'registrations': [
+            {
+                'id': registration.pk,
+                'registration_type': registration.registration_type,
+                'registration_date': registration.registration_date,
+                'status': registration.status,
+                'payment_status': registration.payment_status,
+                'ineligibility_reasons': registration.ineligibility_reasons,
+                'admit_card_generated': registration.admit_card_generated,
+                'exams': [_exam(exam) for exam in registration.exams.all()],
+            }
+            for registration in student.exam_registrations.all()
+        ],
+        'upcoming_exams': sorted(
+            {
+                exam.pk: _exam(exam)
+                for registration in student.exam_registrations.all() if registration.status != 'Rejected'
+                for exam in registration.exams.all() if exam.exam_date >= today
+            }.values(),
+            key=lambda exam: exam['exam_date'],
+        ),
+        'seats': [
+            {'exam_id': seat.exam_id, 'exam_date': seat.exam_date, 'room': seat.room.name,
+             'building': seat.room.building, 'seat': f'R{seat.seat_row}-C{seat.seat_column}'}
+            for seat in student.seat_allocations.all()
+        ],
+        'results': [
+            {'exam_id': result.exam_id, 'exam_date': result.exam.exam_date, 'session': result.exam.session,
+             'course_code': result.exam.course.course_code, 'course_title': result.exam.course.course_title,
+             'marks': result.marks, 'letter_grade': str(letter), 'grade_point': float(point)}
+            for result, letter, point in zip(results, letters, points)
+        ],
+        'tabulations': [
+            {'session': sheet.session, 'gpa': sheet.gpa, 'cgpa': sheet.cgpa, 'rank': sheet.rank,
+             'failed_courses': sheet.failed_courses}
+            for sheet in student.tabulation_sheets.all()
+        ],
+        'marksheet_applications': [
+            {**_application(application, 'marksheet'), 'course_code': application.exam.course.course_code}
+            for application in student.marksheet_applications.all()
+        ],
+        'certificate_applications': [
+            {**_application(application, 'certificate'), 'degree': application.get_degree_display()}
+            for application in student.certificate_applications.all()
+        ],
+        'sickbed': {'reason': sickbed.reason} if sickbed else None,
+    }
+
+def get_student_portal(student_id):
+    timeout = stale_cache_timeout(getattr(settings, 'PORTAL_CACHE_TIMEOUT', 3600))
+    return cache.get_or_set(portal_cache_key(student_id), lambda: build_student_portal(student_id), timeout,
+                            version=portal_version())
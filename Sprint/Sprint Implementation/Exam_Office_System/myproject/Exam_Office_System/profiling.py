@@ -0,0 +1,304 @@
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import base as template_base
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+RECENT_SLOW_REQUESTS = 50
+
+# The profile of the request being sampled in this thread or task, if any
+_active_profile = ContextVar('active_profile', default=None)
+
+
+# Histograms
+
+class Histogram:
+    """Prometheus-style histogram: observation counts per upper bound, plus sum and count."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """``(upper bound, observations <= bound)`` pairs, ending with ``'+Inf'``."""
+        total, pairs = 0, []
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the ``fraction`` quantile (``None`` if empty or past the last bucket)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return None if bound == '+Inf' else bound
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.sampled = 0
+        self.slow = 0
+        self.duplicate_queries = 0
+        self.seconds = Histogram(SECONDS_BUCKETS)
+        self.db_seconds = Histogram(SECONDS_BUCKETS)
+        self.template_seconds = Histogram(SECONDS_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    HISTOGRAMS = ('seconds', 'db_seconds', 'template_seconds', 'queries')
+
+
+class MetricsRegistry:
+    """In-process metrics of every view, shared by the threads of one worker."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+            self.recent_slow = deque(maxlen=RECENT_SLOW_REQUESTS)
+            self.started = timezone.now()
+
+    def _view(self, view_name):
+        metrics = self.views.get(view_name)
+        if metrics is None:
+            metrics = self.views[view_name] = ViewMetrics()
+        return metrics
+
+    def count(self, view_name):
+        with self.lock:
+            self._view(view_name).requests += 1
+
+    def observe(self, view_name, profile, slow):
+        with self.lock:
+            metrics = self._view(view_name)
+            metrics.requests += 1
+            metrics.sampled += 1
+            metrics.seconds.observe(profile.seconds)
+            metrics.db_seconds.observe(profile.query_seconds)
+            metrics.template_seconds.observe(profile.template_seconds)
+            metrics.queries.observe(profile.query_count)
+            metrics.duplicate_queries += profile.duplicates
+            if slow:
+                metrics.slow += 1
+                self.recent_slow.append(profile.summary(view_name))
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'since': self.started.isoformat(),
+                'sample_rate': sample_rate(),
+                'views': {
+                    view_name: {
+                        'requests': metrics.requests,
+                        'sampled': metrics.sampled,
+                        'slow': metrics.slow,
+                        'duplicate_queries': metrics.duplicate_queries,
+                        **{name: getattr(metrics, name).as_dict() for name in ViewMetrics.HISTOGRAMS},
+                    }
+                    for view_name, metrics in sorted(self.views.items())
+                },
+                'recent_slow': list(self.recent_slow),
+            }
+
+    def prometheus(self, namespace='exam_office'):
+        """The metrics in the Prometheus text exposition format."""
+        histograms = {
+            'seconds': ('request_seconds', 'Wall time of sampled requests'),
+            'db_seconds': ('db_seconds', 'Database time of sampled requests'),
+            'template_seconds': ('template_seconds', 'Template render time of sampled requests'),
+            'queries': ('queries', 'Database queries per sampled request'),
+        }
+        counters = {
+            'requests': ('requests_total', 'Requests, sampled or not'),
+            'sampled': ('sampled_requests_total', 'Requests profiled'),
+            'slow': ('slow_requests_total', 'Sampled requests over the slow threshold or with duplicated queries'),
+            'duplicate_queries': ('duplicate_queries_total', 'Repeated identical SQL in sampled requests'),
+        }
+        with self.lock:
+            views = sorted(self.views.items())
+            lines = []
+            for attribute, (name, help_text) in counters.items():
+                lines += [f'# HELP {namespace}_{name} {help_text}', f'# TYPE {namespace}_{name} counter']
+                lines += [f'{namespace}_{name}{{view="{_label(view)}"}} {getattr(metrics, attribute)}' for view, metrics in views]
+            for attribute, (name, help_text) in histograms.items():
+                lines += [f'# HELP {namespace}_{name} {help_text}', f'# TYPE {namespace}_{name} histogram']
+                for view, metrics in views:
+                    histogram = getattr(metrics, attribute)
+                    label = _label(view)
+                    lines += [
+                        f'{namespace}_{name}_bucket{{view="{label}",le="{bound}"}} {total}'
+                        for bound, total in histogram.cumulative()
+                    ]
+                    lines.append(f'{namespace}_{name}_sum{{view="{label}"}} {histogram.sum:.6f}')
+                    lines.append(f'{namespace}_{name}_count{{view="{label}"}} {histogram.count}')
+        lines += [
+            f'# HELP {namespace}_profiling_sample_rate Share of requests profiled',
+            f'# TYPE {namespace}_profiling_sample_rate gauge',
+            f'{namespace}_profiling_sample_rate {sample_rate()}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+registry = MetricsRegistry()
+
+
+# Request profiles
+
+class RequestProfile:
+    def __init__(self, request):
+        self.method = request.method
+        self.path = request.path
+        self.seconds = 0
+        self.query_seconds = 0
+        self.template_seconds = 0
+        self.template_depth = 0
+        self.statements = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook: time the query and count its SQL text."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_seconds += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    @property
+    def query_count(self):
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self):
+        # The same SQL text run again is usually a query inside a loop (N+1)
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def summary(self, view_name):
+        repeated = [(sql, count) for sql, count in self.statements.most_common(3) if count > 1]
+        return {
+            'at': timezone.now().isoformat(),
+            'view': view_name,
+            'method': self.method,
+            'path': self.path,
+            'ms': round(self.seconds * 1000, 1),
+            'queries': self.query_count,
+            'db_ms': round(self.query_seconds * 1000, 1),
+            'template_ms': round(self.template_seconds * 1000, 1),
+            'duplicates': self.duplicates,
+            'repeated': [{'sql': sql[:300], 'count': count} for sql, count in repeated],
+        }
+
+
+_original_render = template_base.Template.render
+
+def _timed_render(self, context):
+    profile = _active_profile.get()
+    if profile is None or profile.template_depth:
+        # Included templates are part of their parent's time
+        return _original_render(self, context)
+    profile.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        profile.template_depth -= 1
+        profile.template_seconds += time.perf_counter() - started
+
+def install_template_timer():
+    template_base.Template.render = _timed_render
+
+
+# Middleware
+
+def sample_rate():
+    return getattr(settings, 'PROFILING_SAMPLE_RATE', 0.1)
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else '<unresolved>'
+
+class ProfilingMiddleware:
+    """
+    Profile a sample of requests: wall, database and template time, query count and
+    repeated SQL, aggregated per view name in ``registry``.
+
+    Opt-in with ``PROFILING_ENABLED``; otherwise Django drops the middleware at startup.
+    Requests outside the ``PROFILING_SAMPLE_RATE`` sample are only counted. A sampled
+    request slower than ``PROFILING_SLOW_MS``, or repeating a query at least
+    ``PROFILING_DUPLICATE_THRESHOLD`` times, is logged and kept in ``recent_slow``.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        if random.random() >= sample_rate():
+            response = self.get_response(request)
+            registry.count(view_name(request))
+            return response
+
+        profile = RequestProfile(request)
+        token = _active_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(profile.record_query))
+                response = self.get_response(request)
+        finally:
+            profile.seconds = time.perf_counter() - started
+            _active_profile.reset(token)
+
+        name = view_name(request)
+        slow = (
+            profile.seconds * 1000 >= getattr(settings, 'PROFILING_SLOW_MS', 500)
+            or profile.duplicates >= getattr(settings, 'PROFILING_DUPLICATE_THRESHOLD', 10)
+        )
+        registry.observe(name, profile, slow)
+        if slow:
+            summary = profile.summary(name)
+            logger.warning(
+                'Slow request %s %s (%s): %sms, %s queries (%s repeated), %sms in the database, %sms in templates',
+                summary['method'], summary['path'], name, summary['ms'], summary['queries'],
+                summary['duplicates'], summary['db_ms'], summary['template_ms'],
+            )
+        return response
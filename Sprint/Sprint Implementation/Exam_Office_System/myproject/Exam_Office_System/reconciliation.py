@@ -0,0 +1,87 @@
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import AnswerScript, ExaminerMark, Result
+from .portal import invalidate_student_portals
+
+
+def _average(first, second):
+    # Half-up rounding for non-negative integer marks
+    return (first + second + 1) // 2
+
+def reconcile_script(marks, threshold):
+    """
+    Return ``(status, discrepancy, final_marks)`` for one script's ``{examiner: marks}``.
+
+    The first two examiners are averaged when they agree within ``threshold``; otherwise
+    the script waits for examiner 3, whose marks are then averaged with the closer of the two.
+    """
+    first, second, third = marks.get(1), marks.get(2), marks.get(3)
+    if first is None or second is None:
+        return 'Pending', None, None
+    discrepancy = abs(first - second)
+    if discrepancy <= threshold:
+        return 'Finalised', discrepancy, _average(first, second)
+    if third is None:
+        return 'ThirdExaminer', discrepancy, None
+    closer = first if abs(first - third) <= abs(second - third) else second
+    return 'Finalised', discrepancy, _average(third, closer)
+
+def reconcile_marks(examiner_marks, threshold=None, batch_size=1000):
+    """
+    Reconcile every script found in the ``examiner_marks`` queryset (an exam or a session).
+
+    Marks are read in one query, and script states and final ``Result.marks`` are upserted
+    with one ``bulk_create`` each, so reruns after examiner 3 submits are cheap and idempotent.
+    A script that is no longer finalised (say, examiner 2 corrected their marks) loses its
+    ``Result``, so stale marks are never published.
+    """
+    if threshold is None:
+        threshold = getattr(settings, 'THIRD_EXAMINER_THRESHOLD', 20)
+    started = time.perf_counter()
+
+    scripts = defaultdict(dict)
+    for exam_id, student_id, examiner, marks in examiner_marks.values_list('exam_id', 'student_id', 'examiner', 'marks'):
+        scripts[(exam_id, student_id)][examiner] = marks
+
+    states, results = [], []
+    unfinalised = defaultdict(list)
+    report = {'Pending': 0, 'ThirdExaminer': 0, 'Finalised': 0}
+    for (exam_id, student_id), marks in scripts.items():
+        status, discrepancy, final = reconcile_script(marks, threshold)
+        report[status] += 1
+        states.append(AnswerScript(exam_id=exam_id, student_id=student_id, status=status, discrepancy=discrepancy))
+        if final is not None:
+            results.append(Result(exam_id=exam_id, student_id=student_id, marks=final))
+        else:
+            unfinalised[exam_id].append(student_id)
+
+    with transaction.atomic():
+        AnswerScript.objects.bulk_create(
+            states, batch_size=batch_size, update_conflicts=True,
+            unique_fields=['exam', 'student'], update_fields=['status', 'discrepancy'],
+        )
+        Result.objects.bulk_create(
+            results, batch_size=batch_size, update_conflicts=True,
+            unique_fields=['exam', 'student'], update_fields=['marks'],
+        )
+        withdrawn = set()
+        for exam_id, student_ids in unfinalised.items():
+            for start in range(0, len(student_ids), batch_size):
+                stale = Result.objects.filter(exam_id=exam_id, student_id__in=student_ids[start:start + batch_size])
+                withdrawn.update(stale.values_list('student_id', flat=True))
+                stale.delete()
+
+    invalidate_student_portals({result.student_id for result in results} | withdrawn)
+
+    report['withdrawn'] = len(withdrawn)
+    report['scripts'] = len(scripts)
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+def third_examiner_queue(teacher):
+    """Scripts waiting for ``teacher`` as examiner 3."""
+    return AnswerScript.objects.filter(status='ThirdExaminer', exam__examiner3=teacher).select_related('exam__course', 'student')
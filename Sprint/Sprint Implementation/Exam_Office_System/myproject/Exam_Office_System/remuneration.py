@@ -0,0 +1,126 @@
+import csv
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .dashboard import summary_cache_key
+from .models import Exam, RemunerationRate, TeacherRemuneration
+
+# Exam teacher field -> TeacherRemuneration role; the three examiners share one role,
+# so a teacher holding two examiner slots on one exam gets one line with both amounts
+FIELD_ROLES = {
+    'invigilator': 'Invigilator',
+    'examiner1': 'Examiner',
+    'examiner2': 'Examiner',
+    'examiner3': 'Examiner',
+    'question_creator': 'QuestionSetter',
+    'moderator': 'Moderator',
+    'translator': 'Translator',
+}
+
+PAYMENT_COLUMNS = ['remuneration_id', 'teacher_id', 'teacher', 'department', 'course_code', 'exam_date', 'role', 'amount']
+
+
+def session_exams(session, department=None):
+    exams = Exam.objects.filter(session=session)
+    if department is not None:
+        exams = exams.filter(department=department)
+    return exams
+
+def remuneration_lines(exams, rates):
+    """
+    Derive ``{(teacher_id, exam_id, role): amount}`` for the exams in one query.
+
+    Each assignment earns its role's base amount plus the per-script amount for every
+    non-rejected registration of the exam. Roles without a rate earn nothing.
+    """
+    rows = exams.values('id', *(f'{field}_id' for field in FIELD_ROLES)).annotate(
+        scripts=Count('registrations', filter=~Q(registrations__status='Rejected')),
+    )
+    lines = defaultdict(Decimal)
+    for row in rows:
+        for field, role in FIELD_ROLES.items():
+            teacher_id = row[f'{field}_id']
+            rate = rates.get(role)
+            if teacher_id is not None and rate is not None:
+                lines[(teacher_id, row['id'], role)] += rate.base_amount + rate.per_script_amount * row['scripts']
+    return lines
+
+def calculate_remuneration(exams, batch_size=1000):
+    """
+    Create the missing ``TeacherRemuneration`` rows for the exams.
+
+    Existing rows are left alone (conflicts are ignored), so reruns are idempotent and
+    never touch lines already paid. Returns a report with the lines derived and created.
+    """
+    started = time.perf_counter()
+    rates = {rate.role: rate for rate in RemunerationRate.objects.all()}
+    lines = remuneration_lines(exams, rates)
+    remunerations = TeacherRemuneration.objects.filter(exam__in=exams)
+
+    with transaction.atomic():
+        before = remunerations.count()
+        TeacherRemuneration.objects.bulk_create(
+            [
+                TeacherRemuneration(teacher_id=teacher_id, exam_id=exam_id, role=role, amount=amount)
+                for (teacher_id, exam_id, role), amount in lines.items()
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        created = remunerations.count() - before
+    # Bulk writes send no signals, so drop the Exam Office's unpaid totals here
+    cache.delete(summary_cache_key('exam_office'))
+    return {
+        'lines': len(lines),
+        'created': created,
+        'missing_rates': sorted(set(FIELD_ROLES.values()) - set(rates)),
+        'seconds': time.perf_counter() - started,
+    }
+
+def remuneration_totals(remunerations, by='teacher'):
+    """Total, pending and paid amounts per teacher or per department."""
+    group = ('teacher_id', 'teacher__name') if by == 'teacher' else ('teacher__department_id', 'teacher__department__name')
+    return (
+        remunerations.values(*group)
+        .annotate(
+            total=Sum('amount'),
+            pending=Sum('amount', filter=Q(status='Pending'), default=0),
+            paid=Sum('amount', filter=Q(status='Paid'), default=0),
+            lines=Count('id'),
+        )
+        .order_by(group[1])
+    )
+
+def export_payment_batch(remunerations, output, batch_size=1000):
+    """
+    Write the pending rows of ``remunerations`` as a payment CSV and mark them ``Paid``.
+
+    Rows are locked while the batch is written, so two exports never pay a line twice.
+    Returns ``(lines, total amount)``.
+    """
+    writer = csv.writer(output)
+    writer.writerow(PAYMENT_COLUMNS)
+    total = Decimal(0)
+    with transaction.atomic():
+        pending = list(
+            remunerations.filter(status='Pending')
+            .select_related('teacher__department', 'exam__course')
+            .select_for_update(of=('self',))
+            .order_by('teacher__department__name', 'teacher__name', 'exam__exam_date')
+        )
+        for remuneration in pending:
+            writer.writerow([
+                remuneration.pk, remuneration.teacher_id, remuneration.teacher.name,
+                remuneration.teacher.department.name, remuneration.exam.course.course_code,
+                remuneration.exam.exam_date, remuneration.role, remuneration.amount,
+            ])
+            remuneration.status = 'Paid'
+            total += remuneration.amount
+        TeacherRemuneration.objects.bulk_update(pending, ['status'], batch_size=batch_size)
+    cache.delete(summary_cache_key('exam_office'))
+    return len(pending), total
@@ -0,0 +1,151 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .database import replica_lag
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# True inside replica_reads(): reads there may be served by a replica
+_replica_reads = ContextVar('replica_reads', default=False)
+# The routing state of the request being handled, if any (see ReplicaRoutingMiddleware)
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+# Read scopes
+# Only code that opts in reads from a replica; everything else, including the reads a
+# write depends on, stays on the primary.
+
+@contextmanager
+def replica_reads():
+    """Let reads in this block (or view, used as a decorator) go to a replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+def reads_may_be_stale():
+    """Whether reads here may come from a replica, so anything cached from them should expire soon."""
+    state = _request_state.get()
+    return bool(_replica_reads.get() and replica_aliases() and not (state and state.pinned))
+
+def stale_cache_timeout(timeout):
+    """``timeout`` for data read here, capped at ``REPLICA_MAX_LAG`` when it may be stale."""
+    if reads_may_be_stale():
+        return min(timeout, getattr(settings, 'REPLICA_MAX_LAG', 5))
+    return timeout
+
+
+# Replica health
+# Lag is measured at most every REPLICA_LAG_CHECK_INTERVAL seconds per replica and
+# process; a replica that lags more than REPLICA_MAX_LAG, or fails the check, is skipped.
+
+_lag_checks = {}
+
+def replica_available(alias):
+    checked_at, lag = _lag_checks.get(alias, (None, None))
+    now = time.monotonic()
+    if checked_at is None or now - checked_at >= getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 2):
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError as error:
+            logger.warning('Replica %s is unavailable: %s', alias, error)
+            lag = None
+        _lag_checks[alias] = (now, lag)
+    return lag is not None and lag <= getattr(settings, 'REPLICA_MAX_LAG', 5)
+
+def reset_replica_checks():
+    _lag_checks.clear()
+
+
+# Router
+
+class ReplicaRouter:
+    """
+    Send reads inside ``replica_reads()`` to a random healthy replica and everything else
+    to the primary.
+
+    Reads stay on the primary while the request is pinned (it is not a GET, or the
+    session wrote recently), inside a transaction, and for sessions, which are written on
+    login and must be read back at once.
+    """
+
+    def db_for_read(self, model, **hints):
+        # Explicit, or Django would follow an instance read from a replica back to it
+        aliases = replica_aliases()
+        if not aliases or not _replica_reads.get() or model._meta.app_label == 'sessions':
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if state is not None and state.pinned:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        available = [alias for alias in aliases if replica_available(alias)]
+        return random.choice(available) if available else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and model._meta.app_label != 'sessions':
+            # Later reads in this request, and in this session for a while, see the write
+            state.wrote = state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        return False if db in replica_aliases() else None
+
+
+# Read-your-writes
+
+class RoutingState:
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+class ReplicaRoutingMiddleware:
+    """
+    Pin a session to the primary for ``REPLICA_STICKY_SECONDS`` after it writes, so its
+    next pages show what it just saved even before the replicas catch up.
+
+    The pin is a cookie, which also covers anonymous visitors. Django drops the middleware
+    when ``DATABASE_REPLICAS`` is empty.
+    """
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = getattr(settings, 'REPLICA_PIN_COOKIE', 'pin_primary')
+        state = RoutingState(pinned=request.method not in SAFE_METHODS or cookie in request.COOKIES)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                cookie, '1', max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 15),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,126 @@
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Department, ExamSchedule
+from .routing import stale_cache_timeout
+
+
+# Snapshots
+# One snapshot per department holds every published exam schedule row plus an ETag of
+# its content. It is rebuilt only after an ExamSchedule or Exam change (see signals.py),
+# so a rush of students after publication is served from the cache. Clients revalidate
+# by ETag alone: schedules carry dates, not times, too coarse for Last-Modified.
+
+def snapshot_cache_key(department_id):
+    return f'schedule:department:{department_id}'
+
+def invalidate_schedule_snapshots(department_ids):
+    keys = [snapshot_cache_key(department_id) for department_id in department_ids]
+    cache.delete_many(keys)
+    # A request racing the open transaction may cache the old rows again; drop them on commit too
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+def build_snapshot(department_id):
+    department = Department.objects.filter(pk=department_id).values_list('name', flat=True).first()
+    if department is None:
+        return None
+    exams = list(
+        ExamSchedule.objects.filter(exam__department_id=department_id)
+        .order_by('exam__exam_date', 'exam__batch', 'exam_id')
+        .values(
+            'exam_id', 'exam__exam_date', 'exam__batch', 'exam__session', 'exam__course__course_code',
+            'exam__course__course_title', 'status', 'published_date', 'modified_date',
+        )
+    )
+    exams = [
+        {
+            'exam_id': row['exam_id'],
+            'exam_date': row['exam__exam_date'],
+            'batch': row['exam__batch'],
+            'session': row['exam__session'],
+            'course_code': row['exam__course__course_code'],
+            'course_title': row['exam__course__course_title'],
+            'status': row['status'],
+            'published_date': row['published_date'],
+            'modified_date': row['modified_date'],
+        }
+        for row in exams
+    ]
+    changed = [date for row in exams for date in (row['published_date'], row['modified_date']) if date]
+    content = json.dumps([department, exams], cls=DjangoJSONEncoder, sort_keys=True).encode()
+    return {
+        'department_id': department_id,
+        'department': department,
+        'exams': exams,
+        'etag': hashlib.sha256(content).hexdigest()[:32],
+        'updated_on': max(changed) if changed else None,
+        'generated_at': timezone.now(),
+    }
+
+def get_snapshot(department_id):
+    """The department's schedule snapshot, or ``None`` if the department does not exist."""
+    snapshot = cache.get(snapshot_cache_key(department_id))
+    if snapshot is None:
+        snapshot = build_snapshot(department_id)
+        if snapshot is not None:
+            # A snapshot read from a lagging replica must not outlive the lag
+            timeout = stale_cache_timeout(getattr(settings, 'SCHEDULE_SNAPSHOT_TIMEOUT', 24 * 60 * 60))
+            cache.set(snapshot_cache_key(department_id), snapshot, timeout)
+    return snapshot
+
+def batch_exams(snapshot, batch=None):
+    if batch is None:
+        return snapshot['exams']
+    return [exam for exam in snapshot['exams'] if exam['batch'] == batch]
+
+
+# iCalendar
+
+def _escape(text):
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _fold(line):
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(encoded[:size].decode())
+        encoded = encoded[size:]
+    return '\r\n '.join(parts)
+
+def render_ics(snapshot, batch=None, host='exam-office'):
+    # DTSTAMP is when this copy of the calendar was generated, in UTC
+    stamp = snapshot['generated_at'].astimezone(datetime.timezone.utc)
+    title = snapshot['department'] + (f' batch {batch}' if batch else '')
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Exam Office System//Exam Schedule//EN',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{_escape(title)} exams',
+    ]
+    for exam in batch_exams(snapshot, batch):
+        lines += [
+            'BEGIN:VEVENT',
+            f"UID:exam-{exam['exam_id']}@{host}",
+            f"DTSTAMP:{stamp:%Y%m%dT%H%M%SZ}",
+            f"DTSTART;VALUE=DATE:{exam['exam_date']:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{exam['exam_date'] + datetime.timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_escape(exam['course_code'])} {_escape(exam['course_title'])} (batch {_escape(exam['batch'])})",
+            f"DESCRIPTION:{_escape(snapshot['department'])}\\, session {_escape(exam['session'])}\\, schedule {exam['status'].lower()}",
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
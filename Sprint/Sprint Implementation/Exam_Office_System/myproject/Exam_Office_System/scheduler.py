@@ -0,0 +1,237 @@
+import heapq
+import time
+from collections import defaultdict
+from itertools import combinations
+
+from django.db import transaction
+from django.utils import timezone
+
+from .conflicts import ALL_ROLES, exam_rows
+from .models import Exam, ExamSchedule, ExamRegistration
+from .portal import invalidate_all_portals
+from .schedule_feed import invalidate_schedule_snapshots
+
+
+class Timetable:
+    """A day index (into ``dates``) for every exam that could be placed, plus the ones that could not."""
+
+    def __init__(self, dates, assignment, unscheduled, penalty, timings):
+        self.dates = dates
+        self.assignment = assignment
+        self.unscheduled = unscheduled
+        self.penalty = penalty
+        self.timings = timings
+
+    def exam_dates(self):
+        return {exam_id: self.dates[day] for exam_id, day in self.assignment.items()}
+
+
+# Conflict graph
+
+def build_conflict_graph(exams, enrolments, roles=ALL_ROLES):
+    """
+    Build ``(sizes, adjacency)`` for the exams to schedule.
+
+    ``exams`` are rows from ``conflicts.exam_rows`` and ``enrolments`` are
+    ``(student_id, exam_id)`` pairs. Two exams are adjacent when a student sits both,
+    they belong to the same batch, or they share a teacher; the edge weight is the
+    number of shared students and is used only to spread exams out.
+    """
+    adjacency = {}
+    sizes = {}
+    groups = defaultdict(set)
+    for exam in exams:
+        exam_id = exam['id']
+        adjacency[exam_id] = {}
+        sizes[exam_id] = 0
+        groups[('batch', exam['department_id'], exam['session'], exam['batch'])].add(exam_id)
+        for role in roles:
+            teacher_id = exam[f'{role}_id']
+            if teacher_id is not None:
+                groups[('teacher', teacher_id)].add(exam_id)
+
+    for members in groups.values():
+        for first, second in combinations(members, 2):
+            adjacency[first].setdefault(second, 0)
+            adjacency[second].setdefault(first, 0)
+
+    taken_by_student = defaultdict(set)
+    for student_id, exam_id in enrolments:
+        if exam_id in adjacency:
+            taken_by_student[student_id].add(exam_id)
+    for taken in taken_by_student.values():
+        for exam_id in taken:
+            sizes[exam_id] += 1
+        for first, second in combinations(taken, 2):
+            adjacency[first][second] = adjacency[first].get(second, 0) + 1
+            adjacency[second][first] = adjacency[second].get(first, 0) + 1
+    return sizes, adjacency
+
+
+# Colouring
+
+def _day_penalties(exam, adjacency, assignment):
+    # Days used by neighbours are blocked; the days either side cost the shared students
+    blocked = set()
+    penalties = defaultdict(int)
+    for other, shared in adjacency[exam].items():
+        day = assignment.get(other)
+        if day is None:
+            continue
+        blocked.add(day)
+        if shared:
+            penalties[day - 1] += shared
+            penalties[day + 1] += shared
+    return blocked, penalties
+
+def _fits(day, size, load, count, capacity, max_per_day):
+    if capacity is not None and load[day] + size > capacity:
+        return False
+    return not max_per_day or count[day] < max_per_day
+
+def colour_exams(adjacency, sizes, day_count, capacity=None, max_per_day=None):
+    """
+    DSATUR colouring: repeatedly place the exam whose neighbours already occupy the most
+    distinct days (ties: most neighbours, then most candidates) on the feasible day with
+    the fewest back-to-back students, then the lightest load.
+    """
+    assignment = {}
+    unscheduled = []
+    saturation = {exam: set() for exam in adjacency}
+    load = [0] * day_count
+    count = [0] * day_count
+    heap = [(0, -len(adjacency[exam]), -sizes[exam], exam) for exam in adjacency]
+    heapq.heapify(heap)
+
+    while heap:
+        negative_saturation, _, _, exam = heapq.heappop(heap)
+        days_taken = saturation[exam]
+        if exam in assignment or days_taken is None or -negative_saturation != len(days_taken):
+            continue
+        blocked, penalties = _day_penalties(exam, adjacency, assignment)
+        candidates = [
+            day for day in range(day_count)
+            if day not in blocked and _fits(day, sizes[exam], load, count, capacity, max_per_day)
+        ]
+        if not candidates:
+            unscheduled.append(exam)
+            saturation[exam] = None
+            continue
+        day = min(candidates, key=lambda day: (penalties[day], load[day], day))
+        assignment[exam] = day
+        load[day] += sizes[exam]
+        count[day] += 1
+        for other in adjacency[exam]:
+            other_days = saturation[other]
+            if other not in assignment and other_days is not None and day not in other_days:
+                other_days.add(day)
+                heapq.heappush(heap, (-len(other_days), -len(adjacency[other]), -sizes[other], other))
+    return assignment, unscheduled
+
+def improve_timetable(adjacency, sizes, assignment, day_count, capacity=None, max_per_day=None,
+                      passes=5, time_limit=None):
+    """Local search: move single exams to feasible days that lower their back-to-back penalty."""
+    deadline = time.perf_counter() + time_limit if time_limit else None
+    load = [0] * day_count
+    count = [0] * day_count
+    for exam, day in assignment.items():
+        load[day] += sizes[exam]
+        count[day] += 1
+
+    for _ in range(passes):
+        moved = 0
+        for exam, current in list(assignment.items()):
+            blocked, penalties = _day_penalties(exam, adjacency, assignment)
+            best, best_penalty = current, penalties[current]
+            load[current] -= sizes[exam]
+            count[current] -= 1
+            for day in range(day_count):
+                if (penalties[day] < best_penalty and day not in blocked
+                        and _fits(day, sizes[exam], load, count, capacity, max_per_day)):
+                    best, best_penalty = day, penalties[day]
+            assignment[exam] = best
+            load[best] += sizes[exam]
+            count[best] += 1
+            moved += best != current
+        if not moved or (deadline and time.perf_counter() > deadline):
+            break
+    return assignment
+
+def timetable_penalty(adjacency, assignment):
+    """Students sitting exams on consecutive exam days, counted once per pair of exams."""
+    penalty = 0
+    for exam, day in assignment.items():
+        for other, shared in adjacency[exam].items():
+            if other > exam and abs(assignment.get(other, -10) - day) == 1:
+                penalty += shared
+    return penalty
+
+def build_timetable(adjacency, sizes, dates, capacity=None, max_per_day=None, passes=5, time_limit=None):
+    timings = {}
+    started = time.perf_counter()
+    assignment, unscheduled = colour_exams(adjacency, sizes, len(dates), capacity, max_per_day)
+    timings['colouring'] = time.perf_counter() - started
+    started = time.perf_counter()
+    improve_timetable(adjacency, sizes, assignment, len(dates), capacity, max_per_day, passes, time_limit)
+    timings['local_search'] = time.perf_counter() - started
+    return Timetable(dates, assignment, unscheduled, timetable_penalty(adjacency, assignment), timings)
+
+
+# Database
+
+def schedule_session(session, dates, department=None, capacity=None, max_per_day=None,
+                     roles=ALL_ROLES, passes=5, time_limit=None):
+    """Build a clash-free timetable for every exam of ``session`` (optionally one department)."""
+    started = time.perf_counter()
+    exams = Exam.objects.filter(session=session)
+    enrolments = ExamRegistration.exams.through.objects.filter(
+        exam__session=session,
+    ).exclude(examregistration__status='Rejected')
+    if department is not None:
+        exams = exams.filter(department=department)
+        enrolments = enrolments.filter(exam__department=department)
+    sizes, adjacency = build_conflict_graph(
+        exam_rows(exams),
+        enrolments.values_list('examregistration__student_id', 'exam_id').iterator(chunk_size=10000),
+        roles,
+    )
+    load_time = time.perf_counter() - started
+
+    timetable = build_timetable(adjacency, sizes, dates, capacity, max_per_day, passes, time_limit)
+    timetable.timings = {'load': load_time, **timetable.timings}
+    return timetable
+
+@transaction.atomic
+def save_timetable(timetable, batch_size=1000, allow_partial=False):
+    """
+    Write the exam dates and publish (or mark modified) their schedules in bulk.
+
+    Exams the timetable could not place keep their old dates, which may clash with the
+    new ones, so a partial timetable is refused unless ``allow_partial``.
+    """
+    if timetable.unscheduled and not allow_partial:
+        raise ValueError(f'{len(timetable.unscheduled)} exams could not be placed')
+    today = timezone.localdate()
+    exam_dates = timetable.exam_dates()
+    Exam.objects.bulk_update(
+        [Exam(pk=exam_id, exam_date=exam_date) for exam_id, exam_date in exam_dates.items()],
+        ['exam_date'], batch_size=batch_size,
+    )
+    schedules = ExamSchedule.objects.filter(exam_id__in=list(exam_dates)).only('id', 'exam_id')
+    existing = {schedule.exam_id: schedule for schedule in schedules}
+    for schedule in existing.values():
+        schedule.status = 'Modified'
+        schedule.modified_date = today
+    ExamSchedule.objects.bulk_update(existing.values(), ['status', 'modified_date'], batch_size=batch_size)
+    ExamSchedule.objects.bulk_create(
+        [
+            ExamSchedule(exam_id=exam_id, published_date=today, status='Published')
+            for exam_id in exam_dates if exam_id not in existing
+        ],
+        batch_size=batch_size,
+    )
+    # Bulk writes send no signals, so drop the published schedule snapshots here
+    invalidate_schedule_snapshots(set(
+        Exam.objects.filter(pk__in=list(exam_dates)).values_list('department_id', flat=True).distinct()
+    ))
+    invalidate_all_portals()
@@ -0,0 +1,243 @@
+import heapq
+import math
+import os
+import time
+from collections import Counter, defaultdict, deque
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.text import slugify
+
+from .models import Exam, ExamRegistration, Room, RoomInvigilation, SeatAllocation
+from .pdf import Page, PAGE_WIDTH, PAGE_HEIGHT, write_pdf
+from .portal import invalidate_student_portals
+
+SEAT_LINES_PER_PAGE = 35
+
+
+class SeatPlan:
+    """Seats ``(room_id, row, column, exam_id, student_id)`` and invigilators ``(room_id, teacher_id)`` for one date."""
+
+    def __init__(self, exam_date, seats, invigilators, unseated, adjacent, shortfall, timings, clashes=()):
+        self.exam_date = exam_date
+        self.seats = seats
+        self.invigilators = invigilators
+        self.unseated = unseated
+        self.clashes = list(clashes)
+        self.adjacent = adjacent
+        self.shortfall = shortfall
+        self.timings = timings
+
+
+# Allocation
+
+def allocate_seats(candidates, rooms):
+    """
+    Seat ``(exam_id, student_id)`` candidates in ``rooms`` (``(room_id, rows, columns)``).
+
+    Seats are filled front to back, left to right, each with the exam that has the most
+    candidates left among those not sitting directly left or in front, so neighbours sit
+    different papers. When only a neighbour's exam is left, a spare seat is kept empty if
+    capacity allows; otherwise the candidate is seated and counted in ``adjacent``.
+
+    A student gets one seat per date: further candidates of an already listed student
+    (two exams on one date) are not seated but returned in ``clashes``.
+    Returns ``(seats, unseated, adjacent, clashes)``.
+    """
+    queues = defaultdict(deque)
+    listed = set()
+    clashes = []
+    for exam_id, student_id in candidates:
+        if student_id in listed:
+            clashes.append((exam_id, student_id))
+            continue
+        listed.add(student_id)
+        queues[exam_id].append(student_id)
+    heap = [(-len(students), exam_id) for exam_id, students in queues.items()]
+    heapq.heapify(heap)
+    spare = sum(rows * columns for _, rows, columns in rooms) - sum(len(students) for students in queues.values())
+
+    seats = []
+    adjacent = 0
+    for room_id, rows, columns in rooms:
+        front = [None] * columns
+        for row in range(1, rows + 1):
+            left = None
+            current = [None] * columns
+            for column in range(1, columns + 1):
+                if not heap:
+                    break
+                avoid = (left, front[column - 1])
+                skipped = []
+                choice = None
+                while heap:
+                    item = heapq.heappop(heap)
+                    if item[1] not in avoid:
+                        choice = item
+                        break
+                    skipped.append(item)
+                if choice is None and spare > 0:
+                    spare -= 1
+                    left = None
+                elif choice is None:
+                    choice = skipped.pop(0)
+                    adjacent += 1
+                for item in skipped:
+                    heapq.heappush(heap, item)
+                if choice is None:
+                    continue
+                exam_id = choice[1]
+                queue = queues[exam_id]
+                seats.append((room_id, row, column, exam_id, queue.popleft()))
+                if queue:
+                    heapq.heappush(heap, (-len(queue), exam_id))
+                left = current[column - 1] = exam_id
+            front = current
+
+    unseated = [(exam_id, student_id) for exam_id, students in queues.items() for student_id in students]
+    return seats, unseated, adjacent, clashes
+
+def assign_invigilators(seats, exam_invigilators, per_invigilator):
+    """
+    Give every room one invigilator per ``per_invigilator`` candidates seated in it.
+
+    Rooms first draw the invigilators of the exams they hold, busiest exam first, then
+    the rest of the date's pool. Returns ``(assignments, shortfall)``.
+    """
+    room_exams = defaultdict(Counter)
+    for room_id, _, _, exam_id, _ in seats:
+        room_exams[room_id][exam_id] += 1
+    needed = {room_id: math.ceil(sum(exams.values()) / per_invigilator) for room_id, exams in room_exams.items()}
+    order = sorted(needed, key=lambda room_id: -needed[room_id])
+
+    assigned = defaultdict(list)
+    used = set()
+    for room_id in order:
+        for exam_id, _ in room_exams[room_id].most_common():
+            teacher_id = exam_invigilators.get(exam_id)
+            if teacher_id is not None and teacher_id not in used and len(assigned[room_id]) < needed[room_id]:
+                assigned[room_id].append(teacher_id)
+                used.add(teacher_id)
+    pool = deque(sorted({teacher_id for teacher_id in exam_invigilators.values() if teacher_id is not None} - used))
+    for room_id in order:
+        while pool and len(assigned[room_id]) < needed[room_id]:
+            assigned[room_id].append(pool.popleft())
+
+    assignments = [(room_id, teacher_id) for room_id in order for teacher_id in assigned[room_id]]
+    return assignments, sum(needed.values()) - len(assignments)
+
+
+# Database
+
+def date_candidates(exam_date):
+    """``(exam_id, student_id)`` of every verified candidate sitting an exam on ``exam_date``, in one query."""
+    rows = (
+        ExamRegistration.exams.through.objects
+        .filter(exam__exam_date=exam_date, examregistration__status='Verified')
+        .order_by('exam_id', 'examregistration__student__registration_number')
+        .values_list('exam_id', 'examregistration__student_id')
+    )
+    # A student with both a regular and a retake registration sits the exam once
+    return list(dict.fromkeys(rows))
+
+def plan_date(exam_date, rooms=None, per_invigilator=None):
+    """Build the seat plan and invigilation roster for every exam held on ``exam_date``."""
+    per_invigilator = per_invigilator or getattr(settings, 'STUDENTS_PER_INVIGILATOR', 40)
+    timings = {}
+    started = time.perf_counter()
+    candidates = date_candidates(exam_date)
+    exam_invigilators = dict(Exam.objects.filter(exam_date=exam_date).values_list('id', 'invigilator_id'))
+    rooms = rooms if rooms is not None else Room.objects.filter(is_active=True)
+    room_grid = sorted(
+        rooms.values_list('id', 'rows', 'columns'),
+        key=lambda room: (-room[1] * room[2], room[0]),
+    )
+    timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    seats, unseated, adjacent, clashes = allocate_seats(candidates, room_grid)
+    invigilators, shortfall = assign_invigilators(seats, exam_invigilators, per_invigilator)
+    timings['allocate'] = time.perf_counter() - started
+    return SeatPlan(exam_date, seats, invigilators, unseated, adjacent, shortfall, timings, clashes)
+
+@transaction.atomic
+def save_seat_plan(plan, batch_size=2000):
+    """Replace the date's seat allocations and room invigilations with ``plan``."""
+    previous = SeatAllocation.objects.filter(exam_date=plan.exam_date)
+    students = set(previous.values_list('student_id', flat=True))
+    previous.delete()
+    RoomInvigilation.objects.filter(exam_date=plan.exam_date).delete()
+    SeatAllocation.objects.bulk_create(
+        [
+            SeatAllocation(exam_date=plan.exam_date, room_id=room_id, seat_row=row, seat_column=column,
+                           exam_id=exam_id, student_id=student_id)
+            for room_id, row, column, exam_id, student_id in plan.seats
+        ],
+        batch_size=batch_size,
+    )
+    RoomInvigilation.objects.bulk_create(
+        [
+            RoomInvigilation(exam_date=plan.exam_date, room_id=room_id, teacher_id=teacher_id)
+            for room_id, teacher_id in plan.invigilators
+        ],
+        batch_size=batch_size,
+    )
+    invalidate_student_portals(students | {student_id for *_, student_id in plan.seats})
+
+
+# Printable seat lists
+
+def render_seat_list(room, exam_date, invigilators, seats):
+    """Pages of one room's seat list; ``seats`` are ``(row, column, registration number, name, course code)``."""
+    pages = []
+    for start in range(0, max(len(seats), 1), SEAT_LINES_PER_PAGE):
+        page = Page()
+        top = PAGE_HEIGHT - 60
+        page.text(50, top, 'Jahangirnagar University', size=16, bold=True)
+        page.text(50, top - 22, f'Seat Plan - {room.name} {room.building}'.strip(), size=13, bold=True)
+        page.text(50, top - 40, f'Date: {exam_date}    Seated: {len(seats)} / {room.capacity}', size=10)
+        page.text(50, top - 55, f"Invigilators: {', '.join(invigilators) or '-'}", size=10)
+        y = top - 85
+        for x, heading in ((50, 'Seat'), (120, 'Registration No.'), (250, 'Name'), (450, 'Course')):
+            page.text(x, y, heading, bold=True)
+        page.line(50, y - 6, PAGE_WIDTH - 50, y - 6)
+        for row, column, registration_number, name, course_code in seats[start:start + SEAT_LINES_PER_PAGE]:
+            y -= 18
+            page.text(50, y, f'R{row}-C{column}', size=10)
+            page.text(120, y, registration_number, size=10)
+            page.text(250, y, name[:32], size=10)
+            page.text(450, y, course_code, size=10)
+        page.text(PAGE_WIDTH - 120, 40, f'Page {start // SEAT_LINES_PER_PAGE + 1}', size=9)
+        pages.append(page)
+    return pages
+
+def seat_list_path(output_dir, exam_date, room):
+    return os.path.join(output_dir, str(exam_date), f'{room.pk}-{slugify(room.name)}.pdf')
+
+def write_seat_lists(exam_date, output_dir=None):
+    """Write one printable PDF per room used on ``exam_date``; returns the paths written."""
+    output_dir = output_dir or settings.SEAT_PLAN_ROOT
+    invigilators = defaultdict(list)
+    for room_id, name in (
+        RoomInvigilation.objects.filter(exam_date=exam_date)
+        .order_by('teacher__name').values_list('room_id', 'teacher__name')
+    ):
+        invigilators[room_id].append(name)
+    allocations = (
+        SeatAllocation.objects.filter(exam_date=exam_date)
+        .select_related('room', 'student', 'exam__course')
+        .order_by('room_id', 'seat_row', 'seat_column')
+    )
+
+    paths = []
+    for room, room_seats in groupby(allocations.iterator(chunk_size=2000), key=lambda allocation: allocation.room):
+        seats = [
+            (seat.seat_row, seat.seat_column, seat.student.registration_number, seat.student.name,
+             seat.exam.course.course_code)
+            for seat in room_seats
+        ]
+        path = seat_list_path(output_dir, exam_date, room)
+        write_pdf(path, render_seat_list(room, exam_date, invigilators[room.pk], seats))
+        paths.append(path)
+    return paths
@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .dashboard import summary_cache_key, invalidate_teacher_summaries
+from .portal import invalidate_all_portals, invalidate_student_portals
+from .schedule_feed import invalidate_schedule_snapshots
+from .models import (
+    Student, Exam, ExamSchedule, ExamRegistration, Result, TeacherRemuneration, MarksheetApplication,
+    CertificateApplication, Sickbed, TabulationSheet
+)
+
+# Dashboard, student portal and schedule snapshot cache invalidation.
+# bulk_create/bulk_update/QuerySet.update skip these signals; the cache timeout bounds staleness
+# for them, except where the bulk job invalidates the caches itself.
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_changed(sender, instance, **kwargs):
+    cache.delete_many([
+        summary_cache_key('department', instance.department_id),
+        summary_cache_key('student', instance.pk),
+    ])
+    invalidate_student_portals([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Exam)
+def exam_changed(sender, instance, **kwargs):
+    cache.delete_many([
+        summary_cache_key('exam_office'),
+        summary_cache_key('department', instance.department_id),
+    ])
+    invalidate_teacher_summaries()
+    invalidate_schedule_snapshots([instance.department_id])
+    invalidate_all_portals()
+
+
+@receiver([post_save, post_delete], sender=ExamSchedule)
+def exam_schedule_changed(sender, instance, **kwargs):
+    department_id = Exam.objects.filter(pk=instance.exam_id).values_list('department_id', flat=True).first()
+    if department_id is not None:
+        cache.delete(summary_cache_key('department', department_id))
+        invalidate_schedule_snapshots([department_id])
+    invalidate_all_portals()
+
+
+@receiver([post_save, post_delete], sender=ExamRegistration)
+def exam_registration_changed(sender, instance, **kwargs):
+    cache.delete_many([
+        summary_cache_key('exam_office'),
+        summary_cache_key('student', instance.student_id),
+    ])
+    invalidate_student_portals([instance.student_id])
+
+
+@receiver(m2m_changed, sender=ExamRegistration.exams.through)
+def exam_registration_exams_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, ExamRegistration):
+        cache.delete(summary_cache_key('student', instance.student_id))
+        invalidate_student_portals([instance.student_id])
+
+
+@receiver([post_save, post_delete], sender=Result)
+def result_changed(sender, instance, **kwargs):
+    cache.delete(summary_cache_key('student', instance.student_id))
+    invalidate_student_portals([instance.student_id])
+
+
+@receiver([post_save, post_delete], sender=MarksheetApplication)
+@receiver([post_save, post_delete], sender=CertificateApplication)
+@receiver([post_save, post_delete], sender=Sickbed)
+@receiver([post_save, post_delete], sender=TabulationSheet)
+def student_record_changed(sender, instance, **kwargs):
+    if instance.student_id is not None:
+        invalidate_student_portals([instance.student_id])
+
+
+@receiver([post_save, post_delete], sender=TeacherRemuneration)
+def teacher_remuneration_changed(sender, instance, **kwargs):
+    cache.delete(summary_cache_key('exam_office'))
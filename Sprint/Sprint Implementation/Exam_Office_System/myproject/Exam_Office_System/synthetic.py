@@ -0,0 +1,217 @@
+import datetime
+import random
+import time
+from collections import Counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import (
+    User, Department, Student, Teacher, ExamOfficeOrAdmin, Course, Exam, ExamSchedule, ExamRegistration,
+    Result, Attendance, RemunerationRate, Room
+)
+
+DEFAULT_RATES = {
+    'Invigilator': (500, 0),
+    'Examiner': (1000, 40),
+    'QuestionSetter': (1500, 0),
+    'Moderator': (800, 0),
+    'Translator': (600, 0),
+}
+
+
+class UniversitySpec:
+    """
+    Shape of a synthetic university.
+
+    Every department has ``batches`` batches of equal size; each batch sat
+    ``courses_per_batch`` exams last session (with results and attendance) and is
+    registered for as many upcoming exams this session.
+    """
+
+    def __init__(self, departments=35, students=50000, teachers=2100, batches=4, courses_per_batch=8,
+                 rooms=60, prefix='syn', password='password', seed=49):
+        self.departments = departments
+        self.students = students
+        self.teachers = teachers
+        self.batches = batches
+        self.courses_per_batch = courses_per_batch
+        self.rooms = rooms
+        self.prefix = prefix
+        self.password = password
+        self.seed = seed
+
+    def students_in(self, department, batch):
+        per_batch, extra = divmod(self.students, self.departments * self.batches)
+        return per_batch + (department * self.batches + batch < extra)
+
+    def teachers_in(self, department):
+        per_department, extra = divmod(self.teachers, self.departments)
+        return max(per_department + (department < extra), 1)
+
+
+class UniversityGenerator:
+    """Write a ``UniversitySpec`` with bulk inserts, one transaction per department."""
+
+    def __init__(self, spec, batch_size=2000, stdout=None):
+        self.spec = spec
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.rng = random.Random(spec.seed)
+        # Hashing 50k passwords would dominate the run; every synthetic account shares one hash
+        self.password_hash = make_password(spec.password)
+        self.today = timezone.localdate()
+        self.counts = Counter()
+        self.timings = {}
+
+    def create(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model.__name__] += len(objects)
+        return objects
+
+    def insert_rows(self, model, fields, rows):
+        """
+        Insert value tuples for ``fields`` with one executemany per batch.
+
+        Registrations, results and attendance are most of the rows; building model instances
+        for them costs more than the inserts, so their values go straight to the cursor
+        (prepared by the caller where the column type needs it, e.g. dates).
+        """
+        meta = model._meta
+        quote = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(meta.db_table),
+            ', '.join(quote(meta.get_field(name).column) for name in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.batch_size):
+                cursor.executemany(sql, rows[start:start + self.batch_size])
+        self.counts[model.__name__] += len(rows)
+
+    def users(self, role, usernames):
+        return self.create(User, [
+            User(username=username, email=f'{username}@example.com', role=role, password=self.password_hash)
+            for username in usernames
+        ])
+
+    def generate(self):
+        prefix = self.spec.prefix
+        if User.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise ValueError(f'Synthetic accounts with prefix {prefix!r} already exist')
+        started = time.perf_counter()
+        with transaction.atomic():
+            office = User.objects.create_superuser(
+                username=f'{prefix}-office', email=f'{prefix}-office@example.com', password=self.spec.password,
+                role='Exam_Office',
+            )
+            ExamOfficeOrAdmin.objects.create(
+                user=office, office_name='Synthetic Exam Office', contact_number='0', address='-',
+            )
+            self.counts['User'] += 1
+            for role, (base_amount, per_script_amount) in DEFAULT_RATES.items():
+                RemunerationRate.objects.get_or_create(
+                    role=role, defaults={'base_amount': base_amount, 'per_script_amount': per_script_amount},
+                )
+            self.create(Room, [
+                Room(name=f'{prefix}-room-{number}', building=f'Academic Building {number % 4 + 1}', rows=10, columns=8)
+                for number in range(self.spec.rooms)
+            ])
+        self.timings['setup'] = time.perf_counter() - started
+
+        for department in range(self.spec.departments):
+            started = time.perf_counter()
+            with transaction.atomic():
+                self.generate_department(department)
+            self.timings[f'department {department}'] = time.perf_counter() - started
+            if self.stdout:
+                self.stdout.write(f'Department {department + 1}/{self.spec.departments} '
+                                  f'({self.timings[f"department {department}"]:.1f}s)')
+        # Bulk inserts send no signals, so no cached summary, snapshot or portal knows about them
+        cache.clear()
+        return self.counts
+
+    def generate_department(self, number):
+        spec, rng, prefix = self.spec, self.rng, self.spec.prefix
+        code = f'D{number:02d}'
+        department = self.create(Department, [
+            Department(user=self.users('Department', [f'{prefix}-{code.lower()}'])[0], name=f'Department {code}'),
+        ])[0]
+        teacher_users = self.users('Teacher', [f'{prefix}-{code.lower()}-t{index}' for index in range(spec.teachers_in(number))])
+        teachers = self.create(Teacher, [
+            Teacher(user=user, department=department, name=f'Teacher {code}-{index}')
+            for index, user in enumerate(teacher_users)
+        ])
+
+        exam_sessions = (str(self.today.year - 1), str(self.today.year))
+        past_start = self.today - datetime.timedelta(days=180)
+        upcoming_start = self.today + datetime.timedelta(days=30)
+        for batch in range(spec.batches):
+            batch_name = str(46 + batch)
+            size = spec.students_in(number, batch)
+            student_users = self.users('Student', [f'{prefix}-{code.lower()}-{batch_name}-s{index}' for index in range(size)])
+            students = self.create(Student, [
+                Student(
+                    user=user, registration_number=f'{prefix}-{code}-{batch_name}-{index:05d}', department=department,
+                    session=str(self.today.year - spec.batches + batch), name=f'Student {code}-{batch_name}-{index}',
+                    hall_clearance=rng.random() < 0.9, library_clearance=rng.random() < 0.9,
+                )
+                for index, user in enumerate(student_users)
+            ])
+
+            courses = self.create(Course, [
+                Course(department=department, course_code=f'{prefix}-{code}-{batch_name}-{term}{index}',
+                       course_title=f'Course {batch_name}{term}{index} of {code}')
+                for term in range(2) for index in range(spec.courses_per_batch)
+            ])
+            exams = self.create(Exam, [
+                Exam(
+                    department=department, batch=batch_name, session=exam_sessions[term], course=course,
+                    # Batches of a department sit on different days; departments share days
+                    exam_date=(past_start, upcoming_start)[term] + datetime.timedelta(days=(index * spec.batches + batch) * 2),
+                    invigilator=rng.choice(teachers), examiner1=rng.choice(teachers), examiner2=rng.choice(teachers),
+                    question_creator=rng.choice(teachers), moderator=rng.choice(teachers),
+                )
+                for term in range(2)
+                for index, course in enumerate(courses[term * spec.courses_per_batch:(term + 1) * spec.courses_per_batch])
+            ])
+            self.create(ExamSchedule, [
+                ExamSchedule(exam=exam, published_date=exam.exam_date - datetime.timedelta(days=45), status='Published')
+                for exam in exams
+            ])
+            past_exams, upcoming_exams = exams[:spec.courses_per_batch], exams[spec.courses_per_batch:]
+
+            registrations = self.create(ExamRegistration, [
+                ExamRegistration(student=student, registration_type='Regular', status='Verified',
+                                 payment_status='Completed', payment_method='MobilePayment', admit_card_generated=True)
+                for student in students
+            ] + [
+                ExamRegistration(student=student, registration_type='Regular', **rng.choices([
+                    {'status': 'Verified', 'payment_status': 'Completed', 'payment_method': 'MobilePayment'},
+                    {'status': 'Pending', 'payment_status': 'Completed', 'payment_method': 'BankTransfer'},
+                    {'status': 'Pending', 'payment_status': 'Pending'},
+                ], weights=(7, 1, 2))[0])
+                for student in students
+            ])
+            through = ExamRegistration.exams.through
+            self.insert_rows(through, ['examregistration', 'exam'], [
+                (registration.pk, exam.pk)
+                for registration, term_exams in zip(registrations, [past_exams] * size + [upcoming_exams] * size)
+                for exam in term_exams
+            ])
+
+            sat = [(exam, student.pk) for exam in past_exams for student in students if rng.random() < 0.96]
+            self.insert_rows(Result, ['exam', 'student', 'marks'], [
+                (exam.pk, student_id, min(100, max(0, round(rng.gauss(62, 14)))))
+                for exam, student_id in sat
+            ])
+            exam_dates = {exam.pk: connection.ops.adapt_datefield_value(exam.exam_date) for exam in past_exams}
+            self.insert_rows(Attendance, ['exam', 'student', 'teacher', 'attendance_date', 'role'], [
+                (exam.pk, student_id, None, exam_dates[exam.pk], 'Student')
+                for exam, student_id in sat
+            ] + [
+                (exam.pk, None, exam.invigilator_id, exam_dates[exam.pk], 'Invigilator')
+                for exam in past_exams
+            ])
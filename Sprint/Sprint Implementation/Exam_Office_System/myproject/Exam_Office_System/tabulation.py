@@ -0,0 +1,199 @@
+import re
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Result, TabulationSheet
+from .portal import invalidate_student_portals
+
+# UGC uniform grading system: (minimum marks, letter grade, grade point)
+DEFAULT_GRADING_SCALE = [
+    (80, 'A+', 4.00),
+    (75, 'A', 3.75),
+    (70, 'A-', 3.50),
+    (65, 'B+', 3.25),
+    (60, 'B', 3.00),
+    (55, 'B-', 2.75),
+    (50, 'C+', 2.50),
+    (45, 'C', 2.25),
+    (40, 'D', 2.00),
+    (0, 'F', 0.00),
+]
+
+
+class GradingScale:
+    """Vectorised marks -> (letter, grade point) lookup for one grading scale."""
+
+    def __init__(self, bands=None):
+        bands = sorted(bands or getattr(settings, 'GRADING_SCALE', DEFAULT_GRADING_SCALE))
+        self.minimums = np.array([band[0] for band in bands], dtype=float)
+        self.letters = np.array([band[1] for band in bands])
+        self.points = np.array([band[2] for band in bands], dtype=float)
+
+    def band(self, marks):
+        # Marks below the lowest minimum still fall into the lowest band
+        return np.maximum(np.searchsorted(self.minimums, marks, side='right') - 1, 0)
+
+    def letter(self, marks):
+        return self.letters[self.band(np.asarray(marks, dtype=float))]
+
+    def grade_points(self, marks):
+        return self.points[self.band(np.asarray(marks, dtype=float))]
+
+
+class Tabulation:
+    """Column arrays for every student tabulated in one session, aligned by position."""
+
+    def __init__(self, session, student_ids, batches, courses, failed, grade_points, gpa, cgpa, rank, timings):
+        self.session = session
+        self.student_ids = student_ids
+        self.batches = batches
+        self.courses = courses
+        self.failed = failed
+        self.grade_points = grade_points
+        self.gpa = gpa
+        self.cgpa = cgpa
+        self.rank = rank
+        self.timings = timings
+
+    def __len__(self):
+        return len(self.student_ids)
+
+
+def batch_ranks(batch_codes, gpa, eligible):
+    """
+    Competition ranks (1, 2, 2, 4) by GPA within each batch, for ``eligible`` students only.
+    Returns 0 for students who are not ranked.
+    """
+    rank = np.zeros(len(gpa), dtype=np.int64)
+    positions = np.flatnonzero(eligible)
+    if not len(positions):
+        return rank
+    batch_codes = batch_codes[positions]
+    gpa = gpa[positions]
+    order = np.lexsort((-gpa, batch_codes))
+    sorted_batches, sorted_gpa = batch_codes[order], gpa[order]
+    index = np.arange(len(order))
+    new_batch = np.r_[True, sorted_batches[1:] != sorted_batches[:-1]]
+    new_value = new_batch | np.r_[True, sorted_gpa[1:] != sorted_gpa[:-1]]
+    batch_start = np.maximum.accumulate(np.where(new_batch, index, 0))
+    tie_start = np.maximum.accumulate(np.where(new_value, index, 0))
+    rank[positions[order]] = tie_start - batch_start + 1
+    return rank
+
+def session_year(session):
+    """First year of a session name such as ``'2023'`` or ``'2019-20'``."""
+    match = re.match(r'\s*(\d{4})', str(session))
+    if match is None:
+        raise ValueError(f'Session {session!r} does not start with a year')
+    return int(match.group(1))
+
+def student_batches(student_index, batch_index, students, batch_count):
+    """
+    Index of each student's batch: the batch of most of their results, so a retake of a
+    junior batch's exam does not move them; ties go to the senior (lowest) batch.
+    """
+    counts = np.bincount(student_index * batch_count + batch_index, minlength=students * batch_count)
+    return counts.reshape(students, batch_count).argmax(axis=1)
+
+def tabulate_session(session, department=None, scale=None):
+    """
+    Grade every result of ``session`` and compute GPA, CGPA and batch rank per student.
+
+    The session's results are read with one query into NumPy arrays; previous sessions'
+    totals come from ``TabulationSheet`` in a second query so CGPA needs no old results.
+    Sessions are ordered by their first year, not as strings. Every course carries equal
+    weight, since courses have no credit hours.
+    """
+    scale = scale or GradingScale()
+    year = session_year(session)
+    timings = {}
+
+    started = time.perf_counter()
+    results = Result.objects.filter(exam__session=session)
+    if department is not None:
+        results = results.filter(exam__department=department)
+    rows = list(results.values_list('student_id', 'student__department_id', 'exam__batch', 'marks'))
+    timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result_students, result_departments, result_batches, marks = zip(*rows) if rows else ((), (), (), ())
+    result_students = np.array(result_students, dtype=np.int64)
+    points = scale.grade_points(np.array(marks, dtype=float))
+
+    student_ids, first, inverse = np.unique(result_students, return_index=True, return_inverse=True)
+    courses = np.bincount(inverse, minlength=len(student_ids))
+    failed = np.bincount(inverse, weights=points == 0, minlength=len(student_ids)).astype(np.int64)
+    grade_points = np.bincount(inverse, weights=points, minlength=len(student_ids))
+    batch_names, batch_index = np.unique(np.array(result_batches, dtype=str), return_inverse=True)
+    student_batch = student_batches(inverse, batch_index, len(student_ids), len(batch_names))
+    batches = batch_names[student_batch]
+    # Batch names repeat across departments, so ranks are per (department, batch)
+    departments = np.array(result_departments, dtype=np.int64)[first]
+    batch_codes = departments * len(batch_names) + student_batch
+    gpa = np.round(np.divide(grade_points, courses, out=np.zeros(len(courses)), where=courses > 0), 2)
+    timings['grade'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    previous = [
+        (student_id, points, count)
+        for student_id, sheet_session, points, count in (
+            TabulationSheet.objects
+            .filter(student_id__in=results.values('student_id'))
+            .exclude(session=session)
+            .values_list('student_id', 'session', 'grade_points', 'courses')
+        )
+        if session_year(sheet_session) < year
+    ]
+    previous_points = np.zeros(len(student_ids))
+    previous_courses = np.zeros(len(student_ids))
+    if previous:
+        previous_students, totals, counts = zip(*previous)
+        positions = np.searchsorted(student_ids, previous_students)
+        np.add.at(previous_points, positions, np.array(totals, dtype=float))
+        np.add.at(previous_courses, positions, counts)
+    timings['history'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    all_courses = courses + previous_courses
+    cgpa = np.round(np.divide(grade_points + previous_points, all_courses,
+                              out=np.zeros(len(all_courses)), where=all_courses > 0), 2)
+    rank = batch_ranks(batch_codes, gpa, failed == 0)
+    timings['rank'] = time.perf_counter() - started
+
+    return Tabulation(session, student_ids, batches, courses, failed, grade_points, gpa, cgpa, rank, timings)
+
+@transaction.atomic
+def save_tabulation(tabulation, batch_size=1000):
+    """Upsert one ``TabulationSheet`` row per tabulated student."""
+    def decimal(value):
+        return Decimal(f'{value:.2f}')
+
+    sheets = [
+        TabulationSheet(
+            student_id=int(student_id),
+            session=tabulation.session,
+            batch=str(batch),
+            courses=int(courses),
+            failed_courses=int(failed),
+            grade_points=decimal(points),
+            gpa=decimal(gpa),
+            cgpa=decimal(cgpa),
+            rank=int(rank) or None,
+        )
+        for student_id, batch, courses, failed, points, gpa, cgpa, rank in zip(
+            tabulation.student_ids, tabulation.batches, tabulation.courses, tabulation.failed,
+            tabulation.grade_points, tabulation.gpa, tabulation.cgpa, tabulation.rank,
+        )
+    ]
+    TabulationSheet.objects.bulk_create(
+        sheets,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['student', 'session'],
+        update_fields=['batch', 'courses', 'failed_courses', 'grade_points', 'gpa', 'cgpa', 'rank'],
+    )
+    invalidate_student_portals(sheet.student_id for sheet in sheets)
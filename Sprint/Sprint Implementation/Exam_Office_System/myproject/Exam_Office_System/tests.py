@@ -1,3 +1,1369 @@
-from django.test import TestCase
+import datetime
+import functools
+import io
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    User, Department, Student, Teacher, Course, Exam, ExamSchedule, ExamRegistration,
+    Result, TeacherRemuneration, Attendance, MarksheetApplication, Sickbed, ClearanceAudit,
+    Room, SeatAllocation, TabulationSheet, AnswerScript, ExaminerMark, RemunerationRate,
+    ExamMaterials, ExamOfficeOrAdmin, CertificateApplication, RoomInvigilation
+)
+from .admit_cards import bundle_path, card_path, card_data, generate_admit_cards, verified_registrations
+from .benchmark import BenchmarkContext, compare, default_flows, run_benchmarks
+from .attendance import SheetError
+from .clearance import read_clearance_list, sync_clearance
+from .conflicts import exam_rows, find_conflicts, registration_rows
+from .dashboard import get_dashboard_summary, summary_cache_key
+from .database import sqlite_settings
+from .documents import DocumentNotReady, approved_applications, document_file, issue_documents
+from .duties import teacher_duties, workload
+from .eligibility import AttendanceRule, NotExpelledRule, RetakeLimitRule, evaluate_registrations
+from .materials import department_turnout, forecast_materials, forecast_quantity, save_forecast
+from .pdf import Page, PdfWriter, write_pdf
+from .portal import build_student_portal, get_student_portal
+from .profiling import ProfilingMiddleware, registry
+from .remuneration import PAYMENT_COLUMNS, calculate_remuneration, export_payment_batch, session_exams
+from .reconciliation import reconcile_marks, reconcile_script
+from .routing import ReplicaRouter, ReplicaRoutingMiddleware, replica_reads, stale_cache_timeout
+from .seat_plan import allocate_seats, assign_invigilators, plan_date, save_seat_plan
+from .scheduler import build_conflict_graph, colour_exams, save_timetable, schedule_session
+from .tabulation import GradingScale, save_tabulation, session_year, tabulate_session
+from .synthetic import UniversityGenerator, UniversitySpec
+
+
+# Fixtures
+
+def make_department(name='CSE'):
+    user = User.objects.create_user(username=name.lower(), email=f'{name.lower()}@example.com', password='x', role='Department')
+    return Department.objects.create(user=user, name=name)
+
+def make_teacher(department, number):
+    user = User.objects.create_user(username=f'teacher{number}', email=f'teacher{number}@example.com', password='x', role='Teacher')
+    return Teacher.objects.create(user=user, department=department, name=f'Teacher {number}')
+
+def make_student(department, number, session='2023', **fields):
+    user = User.objects.create_user(username=f'student{number}', email=f's{number}@example.com', password='x', role='Student')
+    return Student.objects.create(
+        user=user, registration_number=f'{session}-{number:03d}', department=department,
+        session=session, name=f'Student {number}', **fields,
+    )
+
+def make_exam(department, number, session='2023', batch='49', exam_date=datetime.date(2024, 1, 10), **fields):
+    course = Course.objects.create(department=department, course_code=f'C-{session}-{number}', course_title=f'Course {number}')
+    return Exam.objects.create(department=department, course=course, session=session, batch=batch, exam_date=exam_date, **fields)
+
+def register(student, exams, **fields):
+    registration = ExamRegistration.objects.create(student=student, registration_type=fields.pop('registration_type', 'Regular'), **fields)
+    registration.exams.set(exams)
+    return registration
+
+
+class SQLiteSettingsTests(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        values = sqlite_settings(connection)
+        self.assertEqual(values['busy_timeout'], 20000)
+        self.assertEqual(values['temp_store'], 2)
+
+    def test_wal_is_opt_in(self):
+        # WAL is written into the database file, so it must not touch the checked-in one by default
+        if os.environ.get('SQLITE_WAL') != '1':
+            self.assertNotIn('journal_mode', settings.SQLITE_PRAGMAS)
+
+
+# Query plan tests for the hot lookup indexes
+class HotPathIndexTests(TestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == 'postgresql':
+            # Empty test tables are always seq-scanned unless the planner is told otherwise
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest(f'No plan assertions for {connection.vendor}')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_student_department_session(self):
+        self.assertUsesIndex(Student.objects.filter(department_id=1, session='2019-20'), 'student_dept_session_idx')
+
+    def test_student_session(self):
+        self.assertUsesIndex(Student.objects.filter(session='2019-20'), 'student_session_idx')
+
+    def test_exam_department_session_date(self):
+        queryset = Exam.objects.filter(department_id=1, session='2023', exam_date__gte='2024-01-01')
+        self.assertUsesIndex(queryset, 'exam_dept_session_date_idx')
+
+    def test_exam_session_batch(self):
+        self.assertUsesIndex(Exam.objects.filter(session='2023', batch='49'), 'exam_session_batch_date_idx')
+
+    def test_exam_date(self):
+        self.assertUsesIndex(Exam.objects.filter(exam_date='2024-01-01'), 'exam_date_idx')
+
+    def test_registration_student_status(self):
+        queryset = ExamRegistration.objects.filter(student_id=1, status='Verified')
+        self.assertUsesIndex(queryset, 'examreg_student_status_idx')
+
+    def test_pending_registrations(self):
+        queryset = ExamRegistration.objects.filter(status='Pending').order_by('registration_date')
+        self.assertUsesIndex(queryset, 'examreg_pending_idx')
+
+    def test_unpaid_registrations(self):
+        queryset = ExamRegistration.objects.filter(student_id=1, payment_status='Pending')
+        self.assertUsesIndex(queryset, 'examreg_unpaid_idx')
+
+    def test_pending_remunerations(self):
+        queryset = TeacherRemuneration.objects.filter(teacher_id=1, status='Pending')
+        self.assertUsesIndex(queryset, 'remuneration_pending_idx')
+
+    def test_attendance_exam_role_date(self):
+        queryset = Attendance.objects.filter(exam_id=1, role='Student', attendance_date='2024-01-01')
+        self.assertUsesIndex(queryset, 'attendance_exam_role_date_idx')
+
+    def test_attendance_date(self):
+        self.assertUsesIndex(Attendance.objects.filter(attendance_date='2024-01-01'), 'attendance_date_idx')
+
+
+# Read-only API: page contents, cursors and per-endpoint query budgets
+class ApiTests(TestCase):
+    # The user lookup is included in every budget; the session comes from the cache
+    BUDGETS = {
+        'api_students': 2,
+        'api_exams': 2,
+        'api_schedules': 2,
+        'api_registrations': 3,
+        'api_results': 2,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = User.objects.create_user(username='office', email='office@example.com', password='x', role='Exam_Office')
+        department = Department.objects.create(
+            user=User.objects.create_user(username='cse', email='cse@example.com', password='x', role='Department'),
+            name='CSE',
+        )
+        teacher = Teacher.objects.create(
+            user=User.objects.create_user(username='teacher', email='teacher@example.com', password='x', role='Teacher'),
+            department=department, name='Teacher',
+        )
+        exams = []
+        for number in range(5):
+            course = Course.objects.create(department=department, course_code=f'CSE-{number}', course_title=f'Course {number}')
+            exams.append(Exam.objects.create(
+                department=department, batch='49', session='2023', course=course, invigilator=teacher,
+                exam_date=datetime.date(2024, 1, 10 - number),
+            ))
+            ExamSchedule.objects.create(exam=exams[-1], published_date=datetime.date(2023, 12, 1), status='Published')
+        for number in range(12):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f'student{number}', email=f's{number}@example.com', password='x', role='Student'),
+                registration_number=f'2023-{number:03d}', department=department, session='2023', name=f'Student {number}',
+            )
+            registration = ExamRegistration.objects.create(student=student, registration_type='Regular')
+            registration.exams.set(exams)
+            Result.objects.bulk_create([Result(exam=exam, student=student, marks=60 + number) for exam in exams])
+
+    def setUp(self):
+        self.client.force_login(self.office)
+
+    def fetch_all(self, name, **params):
+        rows, url = [], reverse(name)
+        while url:
+            page = self.client.get(url, params).json()
+            params = None
+            rows += page['results']
+            url = page['next']
+        return rows
+
+    def test_query_budgets(self):
+        for name, budget in self.BUDGETS.items():
+            with self.subTest(name), self.assertNumQueries(budget):
+                response = self.client.get(reverse(name), {'limit': 50})
+            self.assertEqual(response.status_code, 200)
+
+    def test_cursor_walks_every_row_once(self):
+        rows = self.fetch_all('api_results', limit=7, fields='id,marks')
+        self.assertEqual(len(rows), Result.objects.count())
+        self.assertEqual(len({row['id'] for row in rows}), len(rows))
+        self.assertEqual(set(rows[0]), {'id', 'marks'})
+
+    def test_exams_are_ordered_by_date(self):
+        rows = self.fetch_all('api_exams', limit=2, fields='id,exam_date')
+        self.assertEqual([row['exam_date'] for row in rows], sorted(row['exam_date'] for row in rows))
+        self.assertEqual(len(rows), 5)
+
+    def test_registration_exams(self):
+        rows = self.client.get(reverse('api_registrations'), {'fields': 'id,exams', 'limit': 1}).json()['results']
+        self.assertEqual(len(rows[0]['exams']), 5)
+
+    def test_conditional_requests(self):
+        response = self.client.get(reverse('api_schedules'))
+        # Schedules only carry dates, too coarse for Last-Modified
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(reverse('api_schedules'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get(reverse('api_schedules'), HTTP_IF_MODIFIED_SINCE='Fri, 01 Dec 2030 00:00:00 GMT').status_code, 200,
+        )
+        # A schedule edited later the same day changes the tag
+        ExamSchedule.objects.filter(pk=ExamSchedule.objects.first().pk).update(status='Modified')
+        self.assertEqual(self.client.get(reverse('api_schedules'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(reverse('api_students'), {'fields': 'password'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_students'), {'cursor': 'nonsense'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_exams'), {'department': 'x'}).status_code, 400)
+
+    def test_office_only(self):
+        self.client.force_login(User.objects.get(username='student0'))
+        self.assertEqual(self.client.get(reverse('api_students')).status_code, 403)
+
+
+class StudentPortalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(
+            user=User.objects.create_user(username='cse', email='cse@example.com', password='x', role='Department'),
+            name='CSE',
+        )
+        teacher = Teacher.objects.create(
+            user=User.objects.create_user(username='teacher', email='teacher@example.com', password='x', role='Teacher'),
+            department=department, name='Teacher',
+        )
+        cls.student = Student.objects.create(
+            user=User.objects.create_user(username='student', email='student@example.com', password='x', role='Student'),
+            registration_number='2023-001', department=department, session='2023', name='Student',
+        )
+        cls.exams = []
+        for number in range(6):
+            course = Course.objects.create(department=department, course_code=f'CSE-{number}', course_title=f'Course {number}')
+            cls.exams.append(Exam.objects.create(
+                department=department, batch='49', session='2023', course=course, invigilator=teacher,
+                exam_date=datetime.date(2024, 1, 1 + number),
+            ))
+            ExamSchedule.objects.create(exam=cls.exams[-1], published_date=datetime.date(2023, 12, 1), status='Published')
+            Result.objects.create(exam=cls.exams[-1], student=cls.student, marks=50 + number)
+            MarksheetApplication.objects.create(student=cls.student, exam=cls.exams[-1], token=f'token-{number}')
+        for registration_type in ('Regular', 'Retake'):
+            registration = ExamRegistration.objects.create(student=cls.student, registration_type=registration_type)
+            registration.exams.set(cls.exams)
+        Sickbed.objects.create(student=cls.student, reason='Fever')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_query_count_does_not_grow_with_history(self):
+        # Student with its joins, then one query per prefetched relation
+        with self.assertNumQueries(8):
+            portal = build_student_portal(self.student.pk)
+        self.assertEqual(len(portal['registrations']), 2)
+        self.assertEqual(len(portal['registrations'][0]['exams']), 6)
+        self.assertEqual(len(portal['results']), 6)
+        self.assertEqual(portal['sickbed'], {'reason': 'Fever'})
+
+    def test_cached_until_a_result_changes(self):
+        get_student_portal(self.student.pk)
+        with self.assertNumQueries(0):
+            get_student_portal(self.student.pk)
+        Result.objects.filter(exam=self.exams[0]).update(marks=90)
+        self.assertEqual(get_student_portal(self.student.pk)['results'][0]['marks'], 50)
+        result = Result.objects.get(exam=self.exams[0])
+        result.save()
+        self.assertEqual(get_student_portal(self.student.pk)['results'][0]['marks'], 90)
+
+    def test_exam_change_drops_every_portal(self):
+        get_student_portal(self.student.pk)
+        self.exams[0].save()
+        with self.assertNumQueries(8):
+            get_student_portal(self.student.pk)
+
+    def test_dashboard(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'CSE-5 - Course 5')
+        self.assertContains(response, 'Fever')
+
+
+class DutyRosterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = User.objects.create_user(username='office', email='office@example.com', password='x', role='Exam_Office')
+        cls.departments = [
+            Department.objects.create(
+                user=User.objects.create_user(username=name, email=f'{name}@example.com', password='x', role='Department'),
+                name=name.upper(),
+            )
+            for name in ('cse', 'eee')
+        ]
+        cls.teachers = [
+            Teacher.objects.create(
+                user=User.objects.create_user(username=f'teacher{number}', email=f't{number}@example.com', password='x', role='Teacher'),
+                department=cls.departments[number % 2], name=f'Teacher {number}',
+            )
+            for number in range(4)
+        ]
+        for number in range(8):
+            course = Course.objects.create(department=cls.departments[0], course_code=f'CSE-{number}', course_title=f'Course {number}')
+            Exam.objects.create(
+                department=cls.departments[0], batch='49', session='2023' if number < 6 else '2024', course=course,
+                exam_date=datetime.date(2024, 1, 1 + number), invigilator=cls.teachers[0],
+                examiner1=cls.teachers[number % 2], examiner2=cls.teachers[2],
+            )
+
+    def test_duties_in_one_query(self):
+        with self.assertNumQueries(1):
+            duties = teacher_duties(self.teachers[0].pk)
+        self.assertEqual(len(duties), 12)
+        self.assertEqual({duty['role'] for duty in duties}, {'Invigilator', 'Examiner 1'})
+
+    def test_workload_per_teacher_per_session(self):
+        with self.assertNumQueries(2):
+            rows = workload()
+        counts = {(row['teacher'], row['session']): row for row in rows}
+        self.assertEqual(counts[('Teacher 0', '2023')]['invigilator'], 6)
+        self.assertEqual(counts[('Teacher 0', '2023')]['total'], 9)
+        self.assertEqual(counts[('Teacher 2', '2024')]['examiner2'], 2)
+        self.assertEqual(counts[('Teacher 3', None)]['total'], 0)
+
+    def test_department_sees_its_own_teachers(self):
+        self.client.force_login(self.departments[1].user)
+        rows = self.client.get(reverse('duty_roster_json'), {'session': '2023', 'department': self.departments[0].pk}).json()['results']
+        self.assertEqual([row['teacher'] for row in rows], ['Teacher 1', 'Teacher 3'])
+        self.assertEqual(rows[0]['total'], 3)
+
+    def test_exports(self):
+        self.client.force_login(self.office)
+        response = self.client.get(reverse('duty_roster_csv'))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(len(response.content.decode().splitlines()), 1 + 7)
+        self.assertContains(self.client.get(reverse('teacher_duties', args=[self.teachers[1].pk])), 'Examiner 1')
+
+    def test_teachers_see_only_their_own_duties(self):
+        self.client.force_login(self.teachers[1].user)
+        self.assertEqual(self.client.get(reverse('teacher_duties_json', args=[self.teachers[1].pk])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('teacher_duties_json', args=[self.teachers[0].pk])).status_code, 403)
+        self.assertEqual(self.client.get(reverse('duty_roster')).status_code, 403)
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        spec = UniversitySpec(departments=2, students=40, teachers=6, batches=2, courses_per_batch=2, rooms=2)
+        cls.counts = UniversityGenerator(spec).generate()
+
+    def test_generated_university(self):
+        self.assertEqual(Student.objects.count(), 40)
+        self.assertEqual(self.counts['ExamRegistration'], 80)
+        self.assertEqual(ExamRegistration.exams.through.objects.count(), 160)
+        self.assertEqual(Result.objects.count(), self.counts['Result'])
+        self.assertTrue(Attendance.objects.filter(role='Invigilator').exists())
+
+    def test_every_flow_runs_and_writing_flows_roll_back(self):
+        registrations = ExamRegistration.objects.count()
+        results = run_benchmarks(BenchmarkContext(), default_flows(), iterations=2, warmup=0)
+        self.assertEqual(ExamRegistration.objects.count(), registrations)
+        self.assertEqual(set(results['flows']), {flow.name for flow in default_flows()})
+        self.assertEqual(results['dataset']['students'], 40)
+        self.assertEqual(compare(results, results), [])
+
+    def test_compare(self):
+        baseline = {'flows': {'login': {'p50_ms': 100, 'queries': 5}, 'export': {'p50_ms': 1, 'queries': 3}}}
+        current = {'flows': {'login': {'p50_ms': 130, 'queries': 5}, 'export': {'p50_ms': 2, 'queries': 4}}}
+        self.assertEqual(compare(baseline, current), [('login', 'p50 100ms -> 130ms'), ('export', 'queries 3 -> 4')])
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0, PROFILING_DUPLICATE_THRESHOLD=3)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x', role='Exam_Office', is_staff=True)
+        cls.student = User.objects.create_user(username='student', email='student@example.com', password='x', role='Student')
+
+    def setUp(self):
+        registry.reset()
+
+    def test_repeated_queries_are_reported(self):
+        def view(request):
+            for _ in range(4):
+                list(User.objects.filter(username='staff'))
+            return HttpResponse()
+
+        with self.assertLogs('Exam_Office_System.profiling', 'WARNING'):
+            ProfilingMiddleware(view)(RequestFactory().get('/loop/'))
+        metrics = registry.snapshot()
+        self.assertEqual(metrics['views']['<unresolved>']['duplicate_queries'], 3)
+        self.assertEqual(metrics['views']['<unresolved>']['queries']['sum'], 4)
+        self.assertEqual(metrics['recent_slow'][0]['repeated'][0]['count'], 4)
+
+    def test_metrics_per_view(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('dashboard'))
+        views = self.client.get(reverse('metrics')).json()['views']
+        self.assertEqual(views['dashboard']['sampled'], 1)
+        self.assertGreater(views['dashboard']['template_seconds']['sum'], 0)
+        text = self.client.get(reverse('metrics_prometheus')).content.decode()
+        self.assertIn('exam_office_request_seconds_bucket{view="dashboard",le="+Inf"} 1', text)
+
+    def test_unsampled_requests_are_only_counted(self):
+        with self.settings(PROFILING_SAMPLE_RATE=0):
+            self.client.force_login(self.staff)
+            self.client.get(reverse('dashboard'))
+        views = registry.snapshot()['views']
+        self.assertEqual((views['dashboard']['requests'], views['dashboard']['sampled']), (1, 0))
+
+    def test_staff_or_token_only(self):
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        with self.settings(PROFILING_METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get(reverse('metrics_prometheus'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(self.client.get(reverse('metrics_prometheus'), HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_MAX_LAG=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        patcher = mock.patch('Exam_Office_System.routing.replica_available', return_value=True)
+        self.available = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_opted_in_reads_use_a_replica(self):
+        self.assertEqual(self.router.db_for_read(Exam), 'default')
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Exam), 'replica1')
+            self.assertEqual(self.router.db_for_write(Exam), 'default')
+            self.assertEqual(stale_cache_timeout(3600), 5)
+        self.assertEqual(stale_cache_timeout(3600), 3600)
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.available.return_value = False
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Exam), 'default')
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=300)
+    @mock.patch('Exam_Office_System.dashboard.cache')
+    def test_dashboard_summaries_from_a_replica_expire_with_the_lag(self, cache):
+        office = User(role='Exam_Office')
+        with replica_reads():
+            get_dashboard_summary(office)
+        get_dashboard_summary(office)
+        self.assertEqual([call.args[2] for call in cache.get_or_set.call_args_list], [5, 300])
+
+    def test_session_reads_its_writes(self):
+        reads = []
+        def view(request):
+            with replica_reads():
+                reads.append(self.router.db_for_read(Exam))
+                if request.method == 'POST':
+                    self.router.db_for_write(Exam)
+                    reads.append(self.router.db_for_read(Exam))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        self.assertNotIn('pin_primary', middleware(RequestFactory().get('/')).cookies)
+        response = middleware(RequestFactory().post('/'))
+        self.assertEqual(response.cookies['pin_primary']['max-age'], 15)
+        request = RequestFactory().get('/')
+        request.COOKIES['pin_primary'] = '1'
+        middleware(request)
+        self.assertEqual(reads, ['replica1', 'default', 'default', 'default'])
+
+
+# Timetabling: clash-free colouring and saving
+class TimetableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = make_department()
+        # Each exam in its own batch, so only shared students link them
+        cls.exams = [make_exam(cls.department, number, batch=str(number)) for number in range(4)]
+        students = [make_student(cls.department, number) for number in range(4)]
+        # Exams 0-1-2 form a triangle of shared students; exam 3 shares with exam 0 only
+        for student, pair in zip(students, [(0, 1), (1, 2), (0, 2), (0, 3)]):
+            register(student, [cls.exams[index] for index in pair])
+
+    def dates(self, count):
+        return [datetime.date(2024, 3, 1) + datetime.timedelta(days=day) for day in range(count)]
+
+    def test_colouring_separates_exams_sharing_students(self):
+        exams = [{'id': exam, 'department_id': 1, 'session': '2023', 'batch': str(exam)} for exam in range(6)]
+        enrolments = [(1, 0), (1, 1), (1, 2), (2, 2), (2, 3), (3, 3), (3, 4), (3, 5), (4, 0), (4, 5)]
+        sizes, adjacency = build_conflict_graph(exams, enrolments, roles=())
+        assignment, unscheduled = colour_exams(adjacency, sizes, 3)
+        self.assertEqual(unscheduled, [])
+        for student, exam in enrolments:
+            shared = [other for other_student, other in enrolments if other_student == student and other != exam]
+            self.assertTrue(all(assignment[exam] != assignment[other] for other in shared))
+
+    def test_too_few_days_leave_exams_unscheduled(self):
+        exams = [{'id': exam, 'department_id': 1, 'session': '2023', 'batch': str(exam)} for exam in range(3)]
+        sizes, adjacency = build_conflict_graph(exams, [(1, 0), (1, 1), (1, 2)], roles=())
+        assignment, unscheduled = colour_exams(adjacency, sizes, 2)
+        self.assertEqual((len(assignment), len(unscheduled)), (2, 1))
+
+    def test_saved_timetable_has_no_student_clashes(self):
+        timetable = schedule_session('2023', self.dates(3))
+        save_timetable(timetable)
+        for registration in ExamRegistration.objects.prefetch_related('exams'):
+            dates = [exam.exam_date for exam in registration.exams.all()]
+            self.assertEqual(len(dates), len(set(dates)))
+        self.assertEqual(ExamSchedule.objects.filter(status='Published').count(), 4)
+
+    def test_partial_timetable_is_refused(self):
+        timetable = schedule_session('2023', self.dates(2))
+        self.assertTrue(timetable.unscheduled)
+        with self.assertRaises(ValueError):
+            save_timetable(timetable)
+        self.assertFalse(ExamSchedule.objects.exists())
+        with self.assertRaises(CommandError):
+            call_command('generate_timetable', '2023', start='2024-03-04', end='2024-03-05', skip_weekdays='', stdout=io.StringIO())
+        save_timetable(timetable, allow_partial=True)
+        self.assertEqual(ExamSchedule.objects.count(), 4 - len(timetable.unscheduled))
+
+
+# Registration eligibility rules
+class EligibilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = make_department()
+        cls.exams = [make_exam(cls.department, number, exam_date=datetime.date(2024, 1, 10 + number)) for number in range(4)]
+        cls.student = make_student(cls.department, 0, hall_clearance=True, library_clearance=True)
+
+    def evaluate(self, *registrations, rules=None):
+        evaluate_registrations(ExamRegistration.objects.filter(pk__in=[registration.pk for registration in registrations]), rules)
+        for registration in registrations:
+            registration.refresh_from_db()
+
+    def test_default_rules(self):
+        verified = register(self.student, self.exams[:1], payment_status='Completed')
+        unpaid = register(self.student, self.exams[:1])
+        uncleared = register(make_student(self.department, 1), self.exams[:1], payment_status='Completed')
+        expelled = register(make_student(self.department, 2, expelled=True), self.exams[:1], payment_status='Completed')
+        self.evaluate(verified, unpaid, uncleared, expelled)
+        self.assertEqual(verified.status, 'Verified')
+        self.assertEqual((unpaid.status, unpaid.ineligibility_reasons), ('Pending', 'Payment pending'))
+        self.assertEqual((uncleared.status, uncleared.ineligibility_reasons), ('Pending', 'Missing hall and library clearance'))
+        self.assertEqual(expelled.status, 'Rejected')
+
+    def test_only_retakes_past_the_limit_are_rejected(self):
+        retakes = [register(self.student, [exam], registration_type='Retake') for exam in self.exams[:3]]
+        self.evaluate(*retakes, rules=[RetakeLimitRule(2)])
+        self.assertEqual([registration.status for registration in retakes], ['Verified', 'Verified', 'Rejected'])
+        # Re-evaluating keeps the same verdicts
+        self.evaluate(*retakes, rules=[RetakeLimitRule(2)])
+        self.assertEqual([registration.status for registration in retakes], ['Verified', 'Verified', 'Rejected'])
+
+    def test_rejected_retakes_do_not_count(self):
+        register(self.student, self.exams[:1], registration_type='Retake', status='Rejected')
+        retakes = [register(self.student, [exam], registration_type='Retake') for exam in self.exams[1:3]]
+        self.evaluate(*retakes, rules=[RetakeLimitRule(2)])
+        self.assertEqual([registration.status for registration in retakes], ['Verified', 'Verified'])
+
+    def test_attendance_ignores_rejected_registrations(self):
+        register(self.student, self.exams[:2], status='Verified')
+        register(self.student, self.exams[2:4], status='Rejected')
+        Attendance.objects.create(exam=self.exams[0], student=self.student, attendance_date=self.exams[0].exam_date, role='Student')
+        Attendance.objects.create(exam=self.exams[1], student=self.student, attendance_date=self.exams[1].exam_date, role='Student')
+        current = register(self.student, [make_exam(self.department, 9, exam_date=datetime.date(2099, 1, 1))])
+        self.evaluate(current, rules=[AttendanceRule(0.75)])
+        self.assertEqual(current.status, 'Verified')
+        Attendance.objects.filter(exam=self.exams[1]).delete()
+        self.evaluate(current, rules=[NotExpelledRule(), AttendanceRule(0.75)])
+        self.assertEqual((current.status, current.ineligibility_reasons), ('Rejected', 'Attendance below 75% of registered exams'))
+
+    def test_dashboard_summaries_are_invalidated(self):
+        cache.clear()
+        registration = register(self.student, self.exams[:1], payment_status='Completed')
+        office = User(role='Exam_Office')
+        self.assertEqual(get_dashboard_summary(office)['pending_registrations'], 1)
+        self.assertEqual(get_dashboard_summary(self.student.user)['registrations']['verified'], 0)
+        self.evaluate(registration)
+        self.assertEqual(get_dashboard_summary(office)['pending_registrations'], 0)
+        self.assertEqual(get_dashboard_summary(self.student.user)['registrations']['verified'], 1)
+
+
+# Hall and library clearance sync
+class ClearanceSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = User.objects.create_user(username='office', email='office@example.com', password='x', role='Exam_Office')
+        department = make_department()
+        cls.students = [make_student(department, number, hall_clearance=number == 0) for number in range(3)]
+
+    def test_only_changes_are_written_and_audited(self):
+        entries = read_clearance_list('{"cleared": ["2023-000", "2023-001", "9999"], "uncleared": ["2023-002"]}', 'application/json')
+        report = sync_clearance('hall', entries, changed_by=self.office)
+        self.assertEqual((report.received, report.cleared, report.uncleared, report.unchanged), (4, 1, 0, 2))
+        self.assertEqual(report.unknown, ['9999'])
+        self.assertEqual(
+            list(Student.objects.order_by('pk').values_list('hall_clearance', flat=True)), [True, True, False],
+        )
+        audit = ClearanceAudit.objects.get()
+        self.assertEqual(
+            (audit.student, audit.office, audit.previous, audit.cleared, audit.sync_id, audit.changed_by),
+            (self.students[1], 'hall', False, True, report.sync_id, self.office),
+        )
+        self.assertIsNotNone(audit.changed_at)
+
+    def test_resync_and_dry_run_write_nothing(self):
+        entries = [('2023-001', True)]
+        report = sync_clearance('library', entries, dry_run=True)
+        self.assertEqual(report.cleared, 1)
+        self.assertFalse(ClearanceAudit.objects.exists())
+        sync_clearance('library', entries)
+        report = sync_clearance('library', entries)
+        self.assertEqual((report.changed, report.unchanged), (0, 1))
+        self.assertEqual(ClearanceAudit.objects.count(), 1)
+
+    def test_malformed_lists_are_rejected(self):
+        for data in ['{"cleared": 5}', '{"uncleared": "2023-000"}', '{"students": 1}', '[]']:
+            with self.subTest(data=data), self.assertRaises(SheetError):
+                read_clearance_list(data, 'application/json')
+
+    def test_non_utf8_upload_is_rejected(self):
+        self.client.force_login(self.office)
+        response = self.client.post(
+            reverse('sync_hall_clearance'), b'\xff\xferegistration_number,cleared\n', content_type='text/csv',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'File is not UTF-8 encoded')
+
+    def test_only_listed_students_are_read(self):
+        entries = [(student.registration_number, True) for student in self.students] + [('9999', True)]
+        # One lookup per chunk of listed numbers, however many students exist
+        with self.assertNumQueries(2):
+            report = sync_clearance('hall', entries, dry_run=True, chunk_size=2)
+        self.assertEqual((report.cleared, report.unchanged, report.unknown), (2, 1, ['9999']))
+
+
+# Published schedule pages and iCalendar feeds
+class ScheduleFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = make_department()
+        for number, batch in enumerate(['49', '2019-20/A']):
+            exam = make_exam(cls.department, number, batch=batch, exam_date=datetime.date(2024, 2, 1 + number))
+            ExamSchedule.objects.create(exam=exam, published_date=datetime.date(2024, 1, 5), status='Published')
+        cls.student = make_student(cls.department, 0)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_is_the_same_for_every_visitor(self):
+        url = reverse('department_schedule', args=[self.department.pk])
+        anonymous = self.client.get(url)
+        self.client.force_login(self.student.user)
+        logged_in = self.client.get(url)
+        self.assertEqual(anonymous.content, logged_in.content)
+        self.assertNotContains(logged_in, 'Register Student')
+        # Batches with a slash still get their own page
+        batch_url = reverse('batch_schedule', args=[self.department.pk, '2019-20/A'])
+        self.assertContains(anonymous, batch_url)
+        self.assertContains(self.client.get(batch_url), 'C-2023-1')
+
+    def test_conditional_requests(self):
+        url = reverse('department_schedule', args=[self.department.pk])
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        # Dates are too coarse to revalidate on: a later change the same day must not 304
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT').status_code, 200)
+        ExamSchedule.objects.filter(exam__batch='49').update(status='Modified', modified_date=datetime.date(2024, 1, 9))
+        cache.clear()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_ics_feed(self):
+        response = self.client.get(reverse('batch_schedule_ics', args=[self.department.pk, '2019-20/A']))
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn('DTSTART;VALUE=DATE:20240202\r\n', body)
+        self.assertIn('SUMMARY:C-2023-1 Course 1 (batch 2019-20/A)', body)
+        stamp = re.search(r'DTSTAMP:(\d{8}T\d{6}Z)', body).group(1)
+        generated = datetime.datetime.strptime(stamp, '%Y%m%dT%H%M%SZ').replace(tzinfo=datetime.timezone.utc)
+        self.assertLess(abs((timezone.now() - generated).total_seconds()), 60)
+        self.assertEqual(self.client.get(response.wsgi_request.path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+
+# Attendance sheets posted by invigilators
+class AttendanceSheetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = make_department()
+        cls.invigilator = make_teacher(department, 0)
+        cls.exam = make_exam(department, 0, invigilator=cls.invigilator)
+        cls.students = [make_student(department, number) for number in range(3)]
+        for student in cls.students:
+            register(student, [cls.exam])
+
+    def setUp(self):
+        self.client.force_login(self.invigilator.user)
+
+    def post(self, payload, content_type='application/json'):
+        body = json.dumps(payload) if content_type == 'application/json' else payload
+        return self.client.post(reverse('exam_attendance', args=[self.exam.pk]), body, content_type=content_type)
+
+    def present(self):
+        return set(Attendance.objects.filter(exam=self.exam, role='Student').values_list('student__registration_number', flat=True))
+
+    def test_resubmission_is_idempotent(self):
+        payload = {'present': ['2023-000', '2023-001'], 'absent': ['2023-002'], 'attendance_date': '2024-01-10'}
+        self.assertEqual(self.post(payload).json()['present'], 2)
+        self.assertEqual(self.post(payload).json(), {'exam': self.exam.pk, 'present': 2, 'absent': 1, 'removed': 0})
+        self.assertEqual(self.present(), {'2023-000', '2023-001'})
+
+    def test_corrected_sheet_reconciles_present_and_absent(self):
+        self.post({'present': ['2023-000', '2023-001']})
+        response = self.post('registration_number,present\n2023-001,absent\n2023-002,yes\n', content_type='text/csv')
+        self.assertEqual(response.json()['removed'], 1)
+        # Students missing from the sheet (another hall) are left alone
+        self.assertEqual(self.present(), {'2023-000', '2023-002'})
+
+    def test_bad_payloads_are_rejected(self):
+        for payload in [
+            {'present': '2023-000'},
+            {'absent': {'2023-000': True}},
+            {'students': 'all'},
+            {'students': ['2023-000']},
+            {'present': ['2023-000'], 'attendance_date': 20240110},
+            {'present': ['2023-000'], 'attendance_date': '2024-02-30'},
+            {'present': ['2023-000', 'nobody']},
+            ['2023-000'],
+        ]:
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+        self.assertEqual(self.present(), set())
+
+    def test_non_utf8_csv_is_rejected(self):
+        response = self.post(b'\xff\xfer\x00e\x00g\x00', content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'File is not UTF-8 encoded')
+
+
+# Seat plans: capacity, neighbour separation and invigilation
+class SeatPlanTests(TestCase):
+    def test_capacity(self):
+        candidates = [(1, student) for student in range(10)]
+        seats, unseated, adjacent, clashes = allocate_seats(candidates, [(1, 2, 3)])
+        self.assertEqual(len(seats), 6)
+        self.assertEqual(unseated, [(1, student) for student in range(6, 10)])
+        self.assertEqual(len({(room, row, column) for room, row, column, _, _ in seats}), 6)
+
+    def test_neighbours_sit_different_exams(self):
+        candidates = [(1, student) for student in range(8)] + [(2, student) for student in range(8, 16)]
+        seats, unseated, adjacent, _ = allocate_seats(candidates, [(1, 4, 4)])
+        self.assertEqual((len(seats), unseated, adjacent), (16, [], 0))
+        grid = {(row, column): exam for _, row, column, exam, _ in seats}
+        for (row, column), exam in grid.items():
+            self.assertNotEqual(grid.get((row, column - 1)), exam)
+            self.assertNotEqual(grid.get((row - 1, column)), exam)
+
+    def test_spare_seats_keep_one_exam_apart(self):
+        seats, unseated, adjacent, _ = allocate_seats([(1, student) for student in range(4)], [(1, 3, 3)])
+        self.assertEqual((len(seats), unseated, adjacent), (4, [], 0))
+        cells = {(row, column) for _, row, column, _, _ in seats}
+        for row, column in cells:
+            self.assertNotIn((row, column - 1), cells)
+            self.assertNotIn((row - 1, column), cells)
+
+    def test_one_seat_per_student(self):
+        seats, unseated, _, clashes = allocate_seats([(1, 7), (1, 8), (2, 7)], [(1, 2, 2)])
+        self.assertEqual(sorted((exam, student) for *_, exam, student in seats), [(1, 7), (1, 8)])
+        self.assertEqual((unseated, clashes), ([], [(2, 7)]))
+
+    def test_invigilators_per_room(self):
+        seats = [(1, 1, column, 1, column) for column in range(1, 6)] + [(2, 1, 1, 2, 10)]
+        assignments, shortfall = assign_invigilators(seats, {1: 100, 2: 200, 3: 300}, per_invigilator=2)
+        rooms = {}
+        for room, teacher in assignments:
+            rooms.setdefault(room, []).append(teacher)
+        # Room 1 needs three: its own exam's invigilator first, then the only one left in the pool
+        self.assertEqual(rooms[1], [100, 300])
+        self.assertEqual(rooms[2], [200])
+        self.assertEqual(shortfall, 1)
+
+    def test_plan_date_seats_each_student_once(self):
+        department = make_department()
+        day = datetime.date(2024, 1, 10)
+        first, second = make_exam(department, 1, exam_date=day), make_exam(department, 2, exam_date=day)
+        students = [make_student(department, number) for number in range(3)]
+        register(students[0], [first, second], status='Verified')
+        for student in students[1:]:
+            register(student, [first], status='Verified')
+        room = Room.objects.create(name='101', rows=3, columns=3)
+
+        plan = plan_date(day, rooms=Room.objects.filter(pk=room.pk))
+        self.assertEqual(plan.clashes, [(second.pk, students[0].pk)])
+        save_seat_plan(plan)
+        self.assertEqual(SeatAllocation.objects.filter(exam_date=day, student=students[0]).count(), 1)
+        self.assertEqual(SeatAllocation.objects.filter(exam_date=day).count(), 3)
+
+
+# Result tabulation: grades, GPA, CGPA and batch ranks
+class TabulationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = make_department()
+        cls.exams = [make_exam(cls.department, number, session='2023-24') for number in range(2)]
+        cls.junior_exam = make_exam(cls.department, 9, session='2023-24', batch='50')
+        cls.students = [make_student(cls.department, number) for number in range(4)]
+        marks = [(85, 72), (72, 85), (60, 61), (90, 30)]
+        for student, student_marks in zip(cls.students, marks):
+            for exam, mark in zip(cls.exams, student_marks):
+                Result.objects.create(exam=exam, student=student, marks=mark)
+        # A retake of a junior batch's course does not move the student out of batch 49
+        Result.objects.create(exam=cls.junior_exam, student=cls.students[3], marks=80)
+
+    def tabulate(self):
+        tabulation = tabulate_session('2023-24')
+        return {int(student_id): position for position, student_id in enumerate(tabulation.student_ids)}, tabulation
+
+    def test_grades(self):
+        scale = GradingScale()
+        self.assertEqual(list(scale.letter([100, 80, 79, 40, 39, -5])), ['A+', 'A+', 'A', 'D', 'F', 'F'])
+        self.assertEqual(list(scale.grade_points([75, 44])), [3.75, 2.0])
+
+    def test_gpa_and_rank(self):
+        positions, tabulation = self.tabulate()
+        first, second, third, failing = (positions[student.pk] for student in self.students)
+        self.assertEqual(tabulation.gpa[first], 3.75)
+        self.assertEqual(tabulation.gpa[third], 3.0)
+        # Equal GPAs share a rank; the student with a failed course is not ranked
+        self.assertEqual(list(tabulation.rank[[first, second, third, failing]]), [1, 1, 3, 0])
+        self.assertEqual(tabulation.failed[failing], 1)
+        self.assertEqual(tabulation.batches[failing], '49')
+
+    def test_cgpa_counts_earlier_sessions_by_year(self):
+        student = self.students[2]
+        TabulationSheet.objects.create(student=student, session='2019-20', batch='49', courses=2, failed_courses=0,
+                                       grade_points=8, gpa=4, cgpa=4)
+        # Sorts before '2023-24' as a string, but is the same year
+        TabulationSheet.objects.create(student=student, session='2023', batch='49', courses=2, failed_courses=0,
+                                       grade_points=0, gpa=0, cgpa=0)
+        TabulationSheet.objects.create(student=student, session='2025-26', batch='49', courses=2, failed_courses=0,
+                                       grade_points=0, gpa=0, cgpa=0)
+        positions, tabulation = self.tabulate()
+        # (3.00 + 3.00 + 8.00) / 4 courses
+        self.assertEqual(tabulation.cgpa[positions[student.pk]], 3.5)
+
+    def test_save_upserts(self):
+        save_tabulation(tabulate_session('2023-24'))
+        save_tabulation(tabulate_session('2023-24'))
+        sheet = TabulationSheet.objects.get(student=self.students[0], session='2023-24')
+        self.assertEqual((sheet.batch, sheet.rank, str(sheet.gpa)), ('49', 1, '3.75'))
+        self.assertEqual(TabulationSheet.objects.count(), 4)
+
+    def test_session_year(self):
+        self.assertEqual(session_year('2019-20'), 2019)
+        with self.assertRaises(ValueError):
+            session_year('Spring')
+
+
+# Double marking: averaging, examiner 3 and withdrawn results
+class ReconciliationTests(TestCase):
+    def test_within_threshold_is_averaged(self):
+        self.assertEqual(reconcile_script({1: 60, 2: 65}, threshold=10), ('Finalised', 5, 63))
+        self.assertEqual(reconcile_script({1: 60, 2: 70}, threshold=10), ('Finalised', 10, 65))
+
+    def test_missing_marks_are_pending(self):
+        self.assertEqual(reconcile_script({1: 60}, threshold=10), ('Pending', None, None))
+
+    def test_third_examiner_fallback(self):
+        self.assertEqual(reconcile_script({1: 40, 2: 70}, threshold=10), ('ThirdExaminer', 30, None))
+        # Examiner 3 is averaged with the closer of the two
+        self.assertEqual(reconcile_script({1: 40, 2: 70, 3: 65}, threshold=10), ('Finalised', 30, 68))
+
+    def test_regressed_script_loses_its_result(self):
+        department = make_department()
+        exam = make_exam(department, 1)
+        student = make_student(department, 1)
+        ExaminerMark.objects.create(exam=exam, student=student, examiner=1, marks=60)
+        second = ExaminerMark.objects.create(exam=exam, student=student, examiner=2, marks=64)
+        marks = ExaminerMark.objects.filter(exam=exam)
+
+        reconcile_marks(marks, threshold=10)
+        self.assertEqual(Result.objects.get(exam=exam, student=student).marks, 62)
+
+        second.marks = 90
+        second.save()
+        report = reconcile_marks(marks, threshold=10)
+        self.assertEqual((report['ThirdExaminer'], report['withdrawn']), (1, 1))
+        self.assertEqual(AnswerScript.objects.get(exam=exam, student=student).status, 'ThirdExaminer')
+        self.assertFalse(Result.objects.filter(exam=exam, student=student).exists())
+
+        ExaminerMark.objects.create(exam=exam, student=student, examiner=3, marks=86)
+        reconcile_marks(marks, threshold=10)
+        self.assertEqual(Result.objects.get(exam=exam, student=student).marks, 88)
+
+
+# Marksheet and certificate downloads
+class DocumentDownloadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = make_department()
+        cls.exam = make_exam(department, 1)
+        cls.student = make_student(department, 1)
+        cls.other = make_student(department, 2)
+        Result.objects.create(exam=cls.exam, student=cls.student, marks=78)
+        cls.application = MarksheetApplication.objects.create(student=cls.student, exam=cls.exam, status='Approved', token='tok-1')
+        cls.unpublished = MarksheetApplication.objects.create(student=cls.other, exam=cls.exam, status='Approved', token='tok-2')
+
+    def setUp(self):
+        output = tempfile.TemporaryDirectory()
+        self.addCleanup(output.cleanup)
+        self.enterContext(override_settings(DOCUMENT_ROOT=output.name))
+        self.url = reverse('download_marksheet', args=['tok-1'])
+
+    def test_download_and_revalidate(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF-'))
+        response.close()
+        etag = response['ETag']
+        for header in (etag, f'W/{etag}', f'"stale", {etag}', '*'):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=header).status_code, 304, header)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_other_students_are_refused(self):
+        self.client.force_login(self.other.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_marksheet_without_result_is_refused(self):
+        with self.assertRaises(DocumentNotReady):
+            document_file('marksheet', self.unpublished)
+        self.client.force_login(self.other.user)
+        self.assertEqual(self.client.get(reverse('download_marksheet', args=['tok-2'])).status_code, 404)
+
+    def test_issue_with_spawned_workers(self):
+        spawn = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        with mock.patch('Exam_Office_System.documents.ProcessPoolExecutor', spawn):
+            report = issue_documents('marksheet', approved_applications('marksheet'), workers=2)
+        self.assertEqual((report['documents'], report['written'], report['unpublished']), (1, 1, 1))
+        self.assertEqual(len(os.listdir(os.path.join(settings.DOCUMENT_ROOT, 'marksheet'))), 1)
+
+
+# Teacher remuneration and payment batches
+class RemunerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = make_department()
+        cls.teachers = [make_teacher(department, number) for number in range(2)]
+        cls.exam = make_exam(department, 1, invigilator=cls.teachers[0], examiner1=cls.teachers[1], examiner2=cls.teachers[1])
+        for number in range(3):
+            register(make_student(department, number), [cls.exam], status='Rejected' if number == 2 else 'Verified')
+        RemunerationRate.objects.create(role='Invigilator', base_amount=500)
+        RemunerationRate.objects.create(role='Examiner', base_amount=100, per_script_amount=10)
+
+    def test_amounts(self):
+        report = calculate_remuneration(session_exams('2023'))
+        self.assertEqual((report['lines'], report['created']), (2, 2))
+        self.assertIn('Moderator', report['missing_rates'])
+        amounts = dict(TeacherRemuneration.objects.values_list('role', 'amount'))
+        # Two examiner slots, two non-rejected scripts each
+        self.assertEqual(amounts, {'Invigilator': 500, 'Examiner': 240})
+
+    def test_rerun_is_idempotent(self):
+        calculate_remuneration(session_exams('2023'))
+        TeacherRemuneration.objects.filter(role='Invigilator').update(status='Paid', amount=450)
+        report = calculate_remuneration(session_exams('2023'))
+        self.assertEqual((report['lines'], report['created']), (2, 0))
+        self.assertEqual(TeacherRemuneration.objects.count(), 2)
+        paid = TeacherRemuneration.objects.get(role='Invigilator')
+        self.assertEqual((paid.status, paid.amount), ('Paid', 450))
+
+    def test_each_line_is_paid_once(self):
+        calculate_remuneration(session_exams('2023'))
+        first = io.StringIO()
+        self.assertEqual(export_payment_batch(TeacherRemuneration.objects.all(), first), (2, 740))
+        self.assertEqual(len(first.getvalue().splitlines()), 3)
+        self.assertFalse(TeacherRemuneration.objects.filter(status='Pending').exists())
+        second = io.StringIO()
+        self.assertEqual(export_payment_batch(TeacherRemuneration.objects.all(), second), (0, 0))
+        self.assertEqual(second.getvalue().splitlines(), [','.join(PAYMENT_COLUMNS)])
+
+
+# Exam material forecasts
+class MaterialForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = make_department()
+        past = make_exam(cls.department, 1)
+        cls.upcoming = make_exam(cls.department, 2, session='2030', exam_date=datetime.date(2030, 1, 10))
+        students = [make_student(cls.department, number) for number in range(11)]
+        for student in students[:4]:
+            register(student, [past], status='Verified')
+        for student in students[:2]:
+            Attendance.objects.create(exam=past, student=student, role='Student', attendance_date=past.exam_date)
+        for student in students[:10]:
+            register(student, [cls.upcoming], status='Verified')
+        register(students[10], [cls.upcoming], status='Rejected')
+
+    def test_quantity(self):
+        self.assertEqual(forecast_quantity(100, 1.0, 0.10, 5), 115)
+        self.assertEqual(forecast_quantity(0, 1.0, 0.10, 5), 0)
+
+    def test_forecast_uses_turnout_with_a_floor(self):
+        self.assertEqual(department_turnout([self.department.pk]), {self.department.pk: 0.5})
+        forecast = forecast_materials(Exam.objects.filter(session='2030'))
+        # 10 candidates at the 0.9 floor -> 9 expected
+        self.assertEqual(forecast, {
+            (self.upcoming.pk, 'AnswerScripts'): 15,
+            (self.upcoming.pk, 'QuestionPapers'): 12,
+            (self.upcoming.pk, 'Pens'): 15,
+        })
+
+    def test_save_upserts(self):
+        save_forecast({(self.upcoming.pk, 'Pens'): 3})
+        save_forecast({(self.upcoming.pk, 'Pens'): 7})
+        self.assertEqual(list(ExamMaterials.objects.values_list('material_type', 'quantity')), [('Pens', 7)])
+
+    def test_dry_run_prints_rollup_without_saving(self):
+        output = io.StringIO()
+        call_command('forecast_materials', '2030', '--dry-run', stdout=output)
+        self.assertIn('CSE: 15 AnswerScripts over 1 exams', output.getvalue())
+        self.assertIn('Dry run', output.getvalue())
+        self.assertFalse(ExamMaterials.objects.exists())
+
+        saved = io.StringIO()
+        call_command('forecast_materials', '2030', stdout=saved)
+        self.assertIn('CSE: 15 AnswerScripts over 1 exams', saved.getvalue())
+        self.assertEqual(ExamMaterials.objects.count(), 3)
+
+
+# PDF output and admit cards
+class PdfWriterTests(SimpleTestCase):
+    def write(self, pages):
+        output = io.BytesIO()
+        with PdfWriter(output) as pdf:
+            for page in pages:
+                pdf.add_page(page)
+        return output.getvalue()
+
+    def test_xref_offsets_point_at_objects(self):
+        page = Page()
+        page.text(50, 800, 'Marks (final) \\ 78')
+        data = self.write([page, Page()])
+        self.assertTrue(data.startswith(b'%PDF-1.4'))
+        self.assertTrue(data.endswith(b'%%EOF\n'))
+        xref = int(re.search(rb'startxref\n(\d+)\n', data).group(1))
+        self.assertTrue(data[xref:].startswith(b'xref\n0 '))
+        count = int(re.match(rb'xref\n0 (\d+)\n', data[xref:]).group(1))
+        entries = re.findall(rb'(\d{10}) 00000 n ', data[xref:])
+        self.assertEqual(len(entries), count - 1)
+        for object_id, offset in enumerate(entries, start=1):
+            self.assertTrue(data[int(offset):].startswith(f'{object_id} 0 obj\n'.encode()), object_id)
+        self.assertIn(b'/Count 2', data)
+
+    def test_write_pdf_replaces_atomically(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = os.path.join(output_dir, 'cards', 'card.pdf')
+            write_pdf(path, [Page()])
+
+            def failing_pages():
+                yield Page()
+                raise RuntimeError('render failed')
+
+            with self.assertRaises(RuntimeError):
+                write_pdf(path, failing_pages())
+            # The complete earlier file survives and no temporary file is left behind
+            self.assertEqual(os.listdir(os.path.dirname(path)), ['card.pdf'])
+            with open(path, 'rb') as written:
+                self.assertTrue(written.read().endswith(b'%%EOF\n'))
+
+
+class AdmitCardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = make_department()
+        exam = make_exam(department, 1)
+        cls.registrations = [register(make_student(department, number), [exam], status='Verified') for number in range(3)]
+        register(make_student(department, 9), [exam], status='Pending')
+
+    def test_cards_are_flagged_once_written(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            report = generate_admit_cards(verified_registrations(), output_dir, workers=1, chunk_size=2)
+            self.assertEqual((report['cards'], report['bundles']), (3, 1))
+            self.assertEqual(ExamRegistration.objects.filter(admit_card_generated=True).count(), 3)
+            for registration in self.registrations:
+                self.assertTrue(os.path.exists(card_path(output_dir, card_data(registration))))
+            self.assertTrue(os.path.exists(bundle_path(output_dir, self.registrations[0].student.department_id)))
+
+            # Flagged cards are skipped on the next run
+            report = generate_admit_cards(verified_registrations(), output_dir, workers=1)
+            self.assertEqual((report['cards'], report['bundles']), (0, 0))
+
+    def test_spawned_workers(self):
+        # Spawn is the default start method on Windows and macOS
+        spawn = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        with tempfile.TemporaryDirectory() as output_dir, mock.patch('Exam_Office_System.admit_cards.ProcessPoolExecutor', spawn):
+            report = generate_admit_cards(verified_registrations(), output_dir, workers=2)
+        self.assertEqual((report['cards'], report['bundles']), (3, 1))
+
+
+# Timetable clash detection
+class ConflictTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = make_department()
+        cls.teacher = make_teacher(department, 1)
+        cls.exam = make_exam(department, 1, invigilator=cls.teacher)
+        # Another batch on the same date: no batch clash, but shares the teacher and a retaker
+        cls.junior = make_exam(department, 2, batch='50', moderator=cls.teacher)
+        cls.later = make_exam(department, 3, exam_date=datetime.date(2024, 1, 11))
+        cls.retaker = make_student(department, 1)
+        register(cls.retaker, [cls.exam], status='Verified')
+        register(cls.retaker, [cls.junior, cls.later], registration_type='Retake', status='Verified')
+        cls.rejected = make_student(department, 2)
+        register(cls.rejected, [cls.exam, cls.later])
+        register(cls.rejected, [cls.junior], status='Rejected')
+
+    def conflicts(self, **kwargs):
+        exams = Exam.objects.all()
+        return find_conflicts(exam_rows(exams), registrations=registration_rows(exams), **kwargs)
+
+    def test_student_and_teacher_overlaps(self):
+        found = {(conflict.kind, conflict.key): conflict.exam_ids for conflict in self.conflicts()}
+        self.assertEqual(found, {
+            ('teacher', self.teacher.pk): [self.exam.pk, self.junior.pk],
+            ('student', self.retaker.pk): [self.exam.pk, self.junior.pk],
+        })
+        kinds = [conflict.kind for conflict in self.conflicts(roles=('invigilator',))]
+        self.assertEqual(kinds, ['student'])
+
+    def test_same_batch_on_one_date(self):
+        clash = make_exam(self.exam.department, 4)
+        found = [conflict for conflict in self.conflicts() if conflict.kind == 'batch']
+        self.assertEqual([conflict.exam_ids for conflict in found], [[self.exam.pk, clash.pk]])
+
+    def test_schedule_clean_refuses_clashes(self):
+        schedule = ExamSchedule(exam=self.junior, published_date=datetime.date(2023, 12, 1), status='Published')
+        with self.assertRaises(ValidationError) as raised:
+            schedule.clean()
+        messages = raised.exception.messages
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(any('Teacher 1' in message for message in messages))
+        self.assertTrue(any(self.retaker.registration_number in message for message in messages))
+        ExamSchedule(exam=self.later, published_date=datetime.date(2023, 12, 1), status='Published').clean()
+
+    def test_command_exit_status(self):
+        output = io.StringIO()
+        with self.assertRaises(CommandError) as raised:
+            call_command('check_exam_conflicts', stdout=output)
+        self.assertEqual(raised.exception.returncode, 1)
+        self.assertIn('2 conflicts', str(raised.exception))
+        self.assertIn(f'student {self.retaker.pk}', output.getvalue())
+
+        output = io.StringIO()
+        call_command('check_exam_conflicts', '--from-date', '2024-01-11', stdout=output)
+        self.assertIn('No conflicts', output.getvalue())
+
+
+# Cached dashboard summaries
+class DashboardCacheTests(TestCase):
+    # The user lookup, plus the profile for the other roles; sessions and warm summaries come from the cache
+    WARM_QUERIES = {'Exam_Office': 1, 'Department': 2, 'Teacher': 2, 'Student': 2}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = User.objects.create_user(username='office', email='office@example.com', password='x', role='Exam_Office')
+        cls.department = make_department()
+        cls.teacher = make_teacher(cls.department, 1)
+        cls.student = make_student(cls.department, 1)
+        cls.exam = make_exam(cls.department, 1, exam_date=datetime.date(2030, 1, 10), invigilator=cls.teacher)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_summary_is_cached_until_a_save(self):
+        self.assertEqual(get_dashboard_summary(self.office)['pending_registrations'], 0)
+        with self.assertNumQueries(0):
+            get_dashboard_summary(self.office)
+        registration = register(self.student, [self.exam])
+        self.assertEqual(get_dashboard_summary(self.office)['pending_registrations'], 1)
+        registration.delete()
+        self.assertEqual(get_dashboard_summary(self.office)['pending_registrations'], 0)
+
+    def test_student_summary_follows_results(self):
+        user = self.student.user
+        self.assertEqual(get_dashboard_summary(user)['results'], 0)
+        result = Result.objects.create(exam=self.exam, student=self.student, marks=70)
+        self.assertEqual(get_dashboard_summary(user)['results'], 1)
+        result.delete()
+        self.assertIsNone(cache.get(summary_cache_key('student', self.student.pk)))
+        self.assertEqual(get_dashboard_summary(user)['results'], 0)
+
+    def test_teacher_summaries_follow_the_version_key(self):
+        user = self.teacher.user
+        self.assertEqual(get_dashboard_summary(user)['total_duties'], 1)
+        version = cache.get('dashboard:teacher:version')
+        other = make_exam(self.department, 2, moderator=self.teacher)
+        self.assertEqual(cache.get('dashboard:teacher:version'), version + 1)
+        self.assertEqual(get_dashboard_summary(user)['total_duties'], 2)
+        other.delete()
+        self.assertEqual(cache.get('dashboard:teacher:version'), version + 2)
+        self.assertEqual(get_dashboard_summary(user)['total_duties'], 1)
+
+    def test_warm_dashboard_query_count(self):
+        users = {
+            'Exam_Office': self.office, 'Department': self.department.user,
+            'Teacher': self.teacher.user, 'Student': self.student.user,
+        }
+        for role, user in users.items():
+            self.client.force_login(user)
+            self.assertEqual(self.client.get(reverse('dashboard')).status_code, 200)
+            with self.assertNumQueries(self.WARM_QUERIES[role]):
+                self.assertEqual(self.client.get(reverse('dashboard')).status_code, 200)
+
+
+# Admin changelists: a fixed number of queries whatever the page holds. A base of three
+# plus what list_filter (related rows, distinct values) and date_hierarchy need; with three
+# rows per table, any per-row query breaks the count.
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        department = make_department()
+        for number in (1, 2, 3):
+            cls.seed(department, number)
+
+    @staticmethod
+    def seed(department, number):
+        teacher = make_teacher(department, number)
+        student = make_student(department, number)
+        exam = make_exam(department, number, invigilator=teacher)
+        room = Room.objects.create(name=f'Room {number}', rows=2, columns=2)
+        ExamOfficeOrAdmin.objects.create(
+            user=User.objects.create_user(username=f'office{number}', email=f'office{number}@example.com',
+                                          password='x', role='Exam_Office'),
+            office_name=f'Office {number}', contact_number='0', address='-',
+        )
+        ExamSchedule.objects.create(exam=exam, published_date=exam.exam_date, status='Published')
+        register(student, [exam])
+        Result.objects.create(exam=exam, student=student, marks=70)
+        ClearanceAudit.objects.create(student=student, office='hall', cleared=True, sync_id=uuid.uuid4())
+        SeatAllocation.objects.create(exam_date=exam.exam_date, room=room, seat_row=1, seat_column=1, exam=exam, student=student)
+        RoomInvigilation.objects.create(exam_date=exam.exam_date, room=room, teacher=teacher)
+        ExaminerMark.objects.create(exam=exam, student=student, examiner=1, marks=70)
+        AnswerScript.objects.create(exam=exam, student=student)
+        TabulationSheet.objects.create(student=student, session='2023', batch='49', courses=1, failed_courses=0,
+                                       grade_points=3, gpa=3, cgpa=3)
+        MarksheetApplication.objects.create(student=student, exam=exam, token=f'marksheet-{number}')
+        CertificateApplication.objects.create(student=student, degree='Honours', token=f'certificate-{number}')
+        TeacherRemuneration.objects.create(teacher=teacher, exam=exam, role='Invigilator', amount=100)
+        RemunerationRate.objects.create(role=['Invigilator', 'Examiner', 'Moderator'][number - 1])
+        ExamMaterials.objects.create(exam=exam, material_type='Pens', quantity=10)
+        Attendance.objects.create(exam=exam, student=student, role='Student', attendance_date=exam.exam_date)
+        Sickbed.objects.create(student=student, reason='Fever')
+
+    def assertChangelistQueries(self, model, queries):
+        self.client.force_login(self.admin_user)
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+        with self.assertNumQueries(queries):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_every_model_is_covered(self):
+        registered = {model.__name__ for model in admin.site._registry if model._meta.app_label == 'Exam_Office_System'}
+        tested = {name[len('test_'):] for name in dir(self) if name.startswith('test_')}
+        self.assertEqual({name for name in registered if self.snake(name) not in tested}, set())
+
+    @staticmethod
+    def snake(name):
+        return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+    def test_user(self):
+        self.assertChangelistQueries(User, 3)
+
+    def test_department(self):
+        self.assertChangelistQueries(Department, 3)
+
+    def test_student(self):
+        self.assertChangelistQueries(Student, 5)
+
+    def test_teacher(self):
+        self.assertChangelistQueries(Teacher, 4)
+
+    def test_exam_office_or_admin(self):
+        self.assertChangelistQueries(ExamOfficeOrAdmin, 3)
+
+    def test_course(self):
+        self.assertChangelistQueries(Course, 4)
+
+    def test_exam(self):
+        self.assertChangelistQueries(Exam, 7)
+
+    def test_exam_schedule(self):
+        self.assertChangelistQueries(ExamSchedule, 3)
+
+    def test_exam_registration(self):
+        self.assertChangelistQueries(ExamRegistration, 3)
+
+    def test_result(self):
+        self.assertChangelistQueries(Result, 5)
+
+    def test_clearance_audit(self):
+        self.assertChangelistQueries(ClearanceAudit, 5)
+
+    def test_room(self):
+        self.assertChangelistQueries(Room, 4)
+
+    def test_seat_allocation(self):
+        self.assertChangelistQueries(SeatAllocation, 6)
+
+    def test_room_invigilation(self):
+        self.assertChangelistQueries(RoomInvigilation, 5)
+
+    def test_examiner_mark(self):
+        self.assertChangelistQueries(ExaminerMark, 3)
+
+    def test_answer_script(self):
+        self.assertChangelistQueries(AnswerScript, 3)
+
+    def test_tabulation_sheet(self):
+        self.assertChangelistQueries(TabulationSheet, 5)
+
+    def test_marksheet_application(self):
+        self.assertChangelistQueries(MarksheetApplication, 3)
+
+    def test_certificate_application(self):
+        self.assertChangelistQueries(CertificateApplication, 3)
+
+    def test_teacher_remuneration(self):
+        self.assertChangelistQueries(TeacherRemuneration, 3)
+
+    def test_remuneration_rate(self):
+        self.assertChangelistQueries(RemunerationRate, 3)
+
+    def test_exam_materials(self):
+        self.assertChangelistQueries(ExamMaterials, 3)
+
+    def test_attendance(self):
+        self.assertChangelistQueries(Attendance, 5)
+
+    def test_sickbed(self):
+        self.assertChangelistQueries(Sickbed, 3)
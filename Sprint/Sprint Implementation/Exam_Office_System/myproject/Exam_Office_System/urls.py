@@ -0,0 +1,42 @@
+from django.urls import path
+from . import api, views
+from .routing import replica_reads
+
+# Views wrapped in replica_reads() may read from a replica (see routing.py)
+urlpatterns = [
+    # Read-only API
+    path('api/students/', replica_reads()(api.ApiListView.as_view(resource=api.StudentResource())), name='api_students'),
+    path('api/exams/', replica_reads()(api.ApiListView.as_view(resource=api.ExamResource())), name='api_exams'),
+    path('api/schedules/', replica_reads()(api.ApiListView.as_view(resource=api.ExamScheduleResource())), name='api_schedules'),
+    path('api/registrations/', replica_reads()(api.ApiListView.as_view(resource=api.ExamRegistrationResource())), name='api_registrations'),
+    path('api/results/', replica_reads()(api.ApiListView.as_view(resource=api.ResultResource())), name='api_results'),
+
+    # Request metrics
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
+    path('metrics/prometheus/', views.MetricsView.as_view(format='prometheus'), name='metrics_prometheus'),
+
+    # Published exam schedules; batches may contain slashes (e.g. "2019-20/A")
+    path('schedules/<int:department_id>/', replica_reads()(views.ExamScheduleFeedView.as_view()), name='department_schedule'),
+    path('schedules/<int:department_id>.ics', replica_reads()(views.ExamScheduleFeedView.as_view(format='ics')), name='department_schedule_ics'),
+    path('schedules/<int:department_id>/<path:batch>/', replica_reads()(views.ExamScheduleFeedView.as_view()), name='batch_schedule'),
+    path('schedules/<int:department_id>/<path:batch>.ics', replica_reads()(views.ExamScheduleFeedView.as_view(format='ics')), name='batch_schedule_ics'),
+
+    # Teacher duty roster
+    path('duties/', replica_reads()(views.DutyRosterView.as_view()), name='duty_roster'),
+    path('duties.json', replica_reads()(views.DutyRosterView.as_view(format='json')), name='duty_roster_json'),
+    path('duties.csv', replica_reads()(views.DutyRosterView.as_view(format='csv')), name='duty_roster_csv'),
+    path('duties/<int:teacher_id>/', replica_reads()(views.TeacherDutiesView.as_view()), name='teacher_duties'),
+    path('duties/<int:teacher_id>.json', replica_reads()(views.TeacherDutiesView.as_view(format='json')), name='teacher_duties_json'),
+    path('duties/<int:teacher_id>.csv', replica_reads()(views.TeacherDutiesView.as_view(format='csv')), name='teacher_duties_csv'),
+
+    # Clearance
+    path('clearance/hall/', views.ClearanceSyncView.as_view(), {'office': 'hall'}, name='sync_hall_clearance'),
+    path('clearance/library/', views.ClearanceSyncView.as_view(), {'office': 'library'}, name='sync_library_clearance'),
+
+    # Attendance
+    path('exams/<int:exam_id>/attendance/', views.AttendanceSheetView.as_view(), name='exam_attendance'),
+
+    # Issued documents
+    path('documents/marksheet/<str:token>/', views.DocumentDownloadView.as_view(kind='marksheet'), name='download_marksheet'),
+    path('documents/certificate/<str:token>/', views.DocumentDownloadView.as_view(kind='certificate'), name='download_certificate'),
+]
@@ -1,3 +1,203 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.views import View
 
-# Create your views here.
+from .attendance import SheetError, attendance_bitmaps, read_sheet, record_attendance
+from .clearance import read_clearance_list, sync_clearance
+from .documents import DocumentNotReady, approved_applications, document_file
+from .duties import DUTY_COLUMNS, ROLE_LABELS, WORKLOAD_COLUMNS, teacher_duties, workload, workload_summary, write_csv
+from .models import Exam, Teacher
+from .profiling import registry
+from .schedule_feed import batch_exams, get_snapshot, render_ics
+
+
+# Published Exam Schedule View (public page or .ics feed per department or batch)
+class ExamScheduleFeedView(View):
+    format = 'html'
+
+    def get(self, request, department_id, batch=None):
+        snapshot = get_snapshot(department_id)
+        if snapshot is None:
+            raise Http404('No such department')
+        # Strong ETag: the snapshot's content hash, scoped to the batch and format served;
+        # feeds also carry the snapshot's generation time in their DTSTAMPs
+        tag = '%s-%s-%s' % (snapshot['etag'], self.format, batch or 'all')
+        if self.format == 'ics':
+            tag += '-%d' % snapshot['generated_at'].timestamp()
+        etag = '"%s"' % tag
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if self.format == 'ics':
+                response = HttpResponse(render_ics(snapshot, batch, request.get_host()), content_type='text/calendar; charset=utf-8')
+                response['Content-Disposition'] = f'inline; filename="exams-{department_id}{f"-{batch}" if batch else ""}.ics"'
+            else:
+                # Rendered without the request: the page is identical for every visitor, so shared caches may keep it
+                response = HttpResponse(render_to_string('Exam_Office/exam_schedule.html', {
+                    'snapshot': snapshot,
+                    'batch': batch,
+                    'exams': batch_exams(snapshot, batch),
+                }))
+        response['ETag'] = etag
+        response['Cache-Control'] = f"public, max-age={getattr(settings, 'SCHEDULE_CACHE_MAX_AGE', 60)}"
+        return response
+
+# Marksheet / Certificate Download View (the applicant or the Exam Office)
+class DocumentDownloadView(LoginRequiredMixin, View):
+    kind = None
+
+    def get(self, request, token):
+        application = get_object_or_404(approved_applications(self.kind), token=token)
+        if request.user.role != 'Exam_Office' and application.student.user_id != request.user.pk:
+            raise PermissionDenied
+        try:
+            path, digest = document_file(self.kind, application)
+        except DocumentNotReady:
+            raise Http404('The result for this marksheet is not published yet')
+        etag = f'"{digest}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            # FileResponse streams the file in blocks instead of reading it into memory
+            response = FileResponse(
+                open(path, 'rb'), as_attachment=True, content_type='application/pdf',
+                filename=f'{self.kind}_{application.student.registration_number}.pdf',
+            )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+# Attendance Sheet View (the exam's invigilator or the Exam Office)
+class AttendanceSheetView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def test_func(self):
+        self.exam = get_object_or_404(Exam, pk=self.kwargs['exam_id'])
+        user = self.request.user
+        if user.role == 'Exam_Office':
+            return True
+        return user.role == 'Teacher' and hasattr(user, 'teacher_profile') and self.exam.invigilator_id == user.teacher_profile.pk
+
+    def get(self, request, exam_id):
+        student_ids, present, absent = attendance_bitmaps(self.exam)
+        data = {'exam': self.exam.pk, 'students': len(student_ids), 'present': present, 'absent': absent}
+        if request.GET.get('ids'):
+            data['student_ids'] = student_ids
+        return JsonResponse(data)
+
+    def post(self, request, exam_id):
+        try:
+            rows, attendance_date = read_sheet(request.body, request.content_type)
+            report = record_attendance(self.exam, rows, attendance_date)
+        except SheetError as error:
+            return JsonResponse({'error': str(error), 'unknown': error.unknown}, status=400)
+        return JsonResponse({'exam': self.exam.pk, **report})
+
+# Clearance Sync View (hall and library office lists, posted through an Exam Office account)
+class ClearanceSyncView(LoginRequiredMixin, UserPassesTestMixin, View):
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.role == 'Exam_Office' or self.request.user.is_staff
+
+    def post(self, request, office):
+        try:
+            entries = read_clearance_list(request.body, request.content_type)
+        except SheetError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        report = sync_clearance(office, entries, changed_by=request.user, dry_run=bool(request.GET.get('dry_run')))
+        return JsonResponse({
+            'office': office,
+            'sync_id': report.sync_id,
+            'received': report.received,
+            'cleared': report.cleared,
+            'uncleared': report.uncleared,
+            'unchanged': report.unchanged,
+            'unknown': report.unknown,
+        })
+
+# Duty Roster Views (the Exam Office for every department, a department for its own teachers)
+class DutyRosterAccessMixin(LoginRequiredMixin, UserPassesTestMixin):
+    raise_exception = True
+    format = 'html'
+
+    def roster_department(self):
+        """Department the user may see, or ``None`` for every department."""
+        user = self.request.user
+        if user.role == 'Department' and hasattr(user, 'department_profile'):
+            return user.department_profile.pk
+        return None
+
+    def is_office(self):
+        return self.request.user.role == 'Exam_Office' or self.request.user.is_staff
+
+    def export(self, filename, columns, rows):
+        if self.format == 'json':
+            return JsonResponse({'results': rows})
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        write_csv(response, columns, rows)
+        return response
+
+class DutyRosterView(DutyRosterAccessMixin, View):
+    def test_func(self):
+        return self.is_office() or self.roster_department() is not None
+
+    def get(self, request):
+        session = request.GET.get('session') or None
+        department_id = self.roster_department()
+        if department_id is None and request.GET.get('department', '').isdigit():
+            department_id = int(request.GET['department'])
+        rows = workload(session, department_id)
+        if self.format != 'html':
+            return self.export(f"duty-roster{f'-{session}' if session else ''}", WORKLOAD_COLUMNS, rows)
+        return render(request, 'Exam_Office/duty_roster.html', {
+            'rows': [{**row, 'counts': [row[field] for field in ROLE_LABELS]} for row in rows],
+            'summary': workload_summary(rows),
+            'roles': ROLE_LABELS.items(),
+            'session': session,
+            'query': request.GET.urlencode(),
+        })
+
+class TeacherDutiesView(DutyRosterAccessMixin, View):
+    def test_func(self):
+        self.teacher = get_object_or_404(Teacher.objects.select_related('department'), pk=self.kwargs['teacher_id'])
+        user = self.request.user
+        if self.is_office() or self.roster_department() == self.teacher.department_id:
+            return True
+        return user.role == 'Teacher' and self.teacher.user_id == user.pk
+
+    def get(self, request, teacher_id):
+        session = request.GET.get('session') or None
+        duties = teacher_duties(self.teacher.pk, session)
+        if self.format != 'html':
+            return self.export(f'duties-{self.teacher.pk}', DUTY_COLUMNS, duties)
+        return render(request, 'Exam_Office/teacher_duties.html', {
+            'teacher': self.teacher,
+            'duties': duties,
+            'session': session,
+            'query': request.GET.urlencode(),
+        })
+
+# Metrics View (staff, or a scraper holding PROFILING_METRICS_TOKEN)
+class MetricsView(View):
+    format = 'json'
+
+    def dispatch(self, request, *args, **kwargs):
+        token = getattr(settings, 'PROFILING_METRICS_TOKEN', '')
+        authorization = request.headers.get('Authorization', '')
+        if not (request.user.is_authenticated and request.user.is_staff) and not (
+            token and constant_time_compare(authorization, f'Bearer {token}')
+        ):
+            raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        if self.format == 'prometheus':
+            response = HttpResponse(registry.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+        else:
+            response = JsonResponse(registry.snapshot())
+        response['Cache-Control'] = 'no-store'
+        return response
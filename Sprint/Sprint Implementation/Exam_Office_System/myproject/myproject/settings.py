@@ -42,7 +42,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it sees the time and queries of every other middleware; inert unless PROFILING_ENABLED
+    'Exam_Office_System.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Inert unless DATABASE_REPLICAS is set
+    'Exam_Office_System.routing.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,13 +80,163 @@ WSGI_APPLICATION = 'myproject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
+# DATABASE_ENGINE=postgresql for production; the SQLite default suits a single small server.
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    # Needs psycopg (pip install "psycopg[binary]")
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'exam_office'),
+            'USER': os.environ.get('DATABASE_USER', 'exam_office'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', 'localhost'),
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            # Keep each worker's connection open across requests instead of reconnecting
+            # every time; health checks replace a connection the server dropped meanwhile.
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', '300')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': 5,
+                'application_name': 'exam_office',
+            },
+            # Behind PgBouncer in transaction mode, server-side cursors (used by
+            # QuerySet.iterator()) do not survive between transactions.
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DATABASE_PGBOUNCER', '') == '1',
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Seconds a writer waits for the write lock before "database is locked"
+                'timeout': 20,
+            },
+        }
+    }
+
+# Read replicas (DATABASE_REPLICAS: comma-separated PostgreSQL hosts, or SQLite files kept
+# fresh by "manage.py sync_replicas"). Reads in views wrapped in replica_reads() go to a
+# replica; see Exam_Office_System/routing.py.
+DATABASE_REPLICAS = []
+for number, location in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    replica = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    replica['HOST' if DATABASE_ENGINE == 'postgresql' else 'NAME'] = location.strip()
+    DATABASES[f'replica{number}'] = replica
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['Exam_Office_System.routing.ReplicaRouter']
+
+# A replica further behind than this many seconds is skipped until it catches up; lag is
+# measured at most every REPLICA_LAG_CHECK_INTERVAL seconds per worker.
+REPLICA_MAX_LAG = 5
+REPLICA_LAG_CHECK_INTERVAL = 2
+
+# After a write, the session reads from the primary for this long (longer than REPLICA_MAX_LAG)
+REPLICA_STICKY_SECONDS = 15
+
+# Applied to every new SQLite connection (see Exam_Office_System/database.py)
+SQLITE_PRAGMAS = {
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 2 ** 20,
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+}
+
+# SQLITE_WAL=1 lets readers run alongside the single writer; NORMAL sync is safe with WAL
+# and skips an fsync per commit. Opt-in because WAL is recorded in the database file
+# itself, which would rewrite the checked-in development database.
+if os.environ.get('SQLITE_WAL', '') == '1':
+    SQLITE_PRAGMAS.update({'journal_mode': 'WAL', 'synchronous': 'NORMAL'})
+
+# Take the write lock when a transaction starts. A deferred transaction that reads
+# before writing cannot wait for the lock, so concurrent registrations would fail with
+# "database is locked" instead of queueing behind busy_timeout.
+SQLITE_IMMEDIATE_TRANSACTIONS = True
+
+
+# Cache
+# Dashboard summaries are cached here; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache (e.g. django.core.cache.backends.redis.RedisCache) when running several workers.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'exam-office'),
     }
 }
 
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Published schedule snapshots are rebuilt on change; the timeout is only a safety net
+SCHEDULE_SNAPSHOT_TIMEOUT = 24 * 60 * 60
+
+# Seconds browsers and proxies may reuse a schedule page or feed before revalidating
+SCHEDULE_CACHE_MAX_AGE = 60
+
+# Student portals are dropped on change; the timeout is only a safety net
+PORTAL_CACHE_TIMEOUT = 60 * 60
+
+
+# Request profiling
+# Per-view wall, database and template time, served at /exam/metrics/ (staff) and
+# /exam/metrics/prometheus/ (staff, or a scraper sending "Authorization: Bearer <token>").
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '') == '1'
+
+# Share of requests profiled; the rest are only counted
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0.1'))
+
+# Sampled requests slower than this, or repeating one query this often, are logged
+PROFILING_SLOW_MS = 500
+PROFILING_DUPLICATE_THRESHOLD = 10
+
+PROFILING_METRICS_TOKEN = os.environ.get('PROFILING_METRICS_TOKEN', '')
+
+
+# Examinations
+
+# Examiner 1/2 mark difference above which a script goes to examiner 3
+THIRD_EXAMINER_THRESHOLD = 20
+
+# Candidates per invigilator when seat plans assign invigilators to rooms
+STUDENTS_PER_INVIGILATOR = 40
+
+
+# Sessions and login
+# cached_db serves sessions from the cache and writes them through to the database, so
+# authenticated requests skip the django_session table. SESSION_ENGINE=
+# django.contrib.sessions.backends.signed_cookies drops the table altogether, at the cost
+# of not being able to end a session server-side (logout only clears the cookie).
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+# PBKDF2 work factor for new hashes; others are rehashed at this count on their next login
+# (see Authentication/hashers.py). Unset keeps Django's default.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', '0')) or None
+
+PASSWORD_HASHERS = [
+    'Authentication.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Largest roster the import page accepts; uploads hash each password in the request, so
+# bigger files are imported with "manage.py import_roster"
+ROSTER_UPLOAD_MAX_ROWS = 200
+
+# (failed attempts, window in seconds) allowed per username and per client address before
+# logins are refused with 429; the address limit is high because a campus shares few.
+LOGIN_RATE_LIMITS = {
+    'username': (10, 15 * 60),
+    'ip': (100, 15 * 60),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -120,6 +274,16 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Generated files (admit cards, marksheets, certificates)
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
+ADMIT_CARD_ROOT = MEDIA_ROOT / 'admit_cards'
+
+DOCUMENT_ROOT = MEDIA_ROOT / 'documents'
+
+SEAT_PLAN_ROOT = MEDIA_ROOT / 'seat_plans'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 